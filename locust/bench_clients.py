@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Benchmarks the load generator itself: requests/sec per CPU core of the
+# python-requests user classes (HttpUser) against their FastHttpUser twins,
+# both hitting the local stub backend (stub_server.py) with zero wait time.
+# With zero wait time the achieved rate is the most one Locust process can
+# offer with that user class; CPU per request is what it costs. The stub's own
+# CPU is reported too: near 100% means the stub, not the client, was the limit.
+#
+#   python bench_clients.py --classes PublicUser --users 50 --duration 20
+#   python bench_clients.py --all --out results_hpa/bench_clients.json
+#   python bench_clients.py --all --stub-arg=--latency='*=lognormal:5,0.5'
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Every behaviour of locustfile.py (the Replay classes need a trace and are left out)
+ALL_CLASSES = "PublicUser,AuthenticatedUser,SocialUser,JourneyUser"
+
+
+def run_single(class_name, host, users, duration):
+    """
+    Runs one user class in this process (Locust as a library) and returns its throughput
+    and CPU cost. Called in a fresh child process per class so runs do not interfere.
+    """
+    import resource
+
+    import gevent
+    from locust import constant
+    from locust.env import Environment
+
+    import locustfile
+
+    user_class = type(f"Bench{class_name}", (getattr(locustfile, class_name),), {"wait_time": constant(0)})
+    env = Environment(user_classes=[user_class], host=host)
+    runner = env.create_local_runner()
+
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    runner.start(users, spawn_rate=users)
+    gevent.sleep(duration)
+    runner.quit()
+    elapsed = time.perf_counter() - started
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu_seconds = (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime)
+    requests = env.stats.total.num_requests
+    return {
+        "class": class_name,
+        "requests": requests,
+        "failures": env.stats.total.num_failures,
+        "rps": round(requests / elapsed, 1),
+        "cpu_seconds": round(cpu_seconds, 2),
+        "requests_per_core_second": round(requests / cpu_seconds, 1) if cpu_seconds else 0,
+        "cpu_ms_per_request": round(cpu_seconds * 1000 / requests, 3) if requests else None,
+    }
+
+
+def start_stub(port, extra_args=()):
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(SCRIPT_DIR, "stub_server.py"), "--port", str(port), *extra_args],
+        stdout=subprocess.PIPE, text=True
+    )
+    proc.stdout.readline()  # wait for the "listening" line
+    return proc
+
+
+def process_cpu_seconds(pid):
+    """
+    User + system CPU time of another process from /proc (None where unavailable).
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def run_in_child(class_name, host, users, duration):
+    cmd = [sys.executable, os.path.abspath(__file__), "--single", class_name,
+           "--host", host, "--users", str(users), "--duration", str(duration)]
+    output = subprocess.check_output(cmd, cwd=SCRIPT_DIR, stderr=subprocess.DEVNULL, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HttpUser vs FastHttpUser against the local stub')
+    parser.add_argument('--classes', default="PublicUser", help='Comma separated HttpUser class names (Fast twins are added)')
+    parser.add_argument('--all', action='store_true', help=f'Benchmark every user class ({ALL_CLASSES} and their Fast twins)')
+    parser.add_argument('--stub-arg', action='append', default=[],
+                        help='Extra stub_server.py argument, e.g. --stub-arg=--errors=*=0.01:503 (repeatable)')
+    parser.add_argument('--out', default=None, help='Also write the results as JSON')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--duration', type=int, default=20, help='Seconds per class')
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--host', default=None, help='Target host (default: start the local stub)')
+    parser.add_argument('--single', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.host, args.users, args.duration)))
+        return
+
+    stub = None
+    host = args.host
+    if host is None:
+        stub = start_stub(args.port, args.stub_arg)
+        host = f"http://127.0.0.1:{args.port}"
+    all_results = []
+    try:
+        print(f"\n🏁 Client benchmark: {args.users} users, {args.duration}s per class, target {host}\n")
+        print(f"{'Class':<28}{'Req/s':>10}{'CPU s':>10}{'CPU ms/req':>12}{'Req/core-s':>14}{'Stub CPU':>10}{'Failures':>10}")
+        for name in (ALL_CLASSES if args.all else args.classes).split(','):
+            results = []
+            for cls in (name, f"Fast{name}"):
+                stub_cpu = process_cpu_seconds(stub.pid) if stub else None
+                r = run_in_child(cls, host, args.users, args.duration)
+                if stub_cpu is not None:
+                    # Share of one core the single-threaded stub used while serving this class
+                    r["stub_cpu_pct"] = round((process_cpu_seconds(stub.pid) - stub_cpu) / args.duration * 100, 1)
+                results.append(r)
+                stub_pct = f"{r['stub_cpu_pct']}%" if "stub_cpu_pct" in r else "-"
+                print(f"{r['class']:<28}{r['rps']:>10}{r['cpu_seconds']:>10}{r['cpu_ms_per_request'] or '-':>12}"
+                      f"{r['requests_per_core_second']:>14}{stub_pct:>10}{r['failures']:>10}")
+                if r.get("stub_cpu_pct", 0) > 90:
+                    print("   ⚠️  The stub was saturated; the client may be able to go faster")
+            slow, fast = results
+            if slow['requests_per_core_second']:
+                print(f"   ⚡ {fast['class']} is {fast['requests_per_core_second'] / slow['requests_per_core_second']:.1f}x cheaper per request\n")
+            all_results += results
+    finally:
+        if stub:
+            stub.terminate()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"users": args.users, "duration": args.duration, "host": host, "stub_args": args.stub_arg,
+                       "results": all_results}, f, indent=2)
+        print(f"📄 {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import json
+import os
+import time
+
+import sample_store
+from latency_histogram import LatencyHistogram
+
+# Capacity search: the highest offered request rate a configuration sustains.
+#
+# run_hpa.py --capacity-search runs a sequence of constant-rate open-loop steps
+# (see load_shapes.py) inside one invocation, all recorded into the same sample
+# store as the K8s / DB pool samples. After each step the measurement window
+# (the step minus its warm-up, during which the HPA may still be scaling) is
+# checked against the SLO:
+#   p99            merged HDR latency histograms of the window (exact, see latency_histogram.py)
+#   error rate     failures / requests counted by Locust within the window
+#   DB waiting     highest HikariCP `waiting` sampled within the window
+#   throughput     achieved req/s as a fraction of the offered rate (the
+#                  generator itself or the cluster falling behind)
+# The search strategy picks the next rate from the pass/fail outcomes:
+#   step    start, start + step, ... until the first failing step (or the maximum)
+#   bisect  checks `low` and `high`, then halves the interval between the highest
+#           passing and the lowest failing rate down to `resolution`
+# Every step and the result go to <store>/capacity_search.json.
+
+RESULTS_FILE = "capacity_search.json"
+RATE_PRECISION = 1  # decimals of the bisection rates
+MIN_RESOLUTION = 10 ** -RATE_PRECISION  # finer resolutions could never be reached
+
+
+class Slo:
+    """
+    Limits one step must stay within to count as sustainable.
+    """
+
+    def __init__(self, p99_ms=1000.0, max_error_pct=1.0, max_waiting=0, min_throughput=0.95):
+        self.p99_ms = p99_ms
+        self.max_error_pct = max_error_pct
+        self.max_waiting = max_waiting
+        self.min_throughput = min_throughput
+
+    def violations(self, step):
+        """
+        Human readable list of the limits `step` broke (empty if it passed).
+        Metrics that could not be measured count as violations.
+        """
+        found = []
+        if step["p99_ms"] is None or step["p99_ms"] > self.p99_ms:
+            found.append(f"p99 {step['p99_ms']} ms > {self.p99_ms:g} ms")
+        if step["error_pct"] is None or step["error_pct"] > self.max_error_pct:
+            found.append(f"errors {step['error_pct']}% > {self.max_error_pct:g}%")
+        if step["max_waiting"] is not None and step["max_waiting"] > self.max_waiting:
+            found.append(f"DB waiting {step['max_waiting']} > {self.max_waiting}")
+        if step["achieved_rps"] is None or step["achieved_rps"] < step["offered_rps"] * self.min_throughput:
+            found.append(f"throughput {step['achieved_rps']} < {self.min_throughput:.0%} of {step['offered_rps']:g} req/s")
+        return found
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class StepSearch:
+    """
+    Linear search: raises the rate by `step` until a step fails or `maximum` passed.
+    """
+
+    def __init__(self, start, step, maximum):
+        self.rate = start
+        self.step = step
+        self.maximum = maximum
+        self.best = None
+        self.done = False
+
+    def next_rate(self):
+        if self.done or self.rate > self.maximum:
+            return None
+        return self.rate
+
+    def record(self, rate, passed):
+        if passed:
+            self.best = rate
+            self.rate = rate + self.step
+        else:
+            self.done = True
+
+
+class BisectSearch:
+    """
+    Bisection between `low` and `high` (req/s) down to `resolution`. If `low`
+    already fails there is no sustainable rate; if `high` passes it is the result.
+    """
+
+    def __init__(self, low, high, resolution):
+        self.low = low
+        self.high = high
+        self.resolution = resolution
+        self.best = None
+        self.failed_at = None
+        self.done = False
+
+    def next_rate(self):
+        if self.done:
+            return None
+        if self.best is None and self.failed_at is None:
+            return self.low
+        if self.failed_at is None:
+            return self.high
+        if self.best is None or self.failed_at - self.best <= self.resolution:
+            return None
+        rate = round((self.best + self.failed_at) / 2, RATE_PRECISION)
+        # The rounded midpoint stopped moving: repeating it would only repeat the step
+        if rate in (self.best, self.failed_at):
+            return None
+        return rate
+
+    def record(self, rate, passed):
+        if passed:
+            self.best = rate
+            if rate >= self.high:
+                self.done = True
+        else:
+            self.failed_at = rate
+            if rate <= self.low:
+                self.done = True
+
+
+STRATEGIES = {"step": StepSearch, "bisect": BisectSearch}
+
+
+def _in_window(records, start, end):
+    for record in records:
+        if start <= record.get("timestamp", 0) <= end:
+            yield record
+
+
+def evaluate_step(store_dir, start, end, offered_rps, slo, latency_grace=10):
+    """
+    Measures the window [start, end] (epoch seconds) of a step from the store and
+    checks it against `slo`. Latency snapshots are written at the end of their
+    interval, so those up to `latency_grace` seconds after `end` are included.
+    """
+    latency = LatencyHistogram()
+    for record in _in_window(sample_store.iter_records(store_dir, "latency"), start, end + latency_grace):
+        for encoded in record.get("endpoints", {}).values():
+            latency.merge(LatencyHistogram.decode(encoded))
+
+    # Locust's counters are cumulative within one step's process
+    counts = [
+        (r["timestamp"], r.get("requests"), r.get("failures"))
+        for r in _in_window(sample_store.iter_records(store_dir, "locust"), start, end)
+        if r.get("requests") is not None
+    ]
+    requests = failures = achieved = error_pct = None
+    if len(counts) >= 2:
+        (t0, r0, f0), (t1, r1, f1) = counts[0], counts[-1]
+        requests, failures = int(r1 - r0), int((f1 or 0) - (f0 or 0))
+        achieved = round(requests / (t1 - t0), 2) if t1 > t0 else None
+        error_pct = round(failures / requests * 100, 2) if requests else 0.0
+
+    waiting = [r.get("waiting", 0) for r in _in_window(sample_store.iter_records(store_dir, "db_pool"), start, end)]
+    ready = [
+        (r.get("backend") or {}).get("ready_replicas", 0)
+        for r in _in_window(sample_store.iter_records(store_dir, "k8s"), start, end)
+    ]
+
+    step = {
+        "offered_rps": offered_rps,
+        "achieved_rps": achieved,
+        "requests": requests,
+        "failures": failures,
+        "error_pct": error_pct,
+        "p50_ms": round(latency.value_at_percentile(50.0), 2) if latency.count else None,
+        "p99_ms": round(latency.value_at_percentile(99.0), 2) if latency.count else None,
+        "max_waiting": max(waiting) if waiting else None,
+        "max_be_ready": max(ready) if ready else None,
+        "window": [round(start, 3), round(end, 3)],
+    }
+    step["violations"] = slo.violations(step)
+    step["passed"] = not step["violations"]
+    return step
+
+
+def write_results(store_dir, strategy, search, slo, steps, settings):
+    """
+    Writes (and rewrites after every step) <store>/capacity_search.json.
+    """
+    path = os.path.join(store_dir, RESULTS_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "strategy": strategy,
+            "settings": settings,
+            "slo": slo.as_dict(),
+            "max_sustainable_rps": search.best,
+            "finished": search.next_rate() is None,
+            "steps": steps,
+        }, f, indent=2)
+    return path
+
+
+def format_step(step):
+    mark = "✅" if step["passed"] else "❌"
+    line = (f"{mark} step {step['step']:>2}: {step['offered_rps']:>7g} req/s offered | "
+            f"{step['achieved_rps']} achieved | p99 {step['p99_ms']} ms | errors {step['error_pct']}% | "
+            f"DB waiting {step['max_waiting']} | BE pods {step['max_be_ready']}")
+    if step["violations"]:
+        line += "\n      " + "; ".join(step["violations"])
+    return line
@@ -0,0 +1,116 @@
+import random
+import time
+
+# Shared feed / recipe ID catalog.
+#
+# Social and journey users only need *some* existing feed or recipe ID to act on.
+# Fetching one per user (or a full /api/recipe/get-all per task) made setup reads
+# a large share of the generated load, reported as if it were real traffic.
+# Instead one catalog per Locust process pages through /api/feeds/recent, keeps
+# the feed and recipe IDs in plain lists (O(1) random sampling), and refreshes
+# them once they are older than `ttl` seconds. The refresh runs in the task of
+# the first user that asks for an ID after that, with its own client, so no
+# greenlet outlives the test and no request is sent in another user's session.
+# Its requests are reported under their own "[Catalog]" names.
+
+DEFAULT_TTL = 60  # seconds before the IDs are refreshed
+DEFAULT_PAGES = 5  # /api/feeds/recent pages (20 feeds each) read per refresh
+READY_TIMEOUT = 30  # seconds a user waits for the first load started by another user
+
+
+class IdCatalog:
+    """
+    Per-process catalog of feed and recipe IDs. Requests are made with the client
+    of the user asking for an ID (the endpoints need a token).
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, pages=DEFAULT_PAGES):
+        self.ttl = ttl
+        self.pages = pages
+        self.feed_ids = []
+        self.recipe_ids = []
+        self.loaded_at = None
+        self._loading = None
+
+    def attach(self, user):
+        """
+        Makes sure the catalog has been loaded once before a logged in user starts its tasks.
+        """
+        self.ensure_loaded(user)
+
+    def feed_id(self, user):
+        self.ensure_loaded(user)
+        return random.choice(self.feed_ids) if self.feed_ids else None
+
+    def recipe_id(self, user):
+        self.ensure_loaded(user)
+        return random.choice(self.recipe_ids) if self.recipe_ids else None
+
+    def ensure_loaded(self, user):
+        """
+        Loads the catalog with `user`'s client if it never was or is older than
+        `ttl`. Waits for a first load another user already started; a refresh in
+        progress elsewhere is not waited for, the previous IDs are still valid.
+        """
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl:
+            return
+        if self._loading is not None:
+            if self.loaded_at is None:
+                self._loading.wait(READY_TIMEOUT)
+            return
+        self.refresh(user.client)
+
+    def refresh(self, client):
+        """
+        Reads up to `pages` pages of recent feeds and swaps in the new ID lists.
+        Recipe IDs come from the feeds; /api/recipe/get-all is only read when no
+        feed references a recipe.
+        """
+        from gevent.event import Event
+
+        if self._loading is not None:
+            self._loading.wait(READY_TIMEOUT)
+            return
+        self._loading = Event()
+        # Under an open-loop profile the intended send time belongs to the user's own next request
+        intended = getattr(client.request_event, "intended", None)
+        if intended is not None:
+            client.request_event.intended = None
+        try:
+            feed_ids, recipe_ids = [], set()
+            for page in range(self.pages):
+                feeds = self._get_json(client, f"/api/feeds/recent?pageNumber={page}", "/api/feeds/recent [Catalog]")
+                if not feeds:
+                    break
+                for feed in feeds:
+                    if isinstance(feed, dict) and 'id' in feed:
+                        feed_ids.append(feed['id'])
+                        recipe = feed.get('recipe')
+                        if isinstance(recipe, dict) and recipe.get('id') is not None:
+                            recipe_ids.add(recipe['id'])
+            if not recipe_ids:
+                recipes = self._get_json(client, "/api/recipe/get-all", "/api/recipe/get-all [Catalog]")
+                recipe_ids.update(r['id'] for r in recipes or [] if isinstance(r, dict) and 'id' in r)
+
+            # Keep the previous IDs if the refresh came back empty (e.g. during an outage)
+            if feed_ids:
+                self.feed_ids = feed_ids
+            if recipe_ids:
+                self.recipe_ids = list(recipe_ids)
+            self.loaded_at = time.monotonic()
+        finally:
+            if intended is not None:
+                client.request_event.intended = intended
+            self._loading.set()
+            self._loading = None
+
+    def _get_json(self, client, path, name):
+        with client.get(path, catch_response=True, name=name) as response:
+            if response.status_code != 200:
+                response.failure(f"Catalog refresh failed: {response.status_code}")
+                return None
+            try:
+                return response.json()
+            except Exception as e:
+                response.failure(f"Failed to parse JSON: {e}")
+                return None
@@ -0,0 +1,693 @@
+import argparse
+import calendar
+import csv
+import json
+import os
+import re
+import time
+
+import report_data
+import sample_store
+from latency_histogram import LatencyHistogram
+
+# Multi-run comparison across the experiments in results_hpa.
+#
+# A run is whatever was recorded for one configuration:
+#   legacy runs   <id>.txt (USERS / SPAWN_RATE + the terraform.tfvars of the run),
+#                 k8s_metrics_<id>.html (rawData + dbPool* arrays embedded in the page)
+#                 and locust_report_<id>.html (Locust's templateArgs), in any sub-directory.
+#                 A config applies to every run id it prefixes, so 2_8____TEST.txt
+#                 covers 2_8_1Node_start and 2_8_3Node_start.
+#   sample stores samples_* directories written by run_hpa.py (k8s, db_pool,
+#                 latency and locust streams), with config.txt, locust_stats.csv
+#                 and hpa_analysis.json when present.
+#
+# For each run the key metrics are extracted (throughput, p99, failures, max
+# replicas / nodes, DB pool exhaustion) and priced from the node and DB machine
+# types, giving a cost per unit of throughput. The overlay report puts all runs
+# side by side (summary bars + RPS / p95 / replica / pool-waiting curves on a
+# shared elapsed axis) and, with --baseline, flags every run that is worse than
+# its baseline by more than the threshold. A run is only checked against a
+# baseline with the same offered load (LOAD_KEYS: users, load profile, user
+# class, payloads), since throughput and cost scale with it; give one baseline
+# per load to cover several, runs without one are listed as not compared.
+#
+#   python compare_runs.py                                  (all of results_hpa)
+#   python compare_runs.py --baseline 2_4 --threshold 15
+#   python compare_runs.py --baseline 2_4 1_0               (one per offered load)
+#   python compare_runs.py --runs 2_4 2_5 2_8_1Node_start --out /tmp/cmp.html
+
+SERIES_POINTS = 300  # points per run and overlay chart
+DEFAULT_THRESHOLD = 10  # % worse than the baseline that counts as a regression
+
+# On-demand list prices in USD/hour (us-central1). Only used to rank runs, so
+# they only need to be consistent; override with --prices prices.json.
+MACHINE_PRICES = {
+    "e2-micro": 0.0084,
+    "e2-small": 0.0168,
+    "e2-medium": 0.0335,
+    "e2-standard-2": 0.0670,
+    "e2-standard-4": 0.1340,
+    "e2-standard-8": 0.2681,
+    "e2-highcpu-2": 0.0495,
+    "e2-highcpu-4": 0.0989,
+    "e2-highmem-2": 0.0904,
+}
+E2_CUSTOM_VCPU_HOUR = 0.021811
+E2_CUSTOM_GB_HOUR = 0.002923
+
+# metric -> (label, higher is better, absolute change below which nothing is flagged)
+REGRESSION_RULES = {
+    "rps": ("Throughput (req/s)", True, 1.0),
+    "p99_ms": ("p99 (ms)", False, 50.0),
+    "failure_pct": ("Failures (%)", False, 0.5),
+    "max_waiting": ("Max DB waiting", False, 0),
+    "cost_per_rps": ("Cost per req/s ($/h)", False, 0.0001),
+}
+
+# config key -> value assumed when a run's config does not record it (older runs)
+LOAD_KEYS = {
+    "USERS": None,
+    "LOAD_PROFILE": None,
+    "USER_CLASS": "AuthenticatedUser",
+    "PAYLOADS": "placeholder",
+}
+
+RUN_FILE_PATTERN = re.compile(r'^(?P<kind>k8s_metrics|locust_report)_(?P<id>.+)\.html$')
+
+
+# --- Discovery ---
+
+def _natural_key(text):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', text)]
+
+
+def discover_runs(root):
+    """
+    All runs under `root` as dicts {id, group, config, k8s_html, locust_html, store},
+    sorted by group and run id.
+    """
+    runs = {}
+    configs = []
+
+    def run(group, run_id):
+        return runs.setdefault((group, run_id), {
+            "id": run_id, "group": group, "config": None, "k8s_html": None, "locust_html": None, "store": None,
+        })
+
+    for directory, dirnames, filenames in os.walk(root):
+        group = os.path.relpath(directory, root)
+        group = "" if group == "." else group
+        if sample_store.has_stream(directory, "k8s"):
+            entry = run(os.path.dirname(group), os.path.basename(directory))
+            entry["store"] = directory
+            if os.path.exists(os.path.join(directory, "config.txt")):
+                entry["config"] = os.path.join(directory, "config.txt")
+            dirnames[:] = []  # nothing else lives inside a store
+            continue
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            match = RUN_FILE_PATTERN.match(filename)
+            if match:
+                run(group, match["id"])["k8s_html" if match["kind"] == "k8s_metrics" else "locust_html"] = path
+            elif filename.endswith(".txt"):
+                configs.append((group, filename[:-4].split("____")[0], path))
+
+    for group, config_id, path in configs:
+        matched = [
+            entry for (g, run_id), entry in runs.items()
+            if g == group and (run_id == config_id or run_id.startswith(config_id + "_")) and not entry["config"]
+        ]
+        for entry in matched:
+            entry["config"] = path
+        if not matched:
+            run(group, config_id)["config"] = path
+    return sorted(runs.values(), key=lambda r: (_natural_key(r["group"]), _natural_key(r["id"])))
+
+
+# --- Config ---
+
+def parse_config(path):
+    """
+    `key = value # comment` lines of a run config (free-text notes are skipped).
+    Values are ints where possible, strings otherwise.
+    """
+    config = {}
+    if not path:
+        return config
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            key, sep, value = line.partition("=")
+            key, value = key.strip(), value.strip().strip('"')
+            if not sep or not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', key):
+                continue
+            try:
+                config[key] = int(value)
+            except ValueError:
+                config[key] = value
+    return config
+
+
+def machine_price(machine_type, prices=MACHINE_PRICES):
+    """
+    USD/hour of a machine type; e2-custom-<vcpus>-<memory MB> is priced per vCPU and GB.
+    None for unknown types.
+    """
+    if not machine_type:
+        return None
+    if machine_type in prices:
+        return prices[machine_type]
+    custom = re.fullmatch(r'e2-custom-(\d+)-(\d+)', machine_type)
+    if custom:
+        return int(custom[1]) * E2_CUSTOM_VCPU_HOUR + int(custom[2]) / 1024 * E2_CUSTOM_GB_HOUR
+    return None
+
+
+# --- Legacy HTML reports ---
+
+def _embedded(html, pattern):
+    match = re.search(pattern, html, re.S)
+    return json.loads(match.group(1)) if match else None
+
+
+def _clock_seconds(clock):
+    h, m, s = (int(part) for part in clock.split(":"))
+    return h * 3600 + m * 60 + s
+
+
+def load_legacy_k8s(path):
+    """
+    (k8s table, db pool table) from a k8s_metrics_<id>.html. The DB pool arrays
+    carry clock labels only; they are placed on rawData's elapsed axis.
+    """
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    raw = _embedded(html, r'const rawData = (\[.*?\]);\s*\n') or []
+    for record in raw:
+        for deployment in ("backend", "frontend"):
+            part = record.get(deployment) or {}
+            # The first reports only had a single `replicas` count
+            if "replicas" in part:
+                part.setdefault("ready_replicas", part["replicas"])
+                part.setdefault("desired_replicas", part["replicas"])
+    k8s = report_data.build_table(raw, report_data.K8S_COLUMNS, report_data.K8S_PIVOTS)
+
+    labels = _embedded(html, r'const dbPoolLabels = (\[.*?\]);') or []
+    pool = {name: _embedded(html, rf'const dbPool{name.title()} = (\[.*?\]);') or []
+            for name in ("total", "active", "idle", "waiting")}
+    origin = _clock_seconds(raw[0]["time"]) - raw[0].get("elapsed", 0) if raw else None
+    records = []
+    for i, label in enumerate(labels):
+        record = {name: values[i] for name, values in pool.items() if i < len(values)}
+        record["time"] = label
+        record["elapsed"] = (_clock_seconds(label) - origin) % 86400 if origin is not None else i
+        records.append(record)
+    db = report_data.build_table(records, report_data.DB_POOL_COLUMNS)
+    return k8s, db
+
+
+def load_locust_report(path):
+    """
+    Totals and the RPS / p95 history from a Locust HTML report.
+    """
+    with open(path, encoding="utf-8") as f:
+        args = _embedded(f.read(), r'window\.templateArgs = (\{.*?\})\n') or {}
+    aggregated = next((r for r in args.get("requests_statistics", []) if r.get("name") == "Aggregated"), {})
+    history = args.get("history", [])
+    start = _iso_epoch(history[0]["time"]) if history else None
+    rows = [
+        {
+            "elapsed": _iso_epoch(h["time"]) - start,
+            "rps": h["current_rps"][1],
+            "p95": h["response_time_percentile_0.95"][1],
+            "users": h["user_count"][1],
+        }
+        for h in history
+    ]
+    duration = _iso_epoch(args["end_time"]) - _iso_epoch(args["start_time"]) if args.get("end_time") else None
+    return {
+        "requests": aggregated.get("num_requests"),
+        "failures": aggregated.get("num_failures"),
+        "rps": aggregated.get("total_rps"),
+        "p95_ms": aggregated.get("response_time_percentile_0.95"),
+        "p99_ms": aggregated.get("response_time_percentile_0.99"),
+        "duration_s": duration,
+        "history": report_data.build_table(rows, {k: (k,) for k in ("elapsed", "rps", "p95", "users")}),
+    }
+
+
+def _iso_epoch(value):
+    return calendar.timegm(time.strptime(value, "%Y-%m-%dT%H:%M:%SZ"))
+
+
+# --- Sample stores ---
+
+def load_store_locust(store_dir, start):
+    """
+    Same shape as load_locust_report for a sample store. Totals come from
+    Locust's final locust_stats.csv, the p99 from the merged HDR histograms
+    (exact over the whole run), the history from the "locust" stream.
+    """
+    rows = [
+        {"elapsed": r["timestamp"] - start, "rps": r.get("rps") or 0, "p95": r.get("p95") or 0, "users": r.get("users") or 0}
+        for r in sample_store.iter_records(store_dir, "locust")
+    ]
+    result = {"requests": None, "failures": None, "rps": None, "p95_ms": None, "p99_ms": None,
+              "duration_s": rows[-1]["elapsed"] - rows[0]["elapsed"] if len(rows) > 1 else None}
+    stats_path = os.path.join(store_dir, "locust_stats.csv")
+    if os.path.exists(stats_path):
+        with open(stats_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("Name") == "Aggregated":
+                    result.update(requests=int(row["Request Count"]), failures=int(row["Failure Count"]),
+                                  rps=float(row["Requests/s"]), p95_ms=_float(row.get("95%")),
+                                  p99_ms=_float(row.get("99%")))
+    elif rows:
+        last = list(sample_store.iter_records(store_dir, "locust"))[-1]
+        result.update(requests=last.get("requests"), failures=last.get("failures"))
+        if result["requests"] and result["duration_s"]:
+            result["rps"] = result["requests"] / result["duration_s"]
+        else:
+            result["rps"] = sum(r["rps"] for r in rows) / len(rows)
+
+    merged = LatencyHistogram()
+    for record in sample_store.iter_records(store_dir, "latency"):
+        for encoded in record.get("endpoints", {}).values():
+            merged.merge(LatencyHistogram.decode(encoded))
+    if merged.count:
+        result["p95_ms"] = round(merged.value_at_percentile(95.0), 2)
+        result["p99_ms"] = round(merged.value_at_percentile(99.0), 2)
+        latency = report_data.load_latency_table(store_dir, start)
+        rows = _with_latency_p95(rows, latency)
+    result["history"] = report_data.build_table(rows, {k: (k,) for k in ("elapsed", "rps", "p95", "users")})
+    return result
+
+
+def _with_latency_p95(rows, latency):
+    """
+    Replaces Locust's windowed p95 with the HDR snapshot p95 in effect at each row.
+    """
+    elapsed, p95 = list(latency.column("elapsed")), list(latency.column("p95"))
+    j = -1
+    for row in rows:
+        while j + 1 < len(elapsed) and elapsed[j + 1] <= row["elapsed"]:
+            j += 1
+        if j >= 0:
+            row["p95"] = p95[j]
+    return rows
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Metrics ---
+
+def _series(table, name, mode="lttb"):
+    if table is None or not len(table) or name not in table.columns:
+        return {"x": [], "y": []}
+    return table.series(name, SERIES_POINTS, mode)[0]
+
+
+def _round(value, digits=2):
+    return round(value, digits) if value is not None else None
+
+
+def extract_run(run, prices=MACHINE_PRICES):
+    """
+    Config, key metrics and overlay series of one discovered run.
+    """
+    config = parse_config(run["config"])
+    k8s = db = locust = None
+    analysis = None
+    if run["store"]:
+        start = report_data.run_start(run["store"])
+        k8s = report_data.load_k8s_table(run["store"])
+        db = report_data.load_db_pool_table(run["store"])
+        if start is not None and sample_store.has_stream(run["store"], "locust"):
+            locust = load_store_locust(run["store"], start)
+        analysis_path = os.path.join(run["store"], "hpa_analysis.json")
+        if os.path.exists(analysis_path):
+            with open(analysis_path, encoding="utf-8") as f:
+                analysis = json.load(f)
+    else:
+        if run["k8s_html"]:
+            k8s, db = load_legacy_k8s(run["k8s_html"])
+        if run["locust_html"]:
+            locust = load_locust_report(run["locust_html"])
+
+    has_k8s = k8s is not None and len(k8s)
+    has_db = db is not None and len(db)
+    locust = locust or {}
+    requests, failures = locust.get("requests"), locust.get("failures")
+    duration = locust.get("duration_s") or (k8s.last("elapsed") if has_k8s else None)
+
+    # Node count over the run: sampled where the report has it, the configured count otherwise
+    if has_k8s and k8s.max("ready_nodes"):
+        avg_nodes, max_nodes = k8s.mean("ready_nodes"), k8s.max("ready_nodes")
+    else:
+        avg_nodes = max_nodes = config.get("gke_node_count")
+    node_price = machine_price(config.get("gke_node_machine_type"), prices)
+    db_price = machine_price(config.get("db_machine_type"), prices)
+    cost_per_hour = None
+    if node_price is not None and avg_nodes:
+        cost_per_hour = avg_nodes * node_price + (db_price or 0)
+    rps = locust.get("rps")
+
+    metrics = {
+        "users": config.get("USERS"),
+        "spawn_rate": config.get("SPAWN_RATE"),
+        "node_type": config.get("gke_node_machine_type"),
+        "db_type": config.get("db_machine_type"),
+        "nodes_min_max": f"{config['gke_min_node_count']}-{config['gke_max_node_count']}"
+        if "gke_min_node_count" in config and "gke_max_node_count" in config else None,
+        "be_cpu": f"{config['backend_cpu_request']}/{config['backend_cpu_limit']}"
+        if "backend_cpu_request" in config and "backend_cpu_limit" in config else None,
+        "hpa_max": config.get("backend_hpa_max_replicas"),
+        "hpa_target": config.get("backend_hpa_cpu_target"),
+        "pool_size": config.get("backend_db_pool_size") or (db.max("total") if has_db else None),
+        "duration_s": _round(duration, 0),
+        "requests": requests,
+        "rps": _round(rps),
+        "peak_rps": _round(locust["history"].max("rps")) if locust.get("history") is not None else None,
+        "p95_ms": _round(locust.get("p95_ms")),
+        "p99_ms": _round(locust.get("p99_ms")),
+        "failure_pct": _round(failures / requests * 100) if requests else None,
+        "max_be_replicas": k8s.max("be_ready") if has_k8s else None,
+        "peak_be_cpu": k8s.max("be_hpa_cpu") if has_k8s else None,
+        "avg_nodes": _round(avg_nodes),
+        "max_nodes": max_nodes,
+        "max_waiting": db.max("waiting") if has_db else None,
+        "exhaustion_samples": db.count_where_positive("waiting") if has_db else None,
+        "pool_samples": len(db) if has_db else None,
+        "cost_per_hour": _round(cost_per_hour, 4),
+        "cost_per_rps": _round(cost_per_hour / rps, 5) if cost_per_hour is not None and rps else None,
+        "cost_per_million": _round(cost_per_hour / (rps * 3600) * 1e6, 3) if cost_per_hour is not None and rps else None,
+        "reaction_s": (((analysis or {}).get("summary", {}).get("backend", {}).get("reaction_s")) or {}).get("median"),
+    }
+    history = locust.get("history")
+    return {
+        "id": run["id"],
+        "group": run["group"],
+        "sources": {key: run[key] for key in ("config", "k8s_html", "locust_html", "store") if run[key]},
+        "config": config,
+        "metrics": metrics,
+        "series": {
+            "rps": _series(history, "rps"),
+            "p95": _series(history, "p95", "extremes"),
+            "be_ready": _series(k8s, "be_ready", "step") if has_k8s else {"x": [], "y": []},
+            "db_waiting": _series(db, "waiting", "extremes") if has_db else {"x": [], "y": []},
+        },
+    }
+
+
+def offered_load(run):
+    """
+    The config values that determine the load a run was offered, as a hashable key.
+    """
+    return tuple(run["config"].get(key, default) for key, default in LOAD_KEYS.items())
+
+
+def describe_load(load):
+    return ", ".join(f"{key}={value}" for key, value in zip(LOAD_KEYS, load) if value is not None) or "unknown load"
+
+
+def find_regressions(runs, baseline_ids, threshold=DEFAULT_THRESHOLD):
+    """
+    Checks every run against the baseline with the same offered load.
+    Returns (regressions, baselines, unmatched):
+      regressions  {run id: [finding, ...]} for every run worse than its baseline on
+                   a REGRESSION_RULES metric by more than `threshold` % (and the rule's
+                   absolute tolerance); a baseline value of 0 only needs the absolute
+                   tolerance exceeded
+      baselines    {run id: baseline id} of the runs that were checked
+      unmatched    {run id: offered load} of the runs no baseline matched
+    """
+    by_id = {r["id"]: r for r in runs}
+    by_load = {}
+    for baseline_id in baseline_ids:
+        baseline = by_id.get(baseline_id)
+        if baseline is None:
+            raise ValueError(f"Baseline run '{baseline_id}' not found (have: {', '.join(by_id)})")
+        other = by_load.setdefault(offered_load(baseline), baseline)
+        if other is not baseline:
+            raise ValueError(f"Baselines '{other['id']}' and '{baseline_id}' have the same offered load "
+                             f"({describe_load(offered_load(baseline))})")
+    regressions, baselines, unmatched = {}, {}, {}
+    for run in runs:
+        if run["id"] in baseline_ids:
+            continue
+        baseline = by_load.get(offered_load(run))
+        if baseline is None:
+            unmatched[run["id"]] = describe_load(offered_load(run))
+            continue
+        baselines[run["id"]] = baseline["id"]
+        for metric, (label, higher_is_better, tolerance) in REGRESSION_RULES.items():
+            base, value = baseline["metrics"].get(metric), run["metrics"].get(metric)
+            if base is None or value is None:
+                continue
+            worse_by = (base - value) if higher_is_better else (value - base)
+            if worse_by <= tolerance:
+                continue
+            change_pct = worse_by / abs(base) * 100 if base else None
+            if change_pct is not None and change_pct <= threshold:
+                continue
+            regressions.setdefault(run["id"], []).append({
+                "metric": metric, "label": label, "baseline_run": baseline["id"], "baseline": base, "value": value,
+                "worse_by_pct": _round(change_pct, 1),
+            })
+    return regressions, baselines, unmatched
+
+
+def compare(root, run_ids=None, baselines=(), threshold=DEFAULT_THRESHOLD, prices=MACHINE_PRICES):
+    """
+    Discovers, extracts and (with baselines) checks the runs under `root`.
+    """
+    discovered = discover_runs(root)
+    if run_ids:
+        discovered = [r for r in discovered if r["id"] in run_ids]
+    runs = []
+    for run in discovered:
+        try:
+            runs.append(extract_run(run, prices))
+        except Exception as e:
+            print(f"   ⚠️  Skipping run {run['id']}: {e}")
+    baselines = list(baselines or [])
+    regressions, checked, unmatched = find_regressions(runs, baselines, threshold) if baselines else ({}, {}, {})
+    return {
+        "root": os.path.abspath(root),
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "baselines": baselines,
+        "threshold_pct": threshold,
+        "runs": runs,
+        "regressions": regressions,
+        "checked_against": checked,
+        "not_compared": unmatched,
+    }
+
+
+# --- Report ---
+
+TABLE_COLUMNS = [
+    ("users", "Users"), ("spawn_rate", "Spawn"), ("node_type", "Node type"), ("nodes_min_max", "Nodes"),
+    ("db_type", "DB"), ("be_cpu", "BE CPU req/lim"), ("hpa_max", "HPA max"), ("pool_size", "Pool"),
+    ("rps", "RPS"), ("peak_rps", "Peak RPS"), ("p95_ms", "p95 ms"), ("p99_ms", "p99 ms"),
+    ("failure_pct", "Fail %"), ("max_be_replicas", "Max BE pods"), ("max_nodes", "Max nodes"),
+    ("max_waiting", "Max waiting"), ("exhaustion_samples", "Exhausted samples"),
+    ("cost_per_hour", "$/h"), ("cost_per_rps", "$/h per RPS"), ("cost_per_million", "$ / 1M req"),
+    ("reaction_s", "HPA reaction s"),
+]
+BAR_CHARTS = [
+    ("rps", "Throughput (req/s)"), ("p99_ms", "p99 latency (ms)"), ("max_be_replicas", "Max backend replicas"),
+    ("max_waiting", "Max DB pool waiting"), ("cost_per_rps", "Cost per req/s ($/h)"),
+]
+OVERLAY_CHARTS = [
+    ("rps", "Requests/s"), ("p95", "p95 latency (ms)"), ("be_ready", "Ready backend replicas"),
+    ("db_waiting", "DB pool waiting threads"),
+]
+
+
+def _cell(value):
+    return "–" if value is None else f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def generate_report(comparison, out_path):
+    colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF', '#2ecc71', '#767676',
+              '#e74c3c', '#8e44ad', '#16a085']
+    runs = comparison["runs"]
+    regressions = comparison["regressions"]
+    flagged = {(run_id, f["metric"]): f for run_id, findings in regressions.items() for f in findings}
+
+    header = "".join(f"<th>{label}</th>" for _, label in TABLE_COLUMNS)
+    rows = []
+    for run in runs:
+        cells = []
+        for key, _ in TABLE_COLUMNS:
+            finding = flagged.get((run["id"], key))
+            if finding:
+                change = f" (+{finding['worse_by_pct']}% worse)" if finding["worse_by_pct"] is not None else ""
+                cells.append(f'<td class="regression" title="baseline {finding["baseline_run"]}: {_cell(finding["baseline"])}{change}">'
+                             f'{_cell(run["metrics"][key])} ▼</td>')
+            else:
+                cells.append(f"<td>{_cell(run['metrics'][key])}</td>")
+        label = run["id"] + (" ⭐" if run["id"] in comparison["baselines"] else "")
+        rows.append(f'<tr><td class="run">{label}<div class="group">{run["group"]}</div></td>{"".join(cells)}</tr>')
+
+    if comparison["baselines"]:
+        items = "".join(
+            f"<li><b>{run_id}</b> vs {comparison['checked_against'][run_id]}: " + ", ".join(
+                f"{f['label']} {_cell(f['value'])} vs {_cell(f['baseline'])}"
+                + (f" ({f['worse_by_pct']}% worse)" if f["worse_by_pct"] is not None else "")
+                for f in findings
+            ) + "</li>"
+            for run_id, findings in regressions.items()
+        ) or "<li>✅ No regressions</li>"
+        not_compared = "".join(f"<li><b>{run_id}</b>: {load}</li>" for run_id, load in comparison["not_compared"].items())
+        if not_compared:
+            not_compared = f"<p>Not compared (no baseline with the same offered load):</p><ul>{not_compared}</ul>"
+        regression_section = f"""
+        <div class="card">
+            <h2>🚨 Regressions vs baseline {', '.join(comparison['baselines'])} (threshold {comparison['threshold_pct']}%)</h2>
+            <ul>{items}</ul>
+            {not_compared}
+        </div>"""
+    else:
+        regression_section = ""
+
+    payload = {
+        "runs": [r["id"] for r in runs],
+        "colors": [colors[i % len(colors)] for i in range(len(runs))],
+        "bars": {key: [r["metrics"][key] for r in runs] for key, _ in BAR_CHARTS},
+        "series": {key: [r["series"][key] for r in runs] for key, _ in OVERLAY_CHARTS},
+    }
+    bar_canvases = "".join(f'<div class="col card"><h2>{label}</h2><canvas id="bar_{key}"></canvas></div>'
+                           for key, label in BAR_CHARTS)
+    overlay_canvases = "".join(f'<div class="col card"><h2>{label}</h2><canvas id="line_{key}"></canvas></div>'
+                               for key, label in OVERLAY_CHARTS)
+    data = json.dumps(payload, separators=(',', ':')).replace("</", "<\\/")
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Run Comparison</title>
+        <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"></script>
+        <style>
+            body {{ font-family: 'Segoe UI', sans-serif; padding: 20px; background: #f4f4f4; }}
+            .card {{ background: white; padding: 20px; margin-bottom: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
+            h1, h2 {{ text-align: center; color: #333; }}
+            .row {{ display: flex; gap: 20px; flex-wrap: wrap; }}
+            .col {{ flex: 1; min-width: 45%; }}
+            canvas {{ max-height: 350px; }}
+            table {{ border-collapse: collapse; width: 100%; font-size: 0.85em; }}
+            th, td {{ padding: 6px 8px; border-bottom: 1px solid #eee; text-align: right; white-space: nowrap; }}
+            th {{ background: #f8f9fa; position: sticky; top: 0; }}
+            td.run {{ text-align: left; font-weight: bold; }}
+            .group {{ font-size: 0.8em; color: #999; font-weight: normal; }}
+            td.regression {{ background: #fee; color: #e74c3c; font-weight: bold; }}
+            .note {{ text-align: center; font-size: 0.85em; color: #999; }}
+        </style>
+    </head>
+    <body>
+        <h1>🔬 HPA Experiment Comparison</h1>
+        <p class="note">{len(runs)} runs from {comparison['root']} · generated {comparison['generated']}</p>
+        {regression_section}
+        <div class="card" style="overflow-x: auto;">
+            <h2>📋 Configurations and key metrics</h2>
+            <table><tr><th style="text-align: left;">Run</th>{header}</tr>{"".join(rows)}</table>
+            <p class="note">Cost = average ready nodes × node price + DB VM price (on-demand list prices).
+            Legacy runs without node samples use the configured node count.</p>
+        </div>
+        <div class="row">{bar_canvases}</div>
+        <p class="note">Curves are in seconds since each source started recording (Locust history or K8s monitor).</p>
+        <div class="row">{overlay_canvases}</div>
+        <script>
+            const DATA = {data};
+            for (const [key, values] of Object.entries(DATA.bars)) {{
+                new Chart(document.getElementById('bar_' + key), {{
+                    type: 'bar',
+                    data: {{ labels: DATA.runs, datasets: [{{ data: values, backgroundColor: DATA.colors }}] }},
+                    options: {{ responsive: true, plugins: {{ legend: {{ display: false }} }}, scales: {{ y: {{ beginAtZero: true }} }} }}
+                }});
+            }}
+            for (const [key, perRun] of Object.entries(DATA.series)) {{
+                new Chart(document.getElementById('line_' + key), {{
+                    type: 'line',
+                    data: {{
+                        datasets: perRun.map((s, i) => ({{
+                            label: DATA.runs[i],
+                            data: s.x.map((x, j) => ({{ x, y: s.y[j] }})),
+                            borderColor: DATA.colors[i], backgroundColor: DATA.colors[i],
+                            pointRadius: 0, borderWidth: 1.5, stepped: key === 'be_ready'
+                        }})).filter(d => d.data.length)
+                    }},
+                    options: {{
+                        responsive: true, parsing: false,
+                        interaction: {{ mode: 'nearest', axis: 'x', intersect: false }},
+                        scales: {{ x: {{ type: 'linear', title: {{ display: true, text: 'Elapsed (s)' }} }}, y: {{ beginAtZero: true }} }},
+                        plugins: {{ legend: {{ position: 'bottom' }} }}
+                    }}
+                }});
+            }}
+        </script>
+    </body>
+    </html>
+    """
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+
+def print_table(comparison):
+    print(f"\n🔬 {len(comparison['runs'])} runs")
+    print(f"   {'run':<18} {'users':>6} {'rps':>8} {'p99 ms':>9} {'fail %':>7} {'BE pods':>8} {'waiting':>8} {'$/h/RPS':>9}")
+    for run in comparison["runs"]:
+        m = run["metrics"]
+        print(f"   {run['id']:<18} {_cell(m['users']):>6} {_cell(m['rps']):>8} {_cell(m['p99_ms']):>9} "
+              f"{_cell(m['failure_pct']):>7} {_cell(m['max_be_replicas']):>8} {_cell(m['max_waiting']):>8} "
+              f"{_cell(m['cost_per_rps']):>9}")
+    if comparison["baselines"]:
+        print(f"\n🚨 Regressions vs {', '.join(comparison['baselines'])}: {len(comparison['regressions'])} run(s)")
+        for run_id, findings in comparison["regressions"].items():
+            for f in findings:
+                change = f" ({f['worse_by_pct']}% worse)" if f["worse_by_pct"] is not None else ""
+                print(f"   {run_id} vs {f['baseline_run']}: {f['label']} {_cell(f['value'])} vs {_cell(f['baseline'])}{change}")
+        for run_id, load in comparison["not_compared"].items():
+            print(f"   {run_id}: not compared, no baseline with the same offered load ({load})")
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Compare HPA experiment runs and flag regressions against a baseline')
+    parser.add_argument('--root', default=os.path.join(script_dir, "results_hpa"), help='Directory searched for runs')
+    parser.add_argument('--runs', nargs='*', default=None, help='Only these run ids (default: all discovered)')
+    parser.add_argument('--baseline', nargs='+', default=[],
+                        help='Run id(s) to check the others against; each run is checked against the one with its offered load')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='%% worse than the baseline that is flagged as a regression')
+    parser.add_argument('--prices', default=None, help='JSON {machine type: USD/hour} merged over the built-in prices')
+    parser.add_argument('--out', default=None, help='Output HTML (default: <root>/run_comparison.html, JSON next to it)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 if any run regressed')
+    args = parser.parse_args()
+
+    prices = dict(MACHINE_PRICES)
+    if args.prices:
+        with open(args.prices, encoding="utf-8") as f:
+            prices.update(json.load(f))
+    try:
+        comparison = compare(args.root, args.runs, args.baseline, args.threshold, prices)
+    except ValueError as e:
+        parser.error(str(e))
+    out = args.out or os.path.join(args.root, "run_comparison.html")
+    generate_report(comparison, out)
+    json_path = os.path.splitext(out)[0] + ".json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({**comparison, "runs": [{k: v for k, v in r.items() if k != "series"} for r in comparison["runs"]]},
+                  f, indent=2)
+    print_table(comparison)
+    print(f"\n📊 {out}\n📄 {json_path}")
+    if args.fail_on_regression and comparison["regressions"]:
+        raise SystemExit(1)
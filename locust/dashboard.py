@@ -0,0 +1,290 @@
+import collections
+import html
+import itertools
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Live dashboard served by run_hpa.py while a test runs.
+#
+# The sample store calls `LiveDashboard.publish` for every record the monitor,
+# the DB pool poller and the Locust stats tailer append. Each record is reduced
+# to a small delta (only the numbers the charts draw) and pushed to every open
+# browser through server-sent events; the page appends the new points to its
+# charts instead of re-rendering them. Deltas are numbered and the last
+# BACKLOG of them are kept, so a page opened mid-run first receives the run so
+# far, and a reconnecting EventSource (Last-Event-ID) only what it missed.
+#
+# Slow browsers never hold up the sampler: each subscriber has a bounded queue
+# and loses its oldest deltas when it falls behind.
+#
+#   open http://localhost:8090 while run_hpa.py is running
+
+DEFAULT_PORT = 8090
+BACKLOG = 20000  # deltas kept for late subscribers (~4 streams x 5000 samples)
+SUBSCRIBER_QUEUE = 2000  # deltas buffered per browser before the oldest are dropped
+KEEPALIVE = 15  # seconds between SSE comments on an idle connection
+
+
+def _avg(values):
+    return round(sum(values.values()) / len(values), 1) if values else None
+
+
+def to_delta(stream, record, start):
+    """
+    Compact delta for one sample store record, or None for streams the dashboard
+    does not draw. `t` is seconds on the run's elapsed timebase.
+    """
+    t = record.get("elapsed")
+    if t is None and "timestamp" in record:
+        t = record["timestamp"] - start
+    if t is None:
+        return None
+    t = round(t, 1)
+    if stream == "k8s":
+        backend, frontend, nodes = record.get("backend") or {}, record.get("frontend") or {}, record.get("nodes") or {}
+        return {
+            "s": "k8s", "t": t,
+            "be": [backend.get("desired_replicas"), backend.get("ready_replicas"), backend.get("hpa_cpu")],
+            "fe": [frontend.get("desired_replicas"), frontend.get("ready_replicas"), frontend.get("hpa_cpu")],
+            "nodes": [nodes.get("total"), nodes.get("ready"), _avg(nodes.get("cpu_utilization"))],
+        }
+    if stream == "db_pool":
+        return {"s": "db", "t": t, "v": [record.get("total"), record.get("active"), record.get("idle"), record.get("waiting")]}
+    if stream == "locust":
+        return {"s": "locust", "t": t, "v": [record.get("users"), record.get("rps"), record.get("fps"), record.get("p95"), record.get("p99")]}
+    return None
+
+
+class LiveDashboard:
+    """
+    Threaded HTTP server with the dashboard page (/) and the SSE stream (/events).
+    """
+
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", title="HPA test"):
+        self.port = port
+        self.host = host
+        self.title = title
+        self.run_start = time.time()  # replaced by the first K8s sample's elapsed 0
+        self._anchored = False
+        self._ids = itertools.count(1)
+        self._backlog = collections.deque(maxlen=BACKLOG)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- Producer side ---
+
+    def publish(self, stream, record):
+        if stream == "k8s" and not self._anchored and "timestamp" in record:
+            self.run_start = record["timestamp"] - record.get("elapsed", 0)
+            self._anchored = True
+        delta = to_delta(stream, record, self.run_start)
+        if delta is None:
+            return
+        with self._lock:
+            message = (next(self._ids), json.dumps(delta, separators=(',', ':')))
+            self._backlog.append(message)
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                try:
+                    q.get_nowait()  # drop the oldest delta for this slow browser
+                    q.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    # --- Consumer side ---
+
+    def subscribe(self, last_id=0):
+        """
+        New subscriber queue, pre-filled with the backlog after `last_id`.
+        """
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        with self._lock:
+            pending = [m for m in self._backlog if m[0] > last_id]
+            self._subscribers.add(q)
+        return q, pending
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def start(self):
+        dashboard = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path in ("/", "/index.html"):
+                    body = render_page(dashboard.title).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif self.path.startswith("/events"):
+                    self.stream_events()
+                else:
+                    self.send_error(404)
+
+            def stream_events(self):
+                try:
+                    last_id = int(self.headers.get("Last-Event-ID") or 0)
+                except ValueError:
+                    last_id = 0
+                q, pending = dashboard.subscribe(last_id)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                try:
+                    # The backlog goes out as one write, live deltas as they arrive
+                    self.wfile.write("".join(f"id: {i}\ndata: {data}\n\n" for i, data in pending).encode())
+                    self.wfile.flush()
+                    while True:
+                        try:
+                            message_id, data = q.get(timeout=KEEPALIVE)
+                            self.wfile.write(f"id: {message_id}\ndata: {data}\n\n".encode())
+                        except queue.Empty:
+                            self.wfile.write(b": keepalive\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    dashboard.unsubscribe(q)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="live-dashboard", daemon=True).start()
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def render_page(title):
+    # The title comes from --user-class / --host
+    title = html.escape(title)
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>Live: {title}</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"></script>
+    <style>
+        body {{ font-family: 'Segoe UI', sans-serif; padding: 20px; background: #f4f4f4; }}
+        .card {{ background: white; padding: 20px; margin-bottom: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
+        h1, h2 {{ text-align: center; color: #333; }}
+        .row {{ display: flex; gap: 20px; flex-wrap: wrap; }}
+        .col {{ flex: 1; min-width: 45%; }}
+        canvas {{ max-height: 300px; }}
+        .summary-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(160px, 1fr)); gap: 15px; }}
+        .summary-item {{ text-align: center; padding: 15px; background: #f8f9fa; border-radius: 8px; }}
+        .summary-item .value {{ font-size: 1.8em; font-weight: bold; color: #333; }}
+        .summary-item .label {{ font-size: 0.9em; color: #666; }}
+        .bad .value {{ color: #e74c3c; }}
+        #status {{ text-align: center; color: #999; font-size: 0.85em; }}
+    </style>
+</head>
+<body>
+    <h1>📡 Live: {title}</h1>
+    <p id="status">connecting…</p>
+    <div class="card"><div class="summary-grid">
+        <div class="summary-item" id="tElapsed"><div class="value">–</div><div class="label">Elapsed</div></div>
+        <div class="summary-item" id="tUsers"><div class="value">–</div><div class="label">Users</div></div>
+        <div class="summary-item" id="tRps"><div class="value">–</div><div class="label">Req/s</div></div>
+        <div class="summary-item" id="tFail"><div class="value">–</div><div class="label">Failures/s</div></div>
+        <div class="summary-item" id="tP95"><div class="value">–</div><div class="label">p95 (ms)</div></div>
+        <div class="summary-item" id="tBe"><div class="value">–</div><div class="label">Backend ready / desired</div></div>
+        <div class="summary-item" id="tNodes"><div class="value">–</div><div class="label">Nodes ready / total</div></div>
+        <div class="summary-item" id="tWaiting"><div class="value">–</div><div class="label">DB waiting</div></div>
+    </div></div>
+    <div class="row">
+        <div class="col card"><h2>Load</h2><canvas id="loadChart"></canvas></div>
+        <div class="col card"><h2>Backend HPA</h2><canvas id="beChart"></canvas></div>
+        <div class="col card"><h2>Nodes</h2><canvas id="nodeChart"></canvas></div>
+        <div class="col card"><h2>DB Connection Pool</h2><canvas id="dbChart"></canvas></div>
+    </div>
+    <script>
+        const MAX_POINTS = 5000;
+        const clock = s => {{ s = Math.round(s); return Math.floor(s / 60) + ':' + String(s % 60).padStart(2, '0'); }};
+        const line = (label, color, axis, stepped) => ({{ label, data: [], borderColor: color, backgroundColor: color,
+            pointRadius: 0, borderWidth: 1.5, yAxisID: axis || 'y', stepped: !!stepped }});
+        const chart = (id, datasets, y1) => new Chart(document.getElementById(id), {{
+            type: 'line', data: {{ datasets }},
+            options: {{
+                animation: false, parsing: false, responsive: true,
+                interaction: {{ mode: 'nearest', axis: 'x', intersect: false }},
+                scales: {{
+                    x: {{ type: 'linear', ticks: {{ callback: clock }} }},
+                    y: {{ beginAtZero: true }},
+                    ...(y1 ? {{ y1: {{ beginAtZero: true, position: 'right', grid: {{ drawOnChartArea: false }}, title: {{ display: true, text: y1 }} }} }} : {{}})
+                }},
+                plugins: {{ legend: {{ position: 'bottom' }} }}
+            }}
+        }});
+        const charts = {{
+            load: chart('loadChart', [line('Req/s', '#36A2EB'), line('Failures/s', '#e74c3c'), line('p95 ms', '#FF9F40', 'y1')], 'ms'),
+            be: chart('beChart', [line('Desired', '#9966FF', 'y', true), line('Ready', '#4BC0C0', 'y', true), line('HPA CPU %', '#FF6384', 'y1')], 'CPU %'),
+            nodes: chart('nodeChart', [line('Total', '#C9CBCF', 'y', true), line('Ready', '#36A2EB', 'y', true), line('Avg CPU %', '#FF9F40', 'y1')], 'CPU %'),
+            db: chart('dbChart', [line('Active', '#36A2EB'), line('Idle', '#2ecc71'), line('Waiting', '#e74c3c')]),
+        }};
+        const dirty = new Set();
+        function push(c, t, values) {{
+            values.forEach((v, i) => {{
+                if (v === null || v === undefined) return;
+                const data = c.data.datasets[i].data;
+                data.push({{ x: t, y: v }});
+                if (data.length > MAX_POINTS) data.shift();
+            }});
+            dirty.add(c);
+        }}
+        function tile(id, text, bad) {{
+            const el = document.getElementById(id);
+            el.querySelector('.value').textContent = text;
+            el.classList.toggle('bad', !!bad);
+        }}
+        // Redraw at most once per frame however many deltas arrived
+        (function redraw() {{ dirty.forEach(c => c.update('none')); dirty.clear(); requestAnimationFrame(redraw); }})();
+
+        const handlers = {{
+            k8s: d => {{
+                push(charts.be, d.t, [d.be[0], d.be[1], d.be[2]]);
+                push(charts.nodes, d.t, d.nodes);
+                tile('tBe', `${{d.be[1] ?? '–'}} / ${{d.be[0] ?? '–'}}`, d.be[1] < d.be[0]);
+                tile('tNodes', `${{d.nodes[1] ?? '–'}} / ${{d.nodes[0] ?? '–'}}`, d.nodes[1] < d.nodes[0]);
+            }},
+            db: d => {{
+                push(charts.db, d.t, [d.v[1], d.v[2], d.v[3]]);
+                tile('tWaiting', d.v[3] ?? '–', d.v[3] > 0);
+            }},
+            locust: d => {{
+                push(charts.load, d.t, [d.v[1], d.v[2], d.v[3]]);
+                tile('tUsers', d.v[0] ?? '–');
+                tile('tRps', d.v[1] ?? '–');
+                tile('tFail', d.v[2] ?? '–', d.v[2] > 0);
+                tile('tP95', d.v[3] ?? '–');
+            }},
+        }};
+        let latest = 0;
+        const source = new EventSource('/events');
+        source.onopen = () => document.getElementById('status').textContent = 'live';
+        source.onerror = () => document.getElementById('status').textContent = 'disconnected, retrying…';
+        source.onmessage = e => {{
+            const d = JSON.parse(e.data);
+            if (d.t > latest) {{ latest = d.t; tile('tElapsed', clock(d.t)); }}
+            (handlers[d.s] || (() => {{}}))(d);
+        }};
+    </script>
+</body>
+</html>
+"""
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import report_data
+import timeline
+
+# HPA reaction-time and scaling-efficiency analysis of one run's sample store.
+#
+# For backend and frontend every change of `desired_replicas` is a scale event:
+#   reaction      CPU crossing the HPA target -> desired replicas changing
+#   pod startup   desired replicas rising -> ready replicas catching up
+#                 (scale-down: desired dropping -> ready following)
+# For nodes every increase of the node count is a provisioning event:
+#   provisioning  first sample with unready (pending) pods -> new node Ready
+#   node ready    node registered -> node Ready
+# Efficiency joins Locust's RPS with ready replicas and backend pod CPU on the
+# run timebase (see timeline.py): RPS per ready backend replica and per CPU core
+# actually used by the backend pods.
+#
+# All latencies are measured between samples, so they are only as precise as
+# the sampling interval (reported as `resolution_s`). A failed probe reads as 0
+# replicas / nodes (kubectl timeouts are common under load); such samples are
+# left out (`skipped_samples`) rather than read as a scale-down and back up.
+#
+#   python hpa_analyzer.py results_hpa/samples_20250101_120000 --cpu-target 50
+#   python hpa_analyzer.py results_hpa/samples_... --follow 10     (during a run)
+
+DEFAULT_CPU_TARGET = 50  # % averageUtilization of the HPAs (hpa_cpu_target in terraform)
+DEPLOYMENTS = {"backend": "be", "frontend": "fe"}
+
+
+def _first_index(start, count, predicate):
+    for i in range(start, count):
+        if predicate(i):
+            return i
+    return None
+
+
+def _round(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def valid_samples(desired, pods_seen):
+    """
+    Indices of the samples whose deployment probe worked: a failed kubectl call
+    reports 0 desired replicas, and no pods are seen in the same sample.
+    """
+    return [i for i, (count, seen) in enumerate(zip(desired, pods_seen)) if count > 0 or seen]
+
+
+def detect_scale_events(elapsed, desired, ready, cpu, cpu_target, deployment):
+    """
+    One event per change of desired replicas, with reaction and startup latencies.
+    """
+    events = []
+    n = len(elapsed)
+    for i in range(1, n):
+        before, after = desired[i - 1], desired[i]
+        # 0 -> N is a deployment (re)appearing, not the HPA scaling it
+        if after == before or before == 0:
+            continue
+        up = after > before
+        # Start of the contiguous run of samples on the triggering side of the target
+        triggered = (lambda j: cpu[j] > cpu_target) if up else (lambda j: cpu[j] < cpu_target)
+        crossed = None
+        j = i - 1
+        while j >= 0 and triggered(j):
+            crossed = j
+            j -= 1
+        # Ready replicas following the new desired count
+        followed = _first_index(i, n, (lambda k: ready[k] >= after) if up else (lambda k: ready[k] <= after))
+        events.append({
+            "deployment": deployment,
+            "direction": "up" if up else "down",
+            "from": int(before),
+            "to": int(after),
+            "at": _round(elapsed[i]),
+            "cpu_at_decision": _round(cpu[i - 1]),
+            "cpu_crossed_at": _round(elapsed[crossed]) if crossed is not None else None,
+            "reaction_s": _round(elapsed[i] - elapsed[crossed]) if crossed is not None else None,
+            "ready_at": _round(elapsed[followed]) if followed is not None else None,
+            "pod_startup_s": _round(elapsed[followed] - elapsed[i]) if followed is not None else None,
+        })
+    return events
+
+
+def detect_node_events(elapsed, total, ready, pending):
+    """
+    One event per increase of the ready node count. `pending[i]` is True when
+    some deployment had fewer ready than desired replicas at sample i.
+    """
+    events = []
+    n = len(elapsed)
+    for i in range(1, n):
+        if ready[i] <= ready[i - 1]:
+            continue
+        # When the node registered (total count reached the new ready count)
+        registered = i
+        while registered > 0 and total[registered - 1] >= ready[i]:
+            registered -= 1
+        # Start of the pending-pods stretch that led up to the registration
+        pending_since = None
+        j = registered - 1
+        while j >= 0 and pending[j]:
+            pending_since = j
+            j -= 1
+        events.append({
+            "deployment": "nodes",
+            "direction": "up",
+            "from": int(ready[i - 1]),
+            "to": int(ready[i]),
+            "at": _round(elapsed[i]),
+            "registered_at": _round(elapsed[registered]),
+            "node_ready_s": _round(elapsed[i] - elapsed[registered]),
+            "pending_since": _round(elapsed[pending_since]) if pending_since is not None else None,
+            "provisioning_s": _round(elapsed[i] - elapsed[pending_since]) if pending_since is not None else None,
+        })
+    # Scale-down of nodes is reported as a plain count change
+    for i in range(1, n):
+        if total[i] < total[i - 1]:
+            events.append({
+                "deployment": "nodes", "direction": "down",
+                "from": int(total[i - 1]), "to": int(total[i]), "at": _round(elapsed[i]),
+            })
+    return sorted(events, key=lambda e: e["at"])
+
+
+def _stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean": _round(statistics.fmean(values), 2),
+        "median": _round(statistics.median(values), 2),
+        "max": _round(max(values), 2),
+    }
+
+
+def scaling_efficiency(store_dir):
+    """
+    RPS per ready backend replica and per backend CPU core, from the joined timeline.
+    Only seconds with traffic and at least one ready replica are counted.
+    """
+    per_replica, per_core, peak = [], [], None
+    for row in timeline.iter_timeline(store_dir):
+        rps, replicas, cpu_m = row.get("rps"), row.get("be_ready"), row.get("be_pod_cpu")
+        if not rps or not replicas:
+            continue
+        per_replica.append(rps / replicas)
+        if cpu_m:
+            per_core.append(rps / (cpu_m / 1000))
+        if peak is None or rps > peak["rps"]:
+            peak = {"at": row["elapsed"], "rps": _round(rps), "be_ready": replicas,
+                    "rps_per_replica": _round(rps / replicas, 2),
+                    "rps_per_core": _round(rps / (cpu_m / 1000), 2) if cpu_m else None}
+    return {
+        "rps_per_replica": _stats(per_replica),
+        "rps_per_core": _stats(per_core),
+        "peak": peak,
+    }
+
+
+def analyze(store_dir, cpu_target=DEFAULT_CPU_TARGET):
+    """
+    Full analysis of one sample store as a JSON-ready dict.
+    """
+    k8s = report_data.load_k8s_table(store_dir)
+    all_elapsed = list(k8s.column("elapsed"))
+    spacing = [b - a for a, b in zip(all_elapsed, all_elapsed[1:])]
+    events = []
+    summary = {}
+    skipped = {}
+    for deployment, prefix in DEPLOYMENTS.items():
+        desired = list(k8s.column(f"{prefix}_desired"))
+        keep = valid_samples(desired, k8s.pivots[f"{prefix}_pods"].rows_present())
+        skipped[deployment] = len(desired) - len(keep)
+        deployment_events = detect_scale_events(
+            [all_elapsed[i] for i in keep], [desired[i] for i in keep],
+            [k8s.column(f"{prefix}_ready")[i] for i in keep],
+            [k8s.column(f"{prefix}_hpa_cpu")[i] for i in keep], cpu_target, deployment
+        )
+        events += deployment_events
+        ups = [e for e in deployment_events if e["direction"] == "up"]
+        downs = [e for e in deployment_events if e["direction"] == "down"]
+        summary[deployment] = {
+            "scale_ups": len(ups),
+            "scale_downs": len(downs),
+            "max_desired": k8s.max(f"{prefix}_desired"),
+            "max_ready": k8s.max(f"{prefix}_ready"),
+            "reaction_s": _stats(e["reaction_s"] for e in ups),
+            "pod_startup_s": _stats(e["pod_startup_s"] for e in ups),
+            "scale_down_reaction_s": _stats(e["reaction_s"] for e in downs),
+            "never_ready": sum(1 for e in ups if e["ready_at"] is None),
+        }
+
+    # Node probes fail the same way (0 nodes); deployment probes that failed do not count as pending
+    total_nodes = list(k8s.column("total_nodes"))
+    keep = [i for i, total in enumerate(total_nodes) if total > 0]
+    skipped["nodes"] = len(total_nodes) - len(keep)
+    pending = [
+        any(0 < k8s.column(f"{p}_desired")[i] and k8s.column(f"{p}_ready")[i] < k8s.column(f"{p}_desired")[i]
+            for p in DEPLOYMENTS.values())
+        for i in keep
+    ]
+    node_events = detect_node_events([all_elapsed[i] for i in keep], [total_nodes[i] for i in keep],
+                                     [k8s.column("ready_nodes")[i] for i in keep], pending)
+    events += node_events
+    node_ups = [e for e in node_events if e["direction"] == "up"]
+    summary["nodes"] = {
+        "scale_ups": len(node_ups),
+        "scale_downs": sum(1 for e in node_events if e["direction"] == "down"),
+        "max_ready": k8s.max("ready_nodes"),
+        "provisioning_s": _stats(e["provisioning_s"] for e in node_ups),
+        "node_ready_s": _stats(e["node_ready_s"] for e in node_ups),
+    }
+
+    return {
+        "store": os.path.abspath(store_dir),
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_target": cpu_target,
+        "samples": len(all_elapsed),
+        "skipped_samples": skipped,
+        "duration_s": _round(all_elapsed[-1]) if all_elapsed else 0,
+        "resolution_s": _round(statistics.median(spacing), 2) if spacing else None,
+        "summary": summary,
+        "efficiency": scaling_efficiency(store_dir),
+        "events": sorted(events, key=lambda e: e["at"]),
+    }
+
+
+def write_analysis(store_dir, out_path=None, cpu_target=DEFAULT_CPU_TARGET):
+    analysis = analyze(store_dir, cpu_target)
+    out_path = out_path or os.path.join(store_dir, "hpa_analysis.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(analysis, f, indent=2)
+    return analysis, out_path
+
+
+def print_summary(analysis):
+    def fmt(stats, unit="s"):
+        return f"mean {stats['mean']}{unit} / max {stats['max']}{unit} (n={stats['count']})" if stats else "-"
+
+    print(f"\n⏱️  HPA analysis ({analysis['samples']} samples, {analysis['resolution_s']}s resolution, CPU target {analysis['cpu_target']}%)")
+    for deployment in DEPLOYMENTS:
+        s = analysis["summary"][deployment]
+        print(f"   {deployment:<9} ↑{s['scale_ups']} ↓{s['scale_downs']} | reaction {fmt(s['reaction_s'])} | pod startup {fmt(s['pod_startup_s'])}")
+    s = analysis["summary"]["nodes"]
+    print(f"   {'nodes':<9} ↑{s['scale_ups']} ↓{s['scale_downs']} | provisioning {fmt(s['provisioning_s'])} | node ready {fmt(s['node_ready_s'])}")
+    eff = analysis["efficiency"]
+    if eff["rps_per_replica"]:
+        print(f"   efficiency: {eff['rps_per_replica']['median']} RPS/replica, "
+              f"{eff['rps_per_core']['median'] if eff['rps_per_core'] else '-'} RPS/core (medians)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Detect HPA scale events and compute reaction / startup / efficiency metrics')
+    parser.add_argument('store', help='Sample store directory of a run (results_hpa/samples_*)')
+    parser.add_argument('--cpu-target', type=float, default=DEFAULT_CPU_TARGET, help='HPA CPU averageUtilization target (%%)')
+    parser.add_argument('--out', default=None, help='Output JSON (default: <store>/hpa_analysis.json)')
+    parser.add_argument('--follow', type=float, default=0, help='Re-analyze every N seconds while the run is writing the store')
+    args = parser.parse_args()
+
+    seen = 0
+    while True:
+        analysis, out = write_analysis(args.store, args.out, args.cpu_target)
+        for event in analysis["events"][seen:]:
+            print(f"   [{event['at']:>7}s] {event['deployment']} {event['direction']} {event['from']} -> {event['to']}")
+        seen = len(analysis["events"])
+        if not args.follow:
+            break
+        time.sleep(args.follow)
+    print_summary(analysis)
+    print(f"\n📄 {out}")
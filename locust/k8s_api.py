@@ -0,0 +1,490 @@
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# In-process Kubernetes API collector.
+#
+# Instead of forking `kubectl` for every probe on every tick, this keeps a single
+# pooled HTTP session to the API server and maintains list+watch caches for
+# Deployments, HPAs, Pods and Nodes. Pod / node CPU still comes from
+# metrics.k8s.io (which does not support watch) but over the same session.
+#
+# Authentication is delegated to `kubectl proxy` (started once per run), so the
+# collector itself only talks plain HTTP to localhost.
+
+WATCH_TIMEOUT = 300  # seconds, server side timeout for a single watch request
+RETRY_DELAY = 2  # seconds between reconnect attempts
+
+RESOURCE_PATHS = {
+    "deployments": "/apis/apps/v1/namespaces/{namespace}/deployments",
+    "hpas": "/apis/autoscaling/v2/namespaces/{namespace}/horizontalpodautoscalers",
+    "pods": "/api/v1/namespaces/{namespace}/pods",
+    "nodes": "/api/v1/nodes",
+}
+POD_METRICS_PATH = "/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods"
+NODE_METRICS_PATH = "/apis/metrics.k8s.io/v1beta1/nodes"
+CADVISOR_PATH = "/api/v1/nodes/{node}/proxy/metrics/cadvisor"
+
+CPU_SUFFIXES = {"n": 1e-6, "u": 1e-3, "m": 1, "": 1000}
+MEMORY_SUFFIXES = {
+    "Ki": 1024, "Mi": 1024 ** 2, "Gi": 1024 ** 3, "Ti": 1024 ** 4,
+    "k": 1000, "M": 1000 ** 2, "G": 1000 ** 3, "T": 1000 ** 4, "": 1,
+}
+QUANTITY_PATTERN = re.compile(r'^([0-9.eE+-]+?)([a-zA-Z]*)$')
+
+
+def parse_cpu_millicores(quantity):
+    """
+    Converts a Kubernetes CPU quantity ("250m", "1", "123456789n") to millicores.
+    """
+    match = QUANTITY_PATTERN.match(str(quantity).strip())
+    if not match or match.group(2) not in CPU_SUFFIXES:
+        return 0
+    return int(round(float(match.group(1)) * CPU_SUFFIXES[match.group(2)]))
+
+
+def parse_memory_bytes(quantity):
+    """
+    Converts a Kubernetes memory quantity ("512Mi", "1Gi", "123456Ki") to bytes.
+    """
+    match = QUANTITY_PATTERN.match(str(quantity).strip())
+    if not match or match.group(2) not in MEMORY_SUFFIXES:
+        return 0
+    return int(float(match.group(1)) * MEMORY_SUFFIXES[match.group(2)])
+
+
+def start_kubectl_proxy():
+    """
+    Starts a single long-lived `kubectl proxy` on a random local port.
+    Returns: (process, base_url)
+    """
+    proc = subprocess.Popen(
+        ["kubectl", "proxy", "--port=0"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    # Output: "Starting to serve on 127.0.0.1:38271"
+    line = proc.stdout.readline()
+    match = re.search(r'(\d+\.\d+\.\d+\.\d+):(\d+)', line)
+    if not match:
+        proc.terminate()
+        raise RuntimeError(f"kubectl proxy did not start: {line.strip()!r}")
+    return proc, f"http://{match.group(1)}:{match.group(2)}"
+
+
+class WatchCache:
+    """
+    Keeps an up-to-date {name: object} map for one resource type using list+watch.
+    Listeners are called as listener(event_type, obj) on every change.
+    """
+
+    def __init__(self, session, base_url, path):
+        self.session = session
+        self.url = base_url.rstrip('/') + path
+        self.objects = {}
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.synced = threading.Event()
+        self.resource_version = None
+        self._stopped = False
+        self._response = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"watch-{self.url.rsplit('/', 1)[-1]}")
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        if self._response is not None:
+            self._response.close()
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.objects.values())
+
+    def get(self, name):
+        with self.lock:
+            return self.objects.get(name)
+
+    def _notify(self, event_type, obj):
+        for listener in self.listeners:
+            try:
+                listener(event_type, obj)
+            except Exception as e:
+                print(f"   ⚠️  Watch listener failed: {e}")
+
+    def _list(self):
+        resp = self.session.get(self.url, timeout=30)
+        resp.raise_for_status()
+        body = resp.json()
+        items = {item['metadata']['name']: item for item in body.get('items', [])}
+        with self.lock:
+            previous = self.objects
+            self.objects = items
+        self.resource_version = body.get('metadata', {}).get('resourceVersion')
+        for name, obj in items.items():
+            self._notify("ADDED" if name not in previous else "MODIFIED", obj)
+        for name, obj in previous.items():
+            if name not in items:
+                self._notify("DELETED", obj)
+        self.synced.set()
+
+    def _watch(self):
+        params = {"watch": "1", "allowWatchBookmarks": "true", "timeoutSeconds": str(WATCH_TIMEOUT)}
+        if self.resource_version:
+            params["resourceVersion"] = self.resource_version
+        with self.session.get(self.url, params=params, stream=True, timeout=(10, WATCH_TIMEOUT + 30)) as resp:
+            resp.raise_for_status()
+            self._response = resp
+            for line in resp.iter_lines():
+                if self._stopped:
+                    return True
+                if not line:
+                    continue
+                event = json.loads(line)
+                event_type, obj = event.get('type'), event.get('object', {})
+                if event_type == "ERROR":
+                    # 410 Gone: our resourceVersion is too old, relist
+                    return obj.get('code') != 410
+                rv = obj.get('metadata', {}).get('resourceVersion')
+                if rv:
+                    self.resource_version = rv
+                if event_type == "BOOKMARK":
+                    continue
+                name = obj['metadata']['name']
+                with self.lock:
+                    if event_type == "DELETED":
+                        self.objects.pop(name, None)
+                    else:
+                        self.objects[name] = obj
+                self._notify(event_type, obj)
+        return True
+
+    def _run(self):
+        needs_list = True
+        while not self._stopped:
+            try:
+                if needs_list:
+                    self._list()
+                needs_list = not self._watch()
+            except Exception as e:
+                # Also covers the stream being closed underneath us by stop()
+                if self._stopped:
+                    return
+                print(f"   ⚠️  Watch on {self.url} dropped ({e.__class__.__name__}), relisting...")
+                needs_list = True
+                time.sleep(RETRY_DELAY)
+
+
+class K8sApiCollector:
+    """
+    Drop-in replacement for the kubectl based probes in run_hpa.py.
+    Each get_* method has the same signature and return shape as its kubectl counterpart.
+    """
+
+    def __init__(self, base_url, namespace="default", pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.namespace = namespace
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.caches = {
+            kind: WatchCache(self.session, self.base_url, path.format(namespace=namespace))
+            for kind, path in RESOURCE_PATHS.items()
+        }
+
+    def start(self, sync_timeout=15):
+        for cache in self.caches.values():
+            cache.start()
+        for kind, cache in self.caches.items():
+            if not cache.synced.wait(sync_timeout):
+                print(f"   ⚠️  Initial list of {kind} did not complete within {sync_timeout}s")
+
+    def stop(self):
+        for cache in self.caches.values():
+            cache.stop()
+        self.session.close()
+
+    def add_listener(self, kind, listener):
+        self.caches[kind].listeners.append(listener)
+
+    def _get_json(self, path):
+        resp = self.session.get(self.base_url + path.format(namespace=self.namespace), timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _pods_with_label(self, app_label):
+        return [
+            pod for pod in self.caches["pods"].snapshot()
+            if pod['metadata'].get('labels', {}).get('app') == app_label
+            and not pod['metadata'].get('deletionTimestamp')
+        ]
+
+    def pod_names(self, app_label):
+        return {pod['metadata']['name'] for pod in self._pods_with_label(app_label)}
+
+    def pod_objects(self, app_labels):
+        """
+        Cached Pod objects of the given apps (including terminating ones).
+        """
+        return [
+            pod for pod in self.caches["pods"].snapshot()
+            if pod['metadata'].get('labels', {}).get('app') in app_labels
+        ]
+
+    def get_pod_usage(self, app_label):
+        pod_cpu_map = {}
+        pod_memory_map = {}
+        try:
+            body = self._get_json(POD_METRICS_PATH + "?labelSelector=" + urllib.parse.quote(f"app={app_label}"))
+            for item in body.get('items', []):
+                name = item['metadata']['name']
+                containers = item.get('containers', [])
+                pod_cpu_map[name] = sum(parse_cpu_millicores(c['usage'].get('cpu', '0')) for c in containers)
+                pod_memory_map[name] = sum(parse_memory_bytes(c['usage'].get('memory', '0')) for c in containers)
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        return pod_cpu_map, pod_memory_map
+
+    def get_hpa_metrics(self, hpa_name):
+        current_replicas = 0
+        hpa_cpu = 0
+        hpa = self.caches["hpas"].get(hpa_name)
+        if hpa:
+            status = hpa.get('status', {})
+            current_replicas = status.get('currentReplicas', 0)
+            for metric in status.get('currentMetrics') or []:
+                if metric.get('type') == 'Resource' and metric['resource']['name'] == 'cpu':
+                    hpa_cpu = metric['resource'].get('current', {}).get('averageUtilization', hpa_cpu)
+
+        if current_replicas == 0:
+            app_name = hpa_name.replace("-hpa", "").replace("heath-", "")
+            current_replicas = len(self._pods_with_label(app_name))
+        return current_replicas, hpa_cpu
+
+    def get_deployment_metrics(self, deployment_name):
+        deployment = self.caches["deployments"].get(deployment_name)
+        if not deployment:
+            return 0, 0
+        status = deployment.get('status', {})
+        return status.get('replicas', 0), status.get('readyReplicas', 0)
+
+    def get_node_metrics(self):
+        nodes = self.caches["nodes"].snapshot()
+        ready = 0
+        for node in nodes:
+            for condition in node.get('status', {}).get('conditions', []):
+                if condition['type'] == 'Ready' and condition['status'] == 'True':
+                    ready += 1
+        return len(nodes), ready
+
+    def get_node_usage(self):
+        # Same as `kubectl top nodes`: usage as a percentage of allocatable CPU / memory
+        node_cpu_map = {}
+        node_memory_map = {}
+        try:
+            body = self._get_json(NODE_METRICS_PATH)
+            for item in body.get('items', []):
+                name = item['metadata']['name']
+                node = self.caches["nodes"].get(name)
+                allocatable = node['status']['allocatable'] if node else {}
+                cpu = parse_cpu_millicores(allocatable.get('cpu', '0'))
+                memory = parse_memory_bytes(allocatable.get('memory', '0'))
+                node_cpu_map[name] = int(parse_cpu_millicores(item['usage'].get('cpu', '0')) * 100 / cpu) if cpu else 0
+                if memory:
+                    node_memory_map[name] = int(parse_memory_bytes(item['usage'].get('memory', '0')) * 100 / memory)
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        return node_cpu_map, node_memory_map
+
+    def get_cadvisor_metrics(self, node):
+        try:
+            resp = self.session.get(self.base_url + CADVISOR_PATH.format(node=node), timeout=20)
+            resp.raise_for_status()
+            return resp.text
+        except requests.RequestException:
+            return ""
+
+
+# --- Fixtures: record from a live cluster, serve from disk ---
+
+def fixture_path(fixtures_dir, path, suffix=".json"):
+    """
+    Maps an API path such as /api/v1/nodes to <fixtures_dir>/api/v1/nodes.json
+    """
+    return os.path.join(fixtures_dir, *path.strip('/').split('/')) + suffix
+
+
+def record_fixtures(base_url, fixtures_dir, namespace="default"):
+    """
+    Saves one list response per resource (plus metrics.k8s.io) from a live API
+    server, e.g. a running `kubectl proxy`, for later use with serve_fixtures.
+    """
+    session = requests.Session()
+    paths = list(RESOURCE_PATHS.values()) + [POD_METRICS_PATH, NODE_METRICS_PATH]
+    for path in paths:
+        path = path.format(namespace=namespace)
+        resp = session.get(base_url.rstrip('/') + path, timeout=30)
+        resp.raise_for_status()
+        target = fixture_path(fixtures_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump(resp.json(), f, indent=2)
+        print(f"   💾 {path} -> {target}")
+
+
+def parse_label_selector(selector):
+    """
+    Equality-based label selector ("app=backend,tier!=db") as [(key, op, value)].
+    """
+    terms = []
+    for term in filter(None, (t.strip() for t in (selector or "").split(","))):
+        match = re.match(r'^([^!=]+?)\s*(==|!=|=)\s*(.*)$', term)
+        if not match:
+            raise ValueError(f"Unsupported label selector term: {term!r}")
+        key, op, value = match.groups()
+        terms.append((key.strip(), "!=" if op == "!=" else "=", value.strip()))
+    return terms
+
+
+def matches_selector(obj, terms):
+    labels = obj.get('metadata', {}).get('labels') or {}
+    return all((labels.get(key) == value) == (op == "=") for key, op, value in terms)
+
+
+def _resource_version(obj):
+    try:
+        return int(obj.get('metadata', {}).get('resourceVersion'))
+    except (TypeError, ValueError):
+        return None
+
+
+def serve_fixtures(fixtures_dir, port=0):
+    """
+    Starts a fake API server that answers list requests from <path>.json and
+    watch requests from <path>.watch.jsonl (one watch event per line).
+    Like the real API server it applies labelSelector to lists and watches, and
+    a watch only sends the events newer than its resourceVersion, so a client
+    re-watching from the last version it saw does not get the recording again.
+    Returns the running server; its URL is http://127.0.0.1:<server.server_port>.
+    """
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            parsed = urllib.parse.urlparse(self.path)
+            query = urllib.parse.parse_qs(parsed.query)
+            try:
+                selector = parse_label_selector(query.get('labelSelector', [''])[0])
+            except ValueError:
+                self._send_empty(400)
+                return
+            if query.get('watch') == ['1']:
+                self._serve_watch(parsed.path, int(query.get('timeoutSeconds', ['1'])[0]), selector,
+                                  query.get('resourceVersion', [None])[0])
+                return
+            try:
+                with open(fixture_path(fixtures_dir, parsed.path), "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                self._send_empty(404)
+                return
+            if selector:
+                data = json.loads(body)
+                data['items'] = [item for item in data.get('items', []) if matches_selector(item, selector)]
+                body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_empty(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _serve_watch(self, path, timeout_seconds, selector, resource_version):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            # The connection ends with the watch; say so, or the client pools it and reuses a closed socket
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                since = int(resource_version) if resource_version else None
+            except ValueError:
+                since = None
+            events_file = fixture_path(fixtures_dir, path, ".watch.jsonl")
+            if os.path.exists(events_file):
+                with open(events_file, "rb") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        obj = json.loads(line).get('object', {})
+                        version = _resource_version(obj)
+                        # Unversioned events only go to a watch that starts from scratch
+                        if since is not None and (version is None or version <= since):
+                            continue
+                        if selector and not matches_selector(obj, selector):
+                            continue
+                        self._write_chunk(line.rstrip(b'\n') + b'\n')
+            # Hold the watch open like a real API server, then end it cleanly
+            time.sleep(min(timeout_seconds, 1))
+            self._write_chunk(b'')
+            self.close_connection = True
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Record or serve Kubernetes API fixtures')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='Record fixtures from a live API server (e.g. kubectl proxy)')
+    rec.add_argument('fixtures_dir')
+    rec.add_argument('--api', default=None, help='API base URL (default: start kubectl proxy)')
+    srv = sub.add_parser('serve', help='Serve recorded fixtures as a fake API server')
+    srv.add_argument('fixtures_dir')
+    srv.add_argument('--port', type=int, default=8001)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        proxy = None
+        api = args.api
+        if api is None:
+            proxy, api = start_kubectl_proxy()
+        try:
+            record_fixtures(api, args.fixtures_dir)
+        finally:
+            if proxy:
+                proxy.terminate()
+    else:
+        server = serve_fixtures(args.fixtures_dir, args.port)
+        print(f"🧪 Fake API server on http://127.0.0.1:{server.server_port} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,170 @@
+import math
+import threading
+
+# Mergeable HDR-style latency histograms.
+#
+# Latencies are recorded in microseconds into log-linear buckets: values below
+# SUB_BUCKETS get one bucket each, above that every power of two is split into
+# SUB_BUCKETS / 2 linear sub-buckets, so any recorded value is reported within
+# ~0.8% (about 2 significant digits) from 1 us up to hours. Only buckets that
+# were hit are stored, so an interval costs at most one counter per request.
+# Because buckets are fixed, histograms from different intervals or different
+# Locust workers merge by adding counts, and percentiles of the merged
+# histogram are exact up to that bucket resolution (unlike averaging per-worker
+# percentiles).
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_BUCKETS = SUB_BUCKETS // 2
+
+PERCENTILES = {"p50": 50.0, "p95": 95.0, "p99": 99.0, "p999": 99.9}
+
+
+def bucket_index(value):
+    """
+    Bucket of a non-negative integer value.
+    """
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (value >> shift) - HALF_BUCKETS
+
+
+def bucket_bounds(index):
+    """
+    [lowest, highest] value that falls into a bucket.
+    """
+    if index < SUB_BUCKETS:
+        return index, index
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    mantissa = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    low = mantissa << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Sparse histogram of latencies. `record` takes milliseconds (Locust's
+    response_time); percentiles are returned in milliseconds.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.max_us = 0
+
+    def record(self, response_time_ms):
+        value = max(0, int(round(response_time_ms * 1000)))
+        idx = bucket_index(value)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other):
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def value_at_percentile(self, percentile):
+        """
+        Latency (ms) below which `percentile` % of the recorded values fall,
+        reported as the upper bound of its bucket (capped at the recorded max).
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(bucket_bounds(idx)[1], self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        """
+        Count, max and the standard percentiles, in ms, rounded for storage.
+        """
+        result = {"count": self.count, "max": round(self.max_us / 1000, 2)}
+        for key, percentile in PERCENTILES.items():
+            result[key] = round(self.value_at_percentile(percentile), 2)
+        return result
+
+    def encode(self):
+        """
+        Compact JSON form: {"n": count, "max": max_us, "b": [index, count, index, count, ...]}.
+        """
+        flat = []
+        for idx in sorted(self.counts):
+            flat += (idx, self.counts[idx])
+        return {"n": self.count, "max": self.max_us, "b": flat}
+
+    @classmethod
+    def decode(cls, data):
+        hist = cls()
+        flat = data.get("b", [])
+        hist.counts = dict(zip(flat[0::2], flat[1::2]))
+        hist.count = data.get("n", sum(hist.counts.values()))
+        hist.max_us = data.get("max", 0)
+        return hist
+
+
+class LatencyRecorder:
+    """
+    Per-endpoint histograms for the current interval. Workers `drain()` theirs to
+    the master, which `merge_encoded()`s them; the process writing the sample
+    store takes a `snapshot()` every interval.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = {}
+
+    def record(self, name, response_time_ms):
+        with self._lock:
+            hist = self._current.get(name)
+            if hist is None:
+                hist = self._current[name] = LatencyHistogram()
+            hist.record(response_time_ms)
+
+    def merge_encoded(self, encoded):
+        with self._lock:
+            for name, data in (encoded or {}).items():
+                incoming = LatencyHistogram.decode(data)
+                if name in self._current:
+                    self._current[name].merge(incoming)
+                else:
+                    self._current[name] = incoming
+
+    def drain(self):
+        """
+        Returns {name: histogram} recorded since the last drain and starts a new interval.
+        """
+        with self._lock:
+            current, self._current = self._current, {}
+        return current
+
+    def drain_encoded(self):
+        return {name: hist.encode() for name, hist in self.drain().items()}
+
+    def snapshot(self, timestamp, interval):
+        """
+        Drains the interval into one sample store record: the merged ("total")
+        summary, the p99 per endpoint, and every histogram for later merging.
+        None if nothing was recorded.
+        """
+        histograms = self.drain()
+        if not histograms:
+            return None
+        total = LatencyHistogram()
+        for hist in histograms.values():
+            total.merge(hist)
+        return {
+            "timestamp": round(timestamp, 3),
+            "interval": interval,
+            "total": total.summary(),
+            "p99": {name: round(hist.value_at_percentile(99.0), 2) for name, hist in histograms.items()},
+            "endpoints": {name: hist.encode() for name, hist in histograms.items()},
+        }
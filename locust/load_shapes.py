@@ -0,0 +1,238 @@
+import math
+import time
+
+from locust import LoadTestShape
+
+# Open-loop load profiles.
+#
+# The regular user classes are closed-loop: a user only sends its next request
+# after the previous response plus its think time, so when the backend slows
+# down (e.g. HikariCP exhaustion) the offered load silently drops and the
+# reported latencies hide the queueing ("coordinated omission").
+#
+# With a profile the target is a request *rate* instead of a user count:
+#   - an ArrivalSchedule per Locust process hands out intended send times at
+#     the profile's rate (divided across worker processes),
+#   - every user waits for its next intended send time instead of a think time,
+#   - the first request of each arrival is reported with its latency measured
+#     from the intended send time, so time spent waiting for a free user or a
+#     slow backend shows up in the percentiles,
+#   - OpenLoopShape sizes the user count (senders) from the rate.
+#
+# Profiles are given as "<name>:key=value,...", for example
+#   constant:rps=50
+#   step:start=10,step=10,every=60,steps=6
+#   spike:base=10,peak=100,at=120,length=30
+#   diurnal:low=5,high=80,period=600
+
+IDLE_STEP = 0.1  # seconds to advance the schedule while the profile rate is 0
+
+
+class RateProfile:
+    """
+    Target request rate (requests/s across all workers) over `duration` seconds.
+    """
+
+    def __init__(self, duration):
+        self.duration = float(duration)
+
+    def rate(self, t):
+        raise NotImplementedError
+
+    def peak(self, start, end, step=1.0):
+        """
+        Highest rate in [start, end], sampled every `step` seconds.
+        """
+        t, best = start, 0.0
+        while t <= end:
+            best = max(best, self.rate(t))
+            t += step
+        return best
+
+
+class ConstantRate(RateProfile):
+    def __init__(self, rps, duration):
+        super().__init__(duration)
+        self.rps = float(rps)
+
+    def rate(self, t):
+        return self.rps
+
+
+class StepRate(RateProfile):
+    """
+    `start` req/s, increased by `step` every `every` seconds, `steps` times.
+    Runs `every * (steps + 1)` seconds unless a duration is given.
+    """
+
+    def __init__(self, start, step, every, steps, duration=None):
+        super().__init__(duration if duration is not None else float(every) * (int(steps) + 1))
+        self.start, self.step, self.every, self.steps = float(start), float(step), float(every), int(steps)
+
+    def rate(self, t):
+        return self.start + self.step * min(self.steps, int(t // self.every))
+
+
+class SpikeRate(RateProfile):
+    """
+    `base` req/s with a `peak` req/s burst from `at` for `length` seconds.
+    """
+
+    def __init__(self, base, peak, at, length, duration):
+        super().__init__(duration)
+        self.base, self.peak_rps, self.at, self.length = float(base), float(peak), float(at), float(length)
+
+    def rate(self, t):
+        return self.peak_rps if self.at <= t < self.at + self.length else self.base
+
+
+class DiurnalRate(RateProfile):
+    """
+    Sinusoid between `low` and `high` req/s with a `period` in seconds, starting at `low`
+    (a compressed day/night cycle).
+    """
+
+    def __init__(self, low, high, period, duration):
+        super().__init__(duration)
+        self.low, self.high, self.period = float(low), float(high), float(period)
+
+    def rate(self, t):
+        return self.low + (self.high - self.low) * (1 - math.cos(2 * math.pi * t / self.period)) / 2
+
+
+PROFILES = {
+    "constant": ConstantRate,
+    "step": StepRate,
+    "spike": SpikeRate,
+    "diurnal": DiurnalRate,
+}
+
+
+def parse_profile(spec, duration=None):
+    """
+    Builds a RateProfile from "<name>:key=value,...". `duration` is used unless
+    the spec sets one itself.
+    """
+    name, _, params = spec.partition(":")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown load profile '{name}' (choose from {', '.join(PROFILES)})")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        kwargs[key.strip()] = float(value)
+    if duration is not None and "duration" not in kwargs and name != "step":
+        kwargs["duration"] = duration
+    try:
+        return PROFILES[name](**kwargs)
+    except TypeError as e:
+        raise ValueError(f"Bad parameters for load profile '{name}': {e}")
+
+
+class ArrivalSchedule:
+    """
+    Per-process sequence of intended send times (time.perf_counter() values),
+    evenly spaced at this process' `share` of the profile rate. The clock starts
+    at the first call to `next()`.
+    """
+
+    def __init__(self, profile, share=1.0):
+        self.profile = profile
+        self.share = share
+        self.start = None
+        self.t = 0.0
+        self.issued = 0
+
+    def next(self):
+        """
+        Returns the next intended send time, or None once the profile has ended.
+        """
+        if self.start is None:
+            self.start = time.perf_counter()
+        t = self.t
+        while True:
+            if t >= self.profile.duration:
+                return None
+            rate = self.profile.rate(t) * self.share
+            if rate > 0:
+                break
+            t += IDLE_STEP
+        self.t = t + 1 / rate
+        self.issued += 1
+        return self.start + t
+
+
+class IntendedTimeReporter:
+    """
+    Stands in for a client's request event: while an intended send time is set,
+    the next reported request gets its response_time measured from it, and the
+    part spent before the request started is added to the context as `queue_time`.
+    """
+
+    def __init__(self, request_event):
+        self.request_event = request_event
+        self.intended = None
+
+    def fire(self, **kwargs):
+        if self.intended is not None and kwargs.get("response_time") is not None:
+            total = (time.perf_counter() - self.intended) * 1000
+            queued = max(0.0, total - kwargs["response_time"])
+            kwargs["response_time"] = max(kwargs["response_time"], total)
+            kwargs["context"] = {**(kwargs.get("context") or {}), "queue_time": queued}
+            self.intended = None
+        self.request_event.fire(**kwargs)
+
+
+def open_loop_wait(schedule_for):
+    """
+    Returns a `wait_time` method that waits for the next intended send time of
+    the schedule returned by `schedule_for(environment)`.
+    """
+
+    def wait_time(self):
+        user = getattr(self, "user", self)  # called on a TaskSet inside JourneyTasks
+        client = user.client
+        if not isinstance(client.request_event, IntendedTimeReporter):
+            client.request_event = IntendedTimeReporter(client.request_event)
+        due = schedule_for(user.environment).next()
+        if due is None:
+            client.request_event.intended = None
+            return 1  # profile finished; the shape stops the test
+        client.request_event.intended = due
+        return max(0.0, due - time.perf_counter())
+
+    return wait_time
+
+
+def wait_before_first_task(on_start):
+    """
+    Wraps an `on_start` so that the first task also waits for an intended send
+    time (Locust otherwise runs it right after spawning).
+    """
+
+    def wrapped(self):
+        on_start(self)
+        self.wait()
+
+    return wrapped
+
+
+class OpenLoopShape(LoadTestShape):
+    """
+    Sizes the number of senders from the profile: `senders_per_rps` users per
+    request/s of the highest rate in the coming `lookahead` seconds. Arrivals
+    that find no idle sender are still measured from their intended time.
+    """
+
+    abstract = True
+    profile = None
+    senders_per_rps = 2.0
+    min_users = 1
+    lookahead = 10
+
+    def tick(self):
+        run_time = self.get_run_time()
+        if run_time >= self.profile.duration:
+            return None
+        peak = self.profile.peak(run_time, min(run_time + self.lookahead, self.profile.duration))
+        users = max(self.min_users, math.ceil(peak * self.senders_per_rps))
+        return users, users
@@ -1,16 +1,195 @@
-from locust import HttpUser, task, between, tag, SequentialTaskSet
+from locust import User, HttpUser, FastHttpUser, task, between, constant, tag, SequentialTaskSet, events
 from locust.exception import StopUser
+from locust.runners import MasterRunner, WorkerRunner
+import os
 import random
-import string
 import time # Added for time.sleep
 
+import catalog
+import latency_histogram
+import load_shapes
+import payloads
+import request_trace
+import sample_store
+import user_pool
+from user_pool import random_string
+
+@events.init_command_line_parser.add_listener
+def add_custom_arguments(parser):
+    parser.add_argument("--user-pool", type=str, env_var="LOCUST_USER_POOL", default="",
+                        help="JSON file of pre-seeded accounts (see user_pool.py); users check accounts out instead of registering")
+    parser.add_argument("--user-pool-shards", type=int, env_var="LOCUST_USER_POOL_SHARDS", default=1,
+                        help="Number of worker processes sharing the account file (each takes a disjoint shard)")
+    parser.add_argument("--catalog-ttl", type=int, env_var="LOCUST_CATALOG_TTL", default=catalog.DEFAULT_TTL,
+                        help="Seconds before the shared feed/recipe ID catalog is refreshed")
+    parser.add_argument("--catalog-pages", type=int, env_var="LOCUST_CATALOG_PAGES", default=catalog.DEFAULT_PAGES,
+                        help="Number of /api/feeds/recent pages read per catalog refresh")
+    parser.add_argument("--trace", type=str, env_var="LOCUST_TRACE", default="",
+                        help="JSONL request trace replayed by the Replay user classes (see request_trace.py)")
+    parser.add_argument("--trace-speed", type=float, env_var="LOCUST_TRACE_SPEED", default=1.0,
+                        help="Replay speed factor (2 = twice the recorded request rate)")
+    parser.add_argument("--trace-shards", type=int, env_var="LOCUST_TRACE_SHARDS", default=1,
+                        help="Number of worker processes sharing the trace (each replays a disjoint shard)")
+    parser.add_argument("--trace-loop", action="store_true", env_var="LOCUST_TRACE_LOOP", default=False,
+                        help="Start the trace over when it ends instead of stopping the replay users")
+    parser.add_argument("--arrival-shards", type=int, env_var="LOCUST_ARRIVAL_SHARDS", default=1,
+                        help="Number of worker processes sharing the open-loop arrival rate (see load_shapes.py)")
+    parser.add_argument("--sample-store", type=str, env_var="LOCUST_SAMPLE_STORE", default="",
+                        help="run_hpa.py sample store directory to write per-interval latency histograms to")
+    parser.add_argument("--latency-interval", type=float, env_var="LOCUST_LATENCY_INTERVAL", default=5,
+                        help="Seconds between latency histogram snapshots")
+    parser.add_argument("--photo-sizes", type=str, env_var="LOCUST_PHOTO_SIZES", default=payloads.DEFAULT_PHOTO_SIZES,
+                        help="Photo size classes and weights for recipes / interest forms, e.g. none:10,20k:30,1m:15 "
+                             "(default: the fixed 1x1 GIF placeholder payloads)")
+    parser.add_argument("--ingredients", type=str, env_var="LOCUST_INGREDIENTS", default=payloads.DEFAULT_INGREDIENTS,
+                        help="Ingredient count range per recipe (min-max), with --photo-sizes")
+    parser.add_argument("--instruction-steps", type=str, env_var="LOCUST_INSTRUCTION_STEPS", default=payloads.DEFAULT_STEPS,
+                        help="Instruction step count range per recipe (min-max), with --photo-sizes")
+    parser.add_argument("--step-words", type=str, env_var="LOCUST_STEP_WORDS", default=payloads.DEFAULT_STEP_WORDS,
+                        help="Words per instruction step (min-max), with --photo-sizes")
+
 # --- Helper Functions ---
-def random_string(length=8):
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
+account_pool = None
+
+def get_account_pool(environment):
+    # Loaded lazily: on workers the worker index is only known once the master has acked us
+    global account_pool
+    options = environment.parsed_options
+    if account_pool is None and options and options.user_pool:
+        shard = getattr(environment.runner, "worker_index", 0) or 0
+        account_pool = user_pool.AccountPool.from_file(options.user_pool, shard, options.user_pool_shards)
+        account_pool.start_refresher(set_auth_token)
+    return account_pool
+
+id_catalog = None
+
+def get_id_catalog(environment):
+    # One catalog per Locust process, shared by every social / journey user in it
+    global id_catalog
+    if id_catalog is None:
+        options = environment.parsed_options
+        id_catalog = catalog.IdCatalog(
+            ttl=getattr(options, "catalog_ttl", catalog.DEFAULT_TTL),
+            pages=getattr(options, "catalog_pages", catalog.DEFAULT_PAGES)
+        )
+    return id_catalog
+
+trace_replayer = None
+
+def get_trace_replayer(environment):
+    # One replayer per process; like the account pool, workers take disjoint shards
+    global trace_replayer
+    options = environment.parsed_options
+    if trace_replayer is None and options and options.trace:
+        shard = getattr(environment.runner, "worker_index", 0) or 0
+        trace_replayer = request_trace.TraceReplayer(
+            options.trace, options.trace_speed, shard, options.trace_shards, options.trace_loop
+        )
+    return trace_replayer
+
+@events.test_stop.add_listener
+def print_replay_summary(environment, **kwargs):
+    if trace_replayer:
+        print(trace_replayer.summary())
+
+arrival_schedule = None
+
+def get_arrival_schedule(environment):
+    # Each process sends its 1/shards share of the profile rate
+    global arrival_schedule
+    if arrival_schedule is None:
+        shards = getattr(environment.parsed_options, "arrival_shards", 1) or 1
+        arrival_schedule = load_shapes.ArrivalSchedule(LOAD_PROFILE, 1 / shards)
+    return arrival_schedule
+
+payload_factory = None
+
+def get_payload_factory(environment):
+    # Photos are generated once per process and shared by all of its users
+    global payload_factory
+    if payload_factory is None:
+        options = environment.parsed_options
+        payload_factory = payloads.PayloadFactory(
+            photo_sizes=getattr(options, "photo_sizes", payloads.DEFAULT_PHOTO_SIZES),
+            ingredients=getattr(options, "ingredients", payloads.DEFAULT_INGREDIENTS),
+            steps=getattr(options, "instruction_steps", payloads.DEFAULT_STEPS),
+            step_words=getattr(options, "step_words", payloads.DEFAULT_STEP_WORDS),
+        )
+    return payload_factory
+
+@events.init.add_listener
+def prepare_payloads(environment, **kwargs):
+    # Generate the photos before the ramp rather than inside the first user's task
+    if not isinstance(environment.runner, MasterRunner):
+        get_payload_factory(environment)
+
+# --- Latency Histograms ---
+# Every request is recorded into a per-endpoint histogram. Workers ship theirs to
+# the master with each stats report; the master (or the single local process)
+# writes one merged snapshot per interval to the "latency" stream of the store.
+# Requests that carried a generated payload are also grouped by payload size
+# class ("payloads" stream, summary table at the end of the run).
+latency_recorder = latency_histogram.LatencyRecorder()
+payload_stats = payloads.PayloadStats()
+
+@events.request.add_listener
+def record_latency(name, response_time, context=None, **kwargs):
+    if response_time is not None:
+        latency_recorder.record(name, response_time)
+        if context and "payload_class" in context:
+            payload_stats.record(name, context, response_time)
+
+@events.report_to_master.add_listener
+def send_latency_histograms(client_id, data):
+    data["latency_histograms"] = latency_recorder.drain_encoded()
+    data["payload_stats"] = payload_stats.drain_encoded()
+
+@events.worker_report.add_listener
+def merge_latency_histograms(client_id, data):
+    latency_recorder.merge_encoded(data.get("latency_histograms"))
+    payload_stats.merge_encoded(data.get("payload_stats"))
 
-def get_placeholder_image():
-    # 1x1 Pixel Black Transparent GIF (Smallest valid image)
-    return "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs="
+@events.quitting.add_listener
+def print_payload_summary(environment, **kwargs):
+    if not isinstance(environment.runner, WorkerRunner):
+        print(payload_stats.format_summary())
+
+@events.init.add_listener
+def start_latency_snapshots(environment, **kwargs):
+    options = environment.parsed_options
+    if not options or not options.sample_store or isinstance(environment.runner, WorkerRunner):
+        return
+    import gevent
+
+    store = sample_store.SampleStore(options.sample_store)
+
+    def write_snapshot():
+        record = latency_recorder.snapshot(time.time(), options.latency_interval)
+        if record:
+            store.append("latency", record)
+        record = payload_stats.snapshot(time.time(), options.latency_interval)
+        if record:
+            store.append("payloads", record)
+
+    def snapshot_loop():
+        while True:
+            gevent.sleep(options.latency_interval)
+            write_snapshot()
+
+    snapshots = gevent.spawn(snapshot_loop)
+
+    @events.quitting.add_listener
+    def close_latency_store(environment, **kwargs):
+        snapshots.kill()
+        write_snapshot()
+        store.close()
+
+def set_auth_token(user, token):
+    # FastHttpSession has no requests-style header dict; it sends auth_header on every request
+    if isinstance(user, FastHttpUser):
+        user.client.auth_header = f"Bearer {token}"
+    else:
+        user.client.headers.update({"Authorization": f"Bearer {token}"})
 
 def register_and_login(user):
     user.username = f"user_{random_string()}@test.com"
@@ -29,20 +208,12 @@ def register_and_login(user):
         if response.status_code == 200:
             token = response.json().get("accessToken")
             if token:
-                user.client.headers.update({"Authorization": f"Bearer {token}"})
+                set_auth_token(user, token)
                 
                 # Submit Interest Form (Required for new users)
-                interest_payload = {
-                    "name": f"User_{random_string(4)}",
-                    "surname": f"Surname_{random_string(4)}",
-                    "dateOfBirth": "1995-05-15",
-                    "height": random.randint(160, 190),
-                    "weight": round(random.uniform(55.0, 90.0), 1),
-                    "gender": random.choice(["Male", "Female"]),
-                    "profilePhoto": get_placeholder_image() # Sending a valid Base64 image
-                }
-                
-                with user.client.post("/api/interest-form/submit", json=interest_payload, catch_response=True, name="/api/interest-form/submit") as form_response:
+                factory = get_payload_factory(user.environment)
+                form = factory.interest_form(f"User_{random_string(4)}", f"Surname_{random_string(4)}")
+                with user.client.post("/api/interest-form/submit", data=form.body, headers=factory.headers, context=form.context(), catch_response=True, name="/api/interest-form/submit") as form_response:
                     if form_response.status_code != 200:
                         form_response.failure(f"Interest Form submission failed: {form_response.text}")
                         return False
@@ -52,13 +223,43 @@ def register_and_login(user):
             response.failure(f"Login failed: {response.text}")
             return False
 
+def login_user(user):
+    """
+    Takes a pre-seeded account from the pool when one is configured,
+    otherwise registers a fresh user.
+    """
+    pool = get_account_pool(user.environment)
+    account = pool.checkout(user) if pool else None
+    if account:
+        user.account = account
+        user.username = account["username"]
+        user.password = account["password"]
+        set_auth_token(user, account["accessToken"])
+        return True
+    return register_and_login(user)
+
+def release_account(user):
+    account = getattr(user, "account", None)
+    if account and account_pool:
+        account_pool.checkin(account)
+        user.account = None
+
+@events.quitting.add_listener
+def save_account_pool(environment, **kwargs):
+    # Tokens refreshed since the refresher's last save
+    if account_pool:
+        account_pool.save()
+
 # --- Standard User Classes ---
+# Each behaviour is an abstract User holding the tasks, combined below with either
+# HttpUser (python-requests) or FastHttpUser (geventhttpclient, much cheaper per request).
 
-class PublicUser(HttpUser):
+class PublicTasks(User):
     """
     Simulates unauthenticated traffic.
     Focus: Network, LoadBalancer, Auth Service resilience.
     """
+    abstract = True
     wait_time = between(1, 3)
 
     @tag('public', 'db_read')
@@ -79,18 +280,24 @@ class PublicUser(HttpUser):
                 # If it lets us in or errors out 500, that's a failure
                 response.failure(f"Bad login expected 4xx, got {response.status_code}")
 
-class AuthenticatedUser(HttpUser):
+class AuthenticatedTasks(User):
     """
     Simulates standard authenticated behavior.
     Focus: Auth (CPU), General Reads/Writes, API Logic.
     """
+    abstract = True
     wait_time = between(2, 5)
     
     def on_start(self):
         # Retry loop instead of quitting
-        while not register_and_login(self):
+        while not login_user(self):
             time.sleep(5) # Wait 5 seconds and try again
             # raise StopUser()  <-- COMMENT THIS OUT
+        self.catalog = get_id_catalog(self.environment)
+        self.catalog.attach(self)
+
+    def on_stop(self):
+        release_account(self)
 
     @tag('read', 'db_read_complex')
     @task(3)
@@ -102,69 +309,43 @@ class AuthenticatedUser(HttpUser):
     @tag('read', 'db_read_single')
     @task(2)
     def view_random_recipe_details(self):
-        # First get a list to find an ID (simulating user browsing)
-        with self.client.get("/api/recipe/get-all", catch_response=True, name="/api/recipe/get-all [Setup]") as response:
-            if response.status_code == 200:
-                try:
-                    recipes = response.json()
-                    if recipes:
-                        target = random.choice(recipes)
-                        # Nested with-block for the second request
-                        with self.client.get(f"/api/recipe/get?recipeId={target['id']}", catch_response=True, name="/api/recipe/get [Single Read]") as detail_response:
-                             if detail_response.status_code != 200:
-                                 detail_response.failure(f"Failed to get recipe details: {detail_response.status_code}")
-                except Exception as e:
-                    response.failure(f"Failed to parse JSON: {e}")
-            else:
-                 response.failure(f"Failed to get recipe list: {response.status_code}")
+        # The ID comes from the shared catalog instead of a get-all per request
+        recipe_id = self.catalog.recipe_id(self)
+        if recipe_id is None:
+            return
+        with self.client.get(f"/api/recipe/get?recipeId={recipe_id}", catch_response=True, name="/api/recipe/get [Single Read]") as detail_response:
+             if detail_response.status_code != 200:
+                 detail_response.failure(f"Failed to get recipe details: {detail_response.status_code}")
 
     @tag('write', 'db_write')
     @task(1)
     def create_recipe(self):
-        payload = {
-            "title": f"Recipe {random_string()}",
-            "instructions": ["Mix ingredients", "Bake at 350F", "Serve warm"],
-            "ingredients": [
-                {"name": "Flour", "amount": 200, "unit": "g"},
-                {"name": "Sugar", "amount": 100, "unit": "g"}
-            ],
-            "tag": "Test",
-            "type": random.choice(["Lunch", "Dinner", "Dessert"]),
-            "photo": get_placeholder_image(),
-            "totalCalorie": random.randint(100, 800),
-            "price": round(random.uniform(5.0, 50.0), 2)
-        }
-        with self.client.post("/api/recipe/create", json=payload, catch_response=True, name="/api/recipe/create [DB Write]") as response:
+        # Photo size, ingredient count and instruction length drawn from the payload distributions
+        factory = get_payload_factory(self.environment)
+        payload = factory.recipe(f"Recipe {random_string()}")
+        with self.client.post("/api/recipe/create", data=payload.body, headers=factory.headers, context=payload.context(), catch_response=True, name="/api/recipe/create [DB Write]") as response:
             if response.status_code != 200:
                 response.failure(f"Failed to create recipe: {response.status_code}")
 
-class SocialUser(HttpUser):
+class SocialTasks(User):
     """
     Simulates social interactions.
     Focus: High concurrency DB updates (Locking), Foreign Key checks.
     """
+    abstract = True
     wait_time = between(1, 3)
-    feed_ids = []
 
     def on_start(self):
-        if not register_and_login(self):
+        if not login_user(self):
             raise StopUser()  # Stop user if registration/login fails
-        # Fetch recent feeds to populate local cache of IDs
-        self.refresh_feeds()
-            
-    def refresh_feeds(self):
-        with self.client.get("/api/feeds/recent?pageNumber=0", catch_response=True, name="/api/feeds/recent [Setup]") as response:
-            if response.status_code == 200:
-                try:
-                    feeds = response.json()
-                    # Extract IDs safely
-                    self.feed_ids = [f['id'] for f in feeds if isinstance(f, dict) and 'id' in f]
-                    
-                    # Fallback if empty
-                    if not self.feed_ids:
-                        self.create_fallback_feed()
-                except:
-                    pass
+        # Feed IDs come from the per-process catalog (loaded once, refreshed once older than its TTL)
+        self.catalog = get_id_catalog(self.environment)
+        self.catalog.attach(self)
+        if not self.catalog.feed_ids:
+            self.create_fallback_feed()
+
+    def on_stop(self):
+        release_account(self)
 
     def create_fallback_feed(self):
         payload = {
@@ -178,20 +359,15 @@ class SocialUser(HttpUser):
             "price": 10.0
         }
         self.client.post("/api/recipe/create", json=payload, name="/api/recipe/create [Fallback]")
-        # Try fetching again briefly
-        response = self.client.get("/api/feeds/recent?pageNumber=0", name="/api/feeds/recent [Retry]")
-        if response.status_code == 200:
-             feeds = response.json()
-             self.feed_ids = [f['id'] for f in feeds if isinstance(f, dict) and 'id' in f]
+        # Reload the catalog right away so the new feed can be used
+        self.catalog.refresh(self.client)
 
     @tag('social', 'db_lock')
     @task(4)
     def like_feed(self):
-        if not self.feed_ids: 
-            self.refresh_feeds()
-            if not self.feed_ids: return
+        feed_id = self.catalog.feed_id(self)
+        if feed_id is None: return
 
-        feed_id = random.choice(self.feed_ids)
         with self.client.post("/api/feeds/like", json={"feedId": feed_id}, catch_response=True, name="/api/feeds/like [DB Update]") as response:
              if response.status_code != 200:
                  response.failure(f"Failed to like feed: {response.status_code}")
@@ -199,11 +375,9 @@ class SocialUser(HttpUser):
     @tag('social', 'db_write')
     @task(2)
     def comment_feed(self):
-        if not self.feed_ids: 
-            self.refresh_feeds()
-            if not self.feed_ids: return
+        feed_id = self.catalog.feed_id(self)
+        if feed_id is None: return
 
-        feed_id = random.choice(self.feed_ids)
         msg = random.choice(["Great!", "Yummy!", "Nice photo", "Will try this"])
         with self.client.post("/api/feeds/comment", json={"feedId": feed_id, "message": msg}, catch_response=True, name="/api/feeds/comment [DB Write]") as response:
              if response.status_code != 200:
@@ -212,10 +386,10 @@ class SocialUser(HttpUser):
     @tag('social', 'db_read')
     @task(1)
     def view_feed_comments(self):
-        if not self.feed_ids: return
+        feed_id = self.catalog.feed_id(self)
+        if feed_id is None: return
         # Assuming there is an endpoint to view details/comments, typically getting the feed again or a specific comments endpoint
         # If no specific comments endpoint, we re-fetch the feed which likely joins comments
-        feed_id = random.choice(self.feed_ids)
         # Note: Adjust endpoint if a specific /comments endpoint exists. 
         # For now, we assume getting the recipe/feed details loads comments.
         # Check backend: usually /api/recipe/get?recipeId=... or similar
@@ -230,11 +404,10 @@ class JourneyTaskSet(SequentialTaskSet):
     """
     @task
     def browse_feeds(self):
-        with self.client.get("/api/recipe/get-all", catch_response=True, name="/api/recipe/get-all [Journey]") as response:
-            if response.status_code == 200:
-                recipes = response.json()
-                if recipes:
-                    self.parent.target_recipe_id = recipes[0]['id']
+        # Picks the recipe to follow from the shared catalog instead of a get-all per journey
+        recipe_id = self.parent.catalog.recipe_id(self.parent)
+        if recipe_id is not None:
+            self.parent.target_recipe_id = recipe_id
 
     @task
     def view_details(self):
@@ -253,14 +426,124 @@ class JourneyTaskSet(SequentialTaskSet):
         with self.client.get("/api/saved-recipes/get-all", catch_response=True, name="/api/saved-recipes/get-all [Journey]") as response:
              pass
 
-class JourneyUser(HttpUser):
+class JourneyTasks(User):
     """
     Simulates a full user flow: Browse -> View -> Save -> View Saved.
     Focus: End-to-end latency and system cohesion.
     """
+    abstract = True
     wait_time = between(2, 5)
     tasks = [JourneyTaskSet]
     
     def on_start(self):
-        if not register_and_login(self):
+        if not login_user(self):
             raise StopUser()  # Stop user if registration/login fails
+        self.catalog = get_id_catalog(self.environment)
+        self.catalog.attach(self)
+
+    def on_stop(self):
+        release_account(self)
+
+
+class ReplayTasks(User):
+    """
+    Replays a recorded request trace open-loop: every record is sent at its
+    recorded offset (scaled by --trace-speed) instead of after a think time.
+    Run enough users that they are mostly idle, otherwise sends fall behind
+    schedule (reported as late in the replay summary).
+    """
+    abstract = True
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.replayer = get_trace_replayer(self.environment)
+        if self.replayer is None:
+            print("   ⚠️  Replay users need --trace")
+            raise StopUser()
+        if not login_user(self):
+            raise StopUser()  # Stop user if registration/login fails
+        self.catalog = get_id_catalog(self.environment)
+        self.catalog.attach(self)
+
+    def on_stop(self):
+        release_account(self)
+
+    @task
+    def replay_next(self):
+        item = self.replayer.next()
+        if item is None:
+            raise StopUser()  # Trace shard exhausted
+        due, record = item
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        ids = {k: v for k, v in (("feedId", self.catalog.feed_id(self)), ("recipeId", self.catalog.recipe_id(self))) if v is not None}
+        try:
+            path = request_trace.fill_placeholders(record["path"], ids)
+            body = record.get("body")
+            if body is None and record.get("body_shape") in request_trace.BODY_SHAPES:
+                body = request_trace.BODY_SHAPES[record["body_shape"]](ids)
+            body = request_trace.fill_placeholders(body, ids)
+        except KeyError:
+            self.replayer.skipped += 1  # Needs an ID the catalog does not have (yet)
+            return
+
+        self.replayer.record_send(due)
+        with self.client.request(record["method"], path, json=body, catch_response=True, name=request_trace.request_name(record)) as response:
+            if response.status_code >= 400:
+                response.failure(f"Replay got {response.status_code}")
+
+
+class PublicUser(PublicTasks, HttpUser):
+    pass
+
+class AuthenticatedUser(AuthenticatedTasks, HttpUser):
+    pass
+
+class SocialUser(SocialTasks, HttpUser):
+    pass
+
+class JourneyUser(JourneyTasks, HttpUser):
+    pass
+
+class ReplayUser(ReplayTasks, HttpUser):
+    pass
+
+# --- FastHttpUser Variants (same tasks, weights, tags and request names) ---
+
+class FastPublicUser(PublicTasks, FastHttpUser):
+    pass
+
+class FastAuthenticatedUser(AuthenticatedTasks, FastHttpUser):
+    pass
+
+class FastSocialUser(SocialTasks, FastHttpUser):
+    pass
+
+class FastJourneyUser(JourneyTasks, FastHttpUser):
+    pass
+
+class FastReplayUser(ReplayTasks, FastHttpUser):
+    pass
+
+
+# --- Open-loop Load Profiles ---
+# The profile is read from the environment because the shape class must exist
+# when Locust imports this file (run_hpa.py --load-profile sets it). With a
+# profile every behaviour waits for intended send times instead of think times.
+
+LOAD_PROFILE_SPEC = os.environ.get("LOCUST_LOAD_PROFILE", "")
+
+if LOAD_PROFILE_SPEC:
+    LOAD_PROFILE = load_shapes.parse_profile(
+        LOAD_PROFILE_SPEC, float(os.environ.get("LOCUST_LOAD_PROFILE_DURATION", 600))
+    )
+
+    for behaviour in (PublicTasks, AuthenticatedTasks, SocialTasks, JourneyTasks):
+        behaviour.wait_time = load_shapes.open_loop_wait(get_arrival_schedule)
+        behaviour.on_start = load_shapes.wait_before_first_task(behaviour.on_start)
+
+    class OpenLoopLoadShape(load_shapes.OpenLoopShape):
+        profile = LOAD_PROFILE
+        senders_per_rps = float(os.environ.get("LOCUST_SENDERS_PER_RPS", load_shapes.OpenLoopShape.senders_per_rps))
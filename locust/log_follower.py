@@ -0,0 +1,142 @@
+import collections
+import datetime
+import re
+import subprocess
+import threading
+import time
+
+# Long-lived `kubectl logs -f` follower for HikariCP pool statistics.
+#
+# One follower process per backend pod tails its log continuously; every
+# `HikariPool ... (total=, active=, idle=, waiting=)` line is parsed once as it
+# arrives and pushed into a bounded ring buffer that the sampler drains each tick.
+# Compared to re-fetching `--since` windows, no line is counted twice, none is
+# lost when a tick overruns, and new pods are picked up as soon as they appear.
+# When a stream breaks (API server hiccup, container restart) the pod is
+# re-attached from the timestamp of its last event (--since-time, whole
+# seconds), and the lines up to that event are skipped as already seen.
+
+HIKARI_PATTERN = re.compile(
+    r'HikariPool.*\(total=(\d+), active=(\d+), idle=(\d+), waiting=(\d+)\)'
+)
+TIMESTAMP_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?Z?\s')
+
+DEFAULT_CAPACITY = 50000  # events kept between two drains before the oldest are dropped
+
+
+def parse_hikari_line(line):
+    """
+    Parses one `kubectl logs --timestamps` line.
+    Returns: (epoch_seconds, {"total", "active", "idle", "waiting"}) or None
+    """
+    if "HikariPool" not in line:
+        return None
+    match = HIKARI_PATTERN.search(line)
+    if not match:
+        return None
+    ts_match = TIMESTAMP_PATTERN.match(line)
+    if ts_match:
+        ts = datetime.datetime.strptime(ts_match.group(1), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=datetime.timezone.utc)
+        timestamp = ts.timestamp() + float(ts_match.group(2) or 0)
+    else:
+        timestamp = time.time()
+    total, active, idle, waiting = (int(g) for g in match.groups())
+    return timestamp, {"total": total, "active": active, "idle": idle, "waiting": waiting}
+
+
+def list_pods_kubectl(app_label):
+    """
+    Returns the names of the pods with label app={app_label}.
+    """
+    cmd = ["kubectl", "get", "pods", "-l", f"app={app_label}", "-o", "jsonpath={.items[*].metadata.name}"]
+    try:
+        output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode('utf-8')
+        return set(output.split())
+    except Exception:
+        return set()
+
+
+class HikariLogFollower:
+    """
+    Tails the logs of every pod with label app={app_label} and collects HikariCP
+    pool events. Call start(), drain() once per sample and stop() at the end.
+    """
+
+    def __init__(self, app_label="backend", capacity=DEFAULT_CAPACITY, pod_lister=None, discovery_interval=5):
+        self.app_label = app_label
+        self.events = collections.deque(maxlen=capacity)
+        self.dropped = 0
+        self.pod_lister = pod_lister or (lambda: list_pods_kubectl(app_label))
+        self.discovery_interval = discovery_interval
+        self._followers = {}  # pod_name -> Popen
+        self._resume_from = {}  # pod_name -> epoch seconds of the last event (or attach) of a broken stream
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._discover_loop, daemon=True, name=f"logs-{self.app_label}").start()
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            procs = list(self._followers.values())
+            self._followers.clear()
+        for proc in procs:
+            proc.terminate()
+
+    def drain(self):
+        """
+        Removes and returns every buffered event, oldest first.
+        """
+        drained = []
+        try:
+            while True:
+                drained.append(self.events.popleft())
+        except IndexError:
+            pass
+        return drained
+
+    def _discover_loop(self):
+        while not self._stopped.is_set():
+            for pod_name in self.pod_lister():
+                with self._lock:
+                    if pod_name in self._followers or self._stopped.is_set():
+                        continue
+                    after = self._resume_from.get(pod_name)
+                    if after is None:
+                        # --since=1s: only new lines, history before we started is not ours
+                        since = "--since=1s"
+                    else:
+                        since = "--since-time=" + datetime.datetime.fromtimestamp(
+                            int(after), datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                    proc = subprocess.Popen(
+                        ["kubectl", "logs", "-f", pod_name, "--timestamps", since],
+                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                    )
+                    self._followers[pod_name] = proc
+                threading.Thread(target=self._follow, args=(pod_name, proc, after), daemon=True).start()
+            self._stopped.wait(self.discovery_interval)
+
+    def _follow(self, pod_name, proc, after=None):
+        """
+        Collects the events of one stream. `after`: epoch seconds up to which the
+        events were already collected from an earlier stream of the pod.
+        """
+        last = after if after is not None else time.time() - 1
+        for raw in proc.stdout:
+            parsed = parse_hikari_line(raw.decode('utf-8', errors='ignore'))
+            if parsed is None:
+                continue
+            timestamp, stats = parsed
+            if after is not None and timestamp <= after:
+                continue
+            last = max(last, timestamp)
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append({"timestamp": timestamp, "pod": pod_name, **stats})
+        proc.wait()
+        # Pod terminated (or stream broke): forget it so discovery can re-attach if it is still there
+        with self._lock:
+            if self._followers.get(pod_name) is proc:
+                del self._followers[pod_name]
+                self._resume_from[pod_name] = last
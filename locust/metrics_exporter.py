@@ -0,0 +1,289 @@
+import argparse
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sample_store
+from latency_histogram import LatencyHistogram, bucket_bounds
+
+# OpenMetrics exporter for the harness: serves the latest K8s / HikariCP
+# samples, the live Locust stats and cumulative request latency histograms on
+# /metrics, so a Prometheus-compatible scraper can keep every run without the
+# HTML reports.
+#
+# run_hpa.py (--metrics-port) feeds the K8s, DB pool and Locust records through
+# the sample store listener hook. The latency histograms are written by the
+# Locust process into the same store and are followed from disk
+# (sample_store.StreamFollower). Updates only replace a few values under a lock;
+# the exposition text is built when a scrape arrives, so a slow scraper never
+# holds up the sampler.
+#
+# Standalone, following a running (or finished) store:
+#   python metrics_exporter.py --store results_hpa/samples_20250101_120000 --port 9464
+#   curl -H 'Accept: application/openmetrics-text' localhost:9464/metrics
+
+DEFAULT_PORT = 9464
+PREFIX = "heath"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+FOLLOW_INTERVAL = 2.0  # seconds between reads of streams followed from disk
+FOLLOWED_STREAMS = ("k8s", "db_pool", "locust", "latency")
+
+# Histogram bucket bounds (seconds); HDR buckets are folded into these
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LOCUST_GAUGES = {
+    "users": ("locust_users", "Simulated users"),
+    "rps": ("locust_requests_per_second", "Requests per second (Locust window)"),
+    "fps": ("locust_failures_per_second", "Failed requests per second (Locust window)"),
+}
+LOCUST_QUANTILES = {"p50": "0.5", "p95": "0.95", "p99": "0.99"}
+LOCUST_COUNTERS = {
+    "requests": ("locust_requests", "Requests sent by Locust"),
+    "failures": ("locust_failures", "Failed requests reported by Locust"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return int(value)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+class EndpointHistogram:
+    """
+    Cumulative latency histogram of one endpoint on the fixed LATENCY_BUCKETS.
+    The sum is estimated from the HDR bucket midpoints (within ~0.8%).
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def add(self, hist):
+        for idx, n in hist.counts.items():
+            low, high = bucket_bounds(idx)
+            seconds = high / 1e6
+            slot = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+            self.buckets[slot] += n
+            self.sum += n * (low + high) / 2e6
+        self.count += hist.count
+
+
+class MetricsExporter:
+    """
+    Latest values per metric family plus the latency histograms, rendered as
+    OpenMetrics text on each scrape.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, host="127.0.0.1", run=None):
+        self.port = port
+        self.host = host
+        self.const_labels = {"run": run} if run else {}
+        self._lock = threading.Lock()
+        self._gauges = {}  # family -> (help, {label tuple: value})
+        self._counters = {}
+        self._histograms = {}  # endpoint -> EndpointHistogram
+        self._followers = []
+        self._stop = threading.Event()
+        self._server = None
+
+    # --- Updates (sampler side) ---
+
+    def _set(self, table, family, help_text, labels, value):
+        value = _number(value)
+        if value is None:
+            return
+        table.setdefault(family, (help_text, {}))[1][tuple(sorted(labels.items()))] = value
+
+    def _replace(self, family, help_text, match, values):
+        """
+        Replaces every series of `family` whose labels contain `match`, so pods
+        or nodes that went away stop being exported.
+        """
+        series = self._gauges.setdefault(family, (help_text, {}))[1]
+        for key in [k for k in series if set(match.items()) <= set(k)]:
+            del series[key]
+        for labels, value in values:
+            self._set(self._gauges, family, help_text, {**match, **labels}, value)
+
+    def observe(self, stream, record):
+        """
+        Sample store listener: takes the values of one record.
+        """
+        with self._lock:
+            if stream == "k8s":
+                self._observe_k8s(record)
+            elif stream == "db_pool":
+                for state in ("total", "active", "idle", "waiting"):
+                    self._set(self._gauges, "hikari_connections", "HikariCP pool connections by state",
+                              {"state": state}, record.get(state))
+            elif stream == "locust":
+                self._observe_locust(record)
+            elif stream == "latency":
+                for name, encoded in (record.get("endpoints") or {}).items():
+                    hist = self._histograms.get(name)
+                    if hist is None:
+                        hist = self._histograms[name] = EndpointHistogram()
+                    hist.add(LatencyHistogram.decode(encoded))
+            else:
+                return
+            if "timestamp" in record:
+                self._set(self._gauges, "last_sample_timestamp_seconds", "Time of the latest sample per stream",
+                          {"stream": stream}, record["timestamp"])
+
+    def _observe_k8s(self, record):
+        for deployment in ("backend", "frontend"):
+            data = record.get(deployment) or {}
+            labels = {"deployment": deployment}
+            self._set(self._gauges, "hpa_cpu_percent", "HPA current CPU utilization", labels, data.get("hpa_cpu"))
+            self._set(self._gauges, "deployment_replicas_desired", "Desired replicas", labels, data.get("desired_replicas"))
+            self._set(self._gauges, "deployment_replicas_ready", "Ready replicas", labels, data.get("ready_replicas"))
+            self._replace("pod_cpu_millicores", "CPU usage per pod (metrics API)", labels,
+                          [({"pod": pod}, value) for pod, value in (data.get("pods") or {}).items()])
+            self._replace("pod_memory_working_set_bytes", "Memory working set per pod (metrics API)", labels,
+                          [({"pod": pod}, value * 1024 ** 2) for pod, value in (data.get("memory") or {}).items()])
+            self._replace("pod_memory_limit_percent", "Memory working set as % of the pod's limit", labels,
+                          [({"pod": pod}, value) for pod, value in (data.get("memory_limit_pct") or {}).items()])
+            self._replace("pod_cpu_throttled_percent", "Share of CFS periods throttled since the previous sample", labels,
+                          [({"pod": pod}, value) for pod, value in (data.get("throttled") or {}).items()])
+        nodes = record.get("nodes") or {}
+        self._set(self._gauges, "nodes", "Cluster nodes", {"condition": "total"}, nodes.get("total"))
+        self._set(self._gauges, "nodes", "Cluster nodes", {"condition": "ready"}, nodes.get("ready"))
+        self._replace("node_cpu_percent", "CPU utilization per node", {},
+                      [({"node": node}, value) for node, value in (nodes.get("cpu_utilization") or {}).items()])
+        self._replace("node_memory_percent", "Memory utilization per node", {},
+                      [({"node": node}, value) for node, value in (nodes.get("memory_utilization") or {}).items()])
+        self._set(self._gauges, "k8s_sample_duration_seconds", "Time taken to collect the latest K8s sample", {},
+                  record.get("collection_latency"))
+
+    def _observe_locust(self, record):
+        for key, (family, help_text) in LOCUST_GAUGES.items():
+            self._set(self._gauges, family, help_text, {}, record.get(key))
+        for key, quantile in LOCUST_QUANTILES.items():
+            value = record.get(key)
+            self._set(self._gauges, "locust_response_time_seconds", "Response time percentiles (Locust window)",
+                      {"quantile": quantile}, value / 1000 if value is not None else None)
+        for key, (family, help_text) in LOCUST_COUNTERS.items():
+            self._set(self._counters, family, help_text, {}, record.get(key))
+
+    # --- Exposition (scrape side) ---
+
+    def render(self):
+        with self._lock:
+            gauges = {family: (h, dict(series)) for family, (h, series) in self._gauges.items()}
+            counters = {family: (h, dict(series)) for family, (h, series) in self._counters.items()}
+            histograms = {name: (list(h.buckets), h.count, h.sum) for name, h in self._histograms.items()}
+        const = self.const_labels
+        lines = []
+        if const:
+            lines += [f"# TYPE {PREFIX}_run info", f"# HELP {PREFIX}_run Run this exporter reports on",
+                      f"{PREFIX}_run_info{_labels(const)} 1"]
+        for family, (help_text, series) in sorted(gauges.items()):
+            lines += [f"# TYPE {PREFIX}_{family} gauge", f"# HELP {PREFIX}_{family} {help_text}"]
+            lines += [f"{PREFIX}_{family}{_labels({**const, **dict(key)})} {value}" for key, value in sorted(series.items())]
+        for family, (help_text, series) in sorted(counters.items()):
+            lines += [f"# TYPE {PREFIX}_{family} counter", f"# HELP {PREFIX}_{family} {help_text}"]
+            lines += [f"{PREFIX}_{family}_total{_labels({**const, **dict(key)})} {value}" for key, value in sorted(series.items())]
+        if histograms:
+            family = f"{PREFIX}_request_latency_seconds"
+            lines += [f"# TYPE {family} histogram", f"# HELP {family} Request latency per endpoint (HDR histograms from Locust)",
+                      f"# UNIT {family} seconds"]
+            for name, (buckets, count, total) in sorted(histograms.items()):
+                labels = {**const, "endpoint": name}
+                cumulative = 0
+                for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    cumulative += n
+                    lines.append(f"{family}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{family}_count{_labels(labels)} {count}")
+                lines.append(f"{family}_sum{_labels(labels)} {round(total, 6)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    # --- Server ---
+
+    def follow(self, directory, streams):
+        """
+        Follows `streams` of a store written by another process.
+        """
+        self._followers += [(stream, sample_store.StreamFollower(directory, stream)) for stream in streams]
+
+    def _follow_loop(self):
+        while not self._stop.is_set():
+            for stream, follower in self._followers:
+                try:
+                    for record in follower.read_new():
+                        self.observe(stream, record)
+                except Exception as e:
+                    print(f"   ⚠️  Following {stream} samples failed: {e}")
+            self._stop.wait(FOLLOW_INTERVAL)
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True).start()
+        if self._followers:
+            threading.Thread(target=self._follow_loop, name="metrics-follower", daemon=True).start()
+        return f"http://{self.host}:{self._server.server_address[1]}/metrics"
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a sample store as OpenMetrics on /metrics")
+    parser.add_argument("--store", required=True, help="Sample store directory (may still be written)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (0.0.0.0 for remote scrapers)")
+    args = parser.parse_args()
+
+    exporter = MetricsExporter(args.port, args.host, run=os.path.basename(os.path.normpath(args.store)))
+    exporter.follow(args.store, FOLLOWED_STREAMS)
+    print(f"📈 Metrics: {exporter.start()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        exporter.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+import argparse
+import base64
+import json
+import math
+import random
+import struct
+import threading
+import zlib
+
+from latency_histogram import LatencyHistogram
+
+# Realistic request payloads.
+#
+# Recipes and interest forms carry a 1x1 GIF, two ingredients and three one-line
+# instructions by default, so the photo upload path behind /api/recipe/create and
+# /api/interest-form/submit (base64 decode + GCS upload) and large JSON bodies
+# are not exercised. That default is kept so runs stay comparable with the
+# stored results; given a photo size distribution (run_hpa.py --photo-sizes) the
+# factory draws every payload from size distributions instead:
+#   photos        a weighted choice of size classes ("none", "20k", "1m", ...);
+#                 each class holds a few PNGs generated once per process and kept
+#                 as ready-to-send JSON string bytes, shared by all users
+#   ingredients   count drawn from a range
+#   instructions  step count and words per step drawn from ranges
+# The JSON around the photo is serialized per request and sent as a PayloadBody
+# of (head, photo, tail) parts, so a 3 MB photo is never base64- or JSON-encoded
+# again, nor copied into a joined body: the clients stream the parts.
+#
+# Requests made with a payload carry its size class in the request context;
+# PayloadStats groups their latency by "<request name> [<size class>]" so
+# latency can be read against payload size (see locustfile.py).
+#
+#   python payloads.py --photo-sizes none:10,20k:30,200k:40,1m:15,3m:5 --count 1000
+
+DEFAULT_PHOTO_SIZES = ""  # placeholder payloads, as in the stored results
+SIZED_PHOTO_SIZES = "none:10,20k:30,200k:40,1m:15,3m:5"
+DEFAULT_INGREDIENTS = "2-15"
+DEFAULT_STEPS = "2-12"
+DEFAULT_STEP_WORDS = "4-30"
+DEFAULT_VARIANTS = 2  # distinct images per size class
+
+PHOTO_SLOT = "\x00photo\x00"  # placeholder replaced by the photo bytes after serialization
+PLACEHOLDER_CLASS = "placeholder"
+PLACEHOLDER_IMAGE = "data:image/gif;base64,R0lGODlhAQABAIAAAAUEBAAAACwAAAAAAQABAAACAkQBADs="  # 1x1 GIF
+PLACEHOLDER_INGREDIENTS = [{"name": "Flour", "amount": 200, "unit": "g"}, {"name": "Sugar", "amount": 100, "unit": "g"}]
+PLACEHOLDER_INSTRUCTIONS = ["Mix ingredients", "Bake at 350F", "Serve warm"]
+
+INGREDIENTS = [
+    ("Flour", "g"), ("Sugar", "g"), ("Butter", "g"), ("Egg", "pcs"), ("Milk", "ml"), ("Olive oil", "ml"),
+    ("Salt", "g"), ("Chicken breast", "g"), ("Rice", "g"), ("Tomato", "pcs"), ("Onion", "pcs"),
+    ("Garlic", "cloves"), ("Spinach", "g"), ("Cheddar", "g"), ("Yogurt", "g"), ("Oats", "g"),
+    ("Lentils", "g"), ("Salmon", "g"), ("Broccoli", "g"), ("Honey", "tbsp"), ("Lemon juice", "ml"),
+]
+WORDS = (
+    "mix stir whisk fold bake simmer boil chop slice dice season heat pan oven bowl until golden "
+    "minutes gently evenly combine add remove cool serve warm cover rest sauce dough batter medium "
+    "high low lid tender crisp drain rinse sprinkle pour layer top"
+).split()
+
+
+def parse_size(label):
+    """
+    Byte size of a size class label: "none" is 0, "20k" 20 KiB, "3m" 3 MiB.
+    """
+    label = label.strip().lower()
+    if label == "none":
+        return 0
+    units = {"k": 1024, "m": 1024 * 1024}
+    if label[-1] in units:
+        return int(float(label[:-1]) * units[label[-1]])
+    return int(label)
+
+
+def parse_weights(spec):
+    """
+    "label:weight,..." -> [(label, weight), ...].
+    """
+    pairs = []
+    for item in filter(None, spec.split(",")):
+        label, _, weight = item.partition(":")
+        pairs.append((label.strip(), float(weight or 1)))
+    if not pairs or sum(w for _, w in pairs) <= 0:
+        raise ValueError(f"Empty size distribution '{spec}'")
+    return pairs
+
+
+def parse_range(spec):
+    """
+    "min-max" (or a single number) -> (min, max).
+    """
+    low, _, high = str(spec).partition("-")
+    low = int(low)
+    return low, int(high) if high else low
+
+
+def make_png(target_bytes, rng):
+    """
+    RGB noise PNG of roughly `target_bytes`. Noise does not compress, like a
+    real photo, so the file is about width * height * 3 bytes.
+    """
+    side = max(1, int(math.sqrt(max(3, target_bytes - 64) / 3)))
+    raw = b"".join(b"\x00" + rng.randbytes(side * 3) for _ in range(side))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 1))
+        + chunk(b"IEND", b"")
+    )
+
+
+class PayloadBody:
+    """
+    A request body sent as consecutive byte parts. File-like with a known
+    length, so requests and geventhttpclient send it with a Content-Length and
+    read it block by block; the shared photo part is never copied into a
+    joined body. Single use, like any stream (seek(0) to send it again).
+    """
+
+    mode = "rb"
+
+    def __init__(self, parts):
+        self._parts = [memoryview(part) for part in parts if part]
+        self._length = sum(len(part) for part in self._parts)
+        self._position = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        while True:
+            block = self.read(64 * 1024)
+            if not block:
+                return
+            yield block
+
+    def seek(self, offset, whence=0):
+        base = {0: 0, 1: self._position, 2: self._length}[whence]
+        self._position = min(self._length, max(0, base + offset))
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        """
+        Up to `size` bytes from the part at the current position (a view, not a copy).
+        """
+        start = 0
+        for part in self._parts:
+            if self._position < start + len(part):
+                offset = self._position - start
+                end = len(part) if size is None or size < 0 else min(len(part), offset + size)
+                self._position += end - offset
+                return part[offset:end]
+            start += len(part)
+        return b""
+
+    def getvalue(self):
+        return b"".join(self._parts)
+
+
+class Payload:
+    """
+    One request body, ready to send as `data=` with a JSON content type.
+    """
+
+    __slots__ = ("body", "size_class", "photo_bytes", "ingredients", "steps")
+
+    def __init__(self, body, size_class, photo_bytes, ingredients=0, steps=0):
+        self.body = body
+        self.size_class = size_class
+        self.photo_bytes = photo_bytes
+        self.ingredients = ingredients
+        self.steps = steps
+
+    def context(self):
+        """
+        Request context for the Locust request event (read by PayloadStats).
+        """
+        return {"payload_class": self.size_class, "payload_bytes": len(self.body)}
+
+
+class PayloadFactory:
+    """
+    Per-process payload generator. Photos are generated in the constructor.
+    """
+
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, photo_sizes=DEFAULT_PHOTO_SIZES, ingredients=DEFAULT_INGREDIENTS, steps=DEFAULT_STEPS,
+                 step_words=DEFAULT_STEP_WORDS, variants=DEFAULT_VARIANTS, seed=1):
+        # No distribution: the fixed placeholder recipe / form (ranges unused)
+        self.placeholder = not photo_sizes
+        if self.placeholder:
+            image = json.dumps(PLACEHOLDER_IMAGE).encode()
+            self.size_classes, self.size_weights = [PLACEHOLDER_CLASS], [1]
+            self.photos = {PLACEHOLDER_CLASS: [(image, len(base64.b64decode(PLACEHOLDER_IMAGE.split(",", 1)[1])))]}
+            return
+        weights = parse_weights(photo_sizes)
+        self.size_classes = [label for label, _ in weights]
+        self.size_weights = [weight for _, weight in weights]
+        self.ingredients = parse_range(ingredients)
+        self.steps = parse_range(steps)
+        self.step_words = parse_range(step_words)
+        rng = random.Random(seed)
+        # size class -> [JSON string bytes of a data URI, ...] (b'""' for "none")
+        self.photos = {}
+        for label in self.size_classes:
+            size = parse_size(label)
+            if size == 0:
+                self.photos[label] = [(b'""', 0)]
+                continue
+            self.photos[label] = []
+            for _ in range(max(1, variants)):
+                png = make_png(size, rng)
+                uri = b'"data:image/png;base64,' + base64.b64encode(png) + b'"'
+                self.photos[label].append((uri, len(png)))
+
+    def _photo(self):
+        size_class = random.choices(self.size_classes, self.size_weights)[0]
+        fragment, png_bytes = random.choice(self.photos[size_class])
+        return size_class, fragment, png_bytes
+
+    def _encode(self, fields, fragment):
+        head, tail = json.dumps(fields, separators=(',', ':')).encode().split(json.dumps(PHOTO_SLOT).encode())
+        return PayloadBody((head, fragment, tail))
+
+    def recipe(self, title):
+        size_class, fragment, png_bytes = self._photo()
+        if self.placeholder:
+            ingredients, instructions = PLACEHOLDER_INGREDIENTS, PLACEHOLDER_INSTRUCTIONS
+        else:
+            ingredients = [
+                {"name": name, "amount": random.randint(1, 500), "unit": unit}
+                for name, unit in random.sample(INGREDIENTS, min(len(INGREDIENTS), random.randint(*self.ingredients)))
+            ]
+            instructions = [
+                " ".join(random.choices(WORDS, k=random.randint(*self.step_words))).capitalize() + "."
+                for _ in range(random.randint(*self.steps))
+            ]
+        fields = recipe_fields(title, ingredients, instructions, PHOTO_SLOT)
+        return Payload(self._encode(fields, fragment), size_class, png_bytes, len(ingredients), len(instructions))
+
+    def interest_form(self, name, surname):
+        size_class, fragment, png_bytes = self._photo()
+        return Payload(self._encode(interest_form_fields(name, surname, PHOTO_SLOT), fragment), size_class, png_bytes)
+
+
+def recipe_fields(title, ingredients=PLACEHOLDER_INGREDIENTS, instructions=PLACEHOLDER_INSTRUCTIONS,
+                  photo=PLACEHOLDER_IMAGE):
+    """
+    /api/recipe/create body as a dict (the placeholder recipe by default).
+    """
+    return {
+        "title": title,
+        "instructions": instructions,
+        "ingredients": ingredients,
+        "tag": "Test",
+        "type": random.choice(["Lunch", "Dinner", "Dessert"]),
+        "photo": photo,
+        "totalCalorie": random.randint(100, 800),
+        "price": round(random.uniform(5.0, 50.0), 2),
+    }
+
+
+def interest_form_fields(name, surname, photo=PLACEHOLDER_IMAGE):
+    """
+    /api/interest-form/submit body as a dict (with the placeholder photo by default).
+    """
+    return {
+        "name": name,
+        "surname": surname,
+        "dateOfBirth": "1995-05-15",
+        "height": random.randint(160, 190),
+        "weight": round(random.uniform(55.0, 90.0), 1),
+        "gender": random.choice(["Male", "Female"]),
+        "profilePhoto": photo,
+    }
+
+
+class _ClassStats:
+    __slots__ = ("latency", "bytes", "max_bytes")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.bytes = 0
+        self.max_bytes = 0
+
+    def add(self, size, response_time_ms):
+        self.latency.record(response_time_ms)
+        self.bytes += size
+        self.max_bytes = max(self.max_bytes, size)
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.bytes += other.bytes
+        self.max_bytes = max(self.max_bytes, other.max_bytes)
+
+    def encode(self):
+        return {"h": self.latency.encode(), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+    @classmethod
+    def decode(cls, data):
+        stats = cls()
+        stats.latency = LatencyHistogram.decode(data["h"])
+        stats.bytes = data.get("bytes", 0)
+        stats.max_bytes = data.get("max_bytes", 0)
+        return stats
+
+    def summary(self):
+        count = self.latency.count
+        return {
+            "count": count,
+            "avg_bytes": round(self.bytes / count) if count else 0,
+            "max_bytes": self.max_bytes,
+            "p50": round(self.latency.value_at_percentile(50.0), 2),
+            "p95": round(self.latency.value_at_percentile(95.0), 2),
+            "p99": round(self.latency.value_at_percentile(99.0), 2),
+        }
+
+
+class PayloadStats:
+    """
+    Latency and body size per "<request name> [<size class>]", for the current
+    interval (drained like LatencyRecorder, workers -> master) and for the run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = {}
+        self._totals = {}
+
+    def _add(self, target, key, stats):
+        if key in target:
+            target[key].merge(stats)
+        else:
+            target[key] = stats
+
+    def record(self, name, context, response_time_ms):
+        key = f"{name} [{context['payload_class']}]"
+        with self._lock:
+            for target in (self._current, self._totals):
+                target.setdefault(key, _ClassStats()).add(context.get("payload_bytes", 0), response_time_ms)
+
+    def drain_encoded(self):
+        with self._lock:
+            current, self._current = self._current, {}
+        return {key: stats.encode() for key, stats in current.items()}
+
+    def merge_encoded(self, encoded):
+        with self._lock:
+            for key, data in (encoded or {}).items():
+                self._add(self._current, key, _ClassStats.decode(data))
+                self._add(self._totals, key, _ClassStats.decode(data))
+
+    def snapshot(self, timestamp, interval):
+        """
+        Drains the interval into one sample store record, or None if it was empty.
+        """
+        with self._lock:
+            current, self._current = self._current, {}
+        if not current:
+            return None
+        return {
+            "timestamp": round(timestamp, 3),
+            "interval": interval,
+            "classes": {key: stats.summary() for key, stats in current.items()},
+        }
+
+    def summary(self):
+        with self._lock:
+            return {key: stats.summary() for key, stats in sorted(self._totals.items())}
+
+    def format_summary(self):
+        rows = self.summary()
+        if not rows:
+            return ""
+        lines = ["", "📦 Latency by payload size",
+                 f"   {'request [size class]':<52} {'reqs':>7} {'avg KB':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for key, s in rows.items():
+            lines.append(f"   {key:<52} {s['count']:>7} {s['avg_bytes'] / 1024:>9.1f} "
+                         f"{s['p50']:>8g} {s['p95']:>8g} {s['p99']:>8g}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Preview the payload size distributions')
+    parser.add_argument('--photo-sizes', default=SIZED_PHOTO_SIZES, help='Photo size classes "label:weight,..." ("" = placeholder payloads)')
+    parser.add_argument('--ingredients', default=DEFAULT_INGREDIENTS, help='Ingredient count range "min-max"')
+    parser.add_argument('--instruction-steps', default=DEFAULT_STEPS, help='Instruction step count range "min-max"')
+    parser.add_argument('--step-words', default=DEFAULT_STEP_WORDS, help='Words per instruction step "min-max"')
+    parser.add_argument('--count', type=int, default=1000, help='Recipes to generate')
+    args = parser.parse_args()
+
+    factory = PayloadFactory(args.photo_sizes, args.ingredients, args.instruction_steps, args.step_words)
+    sizes, per_class = [], {}
+    for i in range(args.count):
+        payload = factory.recipe(f"Recipe {i}")
+        sizes.append(len(payload.body))
+        per_class[payload.size_class] = per_class.get(payload.size_class, 0) + 1
+    sizes.sort()
+    print(f"📦 {args.count} recipe bodies: median {sizes[len(sizes) // 2] / 1024:.1f} KB, "
+          f"p95 {sizes[int(len(sizes) * 0.95)] / 1024:.1f} KB, max {sizes[-1] / 1024:.1f} KB, "
+          f"{sum(sizes) / 1024 / 1024:.1f} MB total")
+    for label in factory.size_classes:
+        print(f"   {label:<6} {per_class.get(label, 0):>6} ({per_class.get(label, 0) / args.count:.0%})")
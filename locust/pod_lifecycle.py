@@ -0,0 +1,367 @@
+import argparse
+import calendar
+import json
+import math
+import os
+import statistics
+import subprocess
+import threading
+import time
+
+import report_data
+import sample_store
+
+# Pod lifecycle tracking for the backend and frontend deployments.
+#
+# The monitor feeds every backend / frontend Pod object it sees (the watch
+# cache with --k8s-api, one `kubectl get pods -o json` per tick otherwise) into
+# a PodLifecycleTracker, which compares it with the previous version and emits
+# one event per transition into the "pods" stream of the sample store:
+#   created      metadata.creationTimestamp
+#   scheduled    PodScheduled condition (node assigned)
+#   started      first container running (startedAt)
+#   ready        Ready condition turning True (again after "unready")
+#   unready      Ready condition turning False after the pod was ready
+#   waiting      a container stuck in e.g. CrashLoopBackOff / ImagePullBackOff
+#   restart      restartCount increased; reason / exit code of the last
+#                termination (OOMKilled, Error, ...)
+#   terminating  deletionTimestamp set (scale-down, eviction, rollout)
+#   failed       phase Failed, e.g. reason Evicted
+#   deleted      the pod is gone
+# Transition times come from the Kubernetes timestamps (1 s resolution), not
+# from the polling interval; `observed` is when the monitor noticed.
+#
+# `analyze` folds the events back into one lifecycle per pod: startup phases
+# (scheduling, container start, readiness) and their distributions, restarts
+# and termination reasons. Written to <store>/pod_lifecycle.json.
+#
+#   python pod_lifecycle.py results_hpa/samples_20250101_120000
+
+APPS = ("backend", "frontend")
+RESULTS_FILE = "pod_lifecycle.json"
+STREAM = "pods"
+# Container waiting reasons that are part of a normal start
+NORMAL_WAITING = {"ContainerCreating", "PodInitializing"}
+PHASES = {
+    "schedule_s": ("created", "scheduled"),
+    "start_s": ("scheduled", "started"),
+    "readiness_s": ("started", "ready"),
+    "startup_s": ("created", "ready"),
+}
+
+
+def parse_time(value):
+    """
+    Kubernetes RFC 3339 timestamp ("2025-01-01T12:00:00Z") to epoch seconds.
+    """
+    if not value:
+        return None
+    value = value.rstrip("Z")
+    whole, _, fraction = value.partition(".")
+    try:
+        seconds = calendar.timegm(time.strptime(whole, "%Y-%m-%dT%H:%M:%S"))
+    except ValueError:
+        return None
+    return seconds + (float("0." + fraction) if fraction.isdigit() else 0.0)
+
+
+def _condition(pod, kind):
+    for condition in pod.get("status", {}).get("conditions") or []:
+        if condition.get("type") == kind:
+            return condition
+    return None
+
+
+def pod_state(pod):
+    """
+    The lifecycle-relevant fields of a Pod object.
+    """
+    metadata, status = pod.get("metadata", {}), pod.get("status", {})
+    containers = status.get("containerStatuses") or []
+    scheduled = _condition(pod, "PodScheduled")
+    ready = _condition(pod, "Ready")
+    started = [parse_time(c["state"]["running"].get("startedAt")) for c in containers if "running" in c.get("state", {})]
+    last_terminated = [c["lastState"]["terminated"] for c in containers if "terminated" in (c.get("lastState") or {})]
+    waiting = [c["state"]["waiting"].get("reason") for c in containers if "waiting" in c.get("state", {})]
+    final = [c["state"]["terminated"] for c in containers if "terminated" in c.get("state", {})]
+    return {
+        "app": metadata.get("labels", {}).get("app"),
+        "node": pod.get("spec", {}).get("nodeName"),
+        "created": parse_time(metadata.get("creationTimestamp")),
+        "scheduled": parse_time(scheduled.get("lastTransitionTime")) if scheduled and scheduled.get("status") == "True" else None,
+        "started": min((t for t in started if t is not None), default=None),
+        "ready": ready.get("status") == "True" if ready else False,
+        "ready_since": parse_time(ready.get("lastTransitionTime")) if ready else None,
+        "restarts": sum(c.get("restartCount", 0) for c in containers),
+        "last_terminated": max(last_terminated, key=lambda t: t.get("finishedAt") or "", default=None),
+        "waiting": next((r for r in waiting if r and r not in NORMAL_WAITING), None),
+        "terminating": bool(metadata.get("deletionTimestamp")),
+        "phase": status.get("phase"),
+        "reason": status.get("reason"),
+        "message": status.get("message"),
+        "final": final[0] if final else None,
+    }
+
+
+class PodLifecycleTracker:
+    """
+    Turns successive versions of the tracked pods into transition events.
+    `observe` is a WatchCache listener; `update` takes a full listing (kubectl
+    mode) and also reports pods that vanished from it. Events are buffered
+    until the monitor `drain`s them into the store.
+    """
+
+    def __init__(self, apps=APPS):
+        self.apps = set(apps)
+        self._pods = {}  # name -> last pod_state
+        self._events = []
+        self._lock = threading.Lock()
+
+    def _emit(self, name, state, event, timestamp, now, **details):
+        record = {"timestamp": timestamp if timestamp is not None else now, "observed": round(now, 3),
+                  "pod": name, "app": state["app"], "event": event, "node": state["node"]}
+        record.update({k: v for k, v in details.items() if v is not None})
+        self._events.append(record)
+
+    def _diff(self, name, state, now):
+        old = self._pods.get(name)
+        if old is None:
+            old = {"created": None, "scheduled": None, "started": None, "ready": False, "restarts": 0,
+                   "waiting": None, "terminating": False, "phase": None}
+            self._emit(name, state, "created", state["created"], now)
+        # A crash-looping container is no longer running; its first start still counts
+        for key in ("scheduled", "started"):
+            state[key] = state[key] or old[key]
+        if state["scheduled"] and not old["scheduled"]:
+            self._emit(name, state, "scheduled", state["scheduled"], now)
+        if state["started"] and not old["started"]:
+            self._emit(name, state, "started", state["started"], now)
+        if state["restarts"] > old["restarts"]:
+            term = state["last_terminated"] or {}
+            # Restarts that happened before we first saw the pod arrive as one event
+            self._emit(name, state, "restart", parse_time(term.get("finishedAt")), now,
+                       count=state["restarts"] - old["restarts"], restarts=state["restarts"],
+                       reason=term.get("reason"), exit_code=term.get("exitCode"))
+        if state["waiting"] and state["waiting"] != old["waiting"]:
+            self._emit(name, state, "waiting", None, now, reason=state["waiting"])
+        if state["ready"] != old["ready"]:
+            self._emit(name, state, "ready" if state["ready"] else "unready", state["ready_since"], now)
+        if state["terminating"] and not old["terminating"]:
+            self._emit(name, state, "terminating", None, now)
+        if state["phase"] == "Failed" and old["phase"] != "Failed":
+            self._emit(name, state, "failed", None, now, reason=state["reason"], message=state["message"])
+        self._pods[name] = state
+
+    def observe(self, event_type, pod, now=None):
+        now = time.time() if now is None else now
+        name = pod.get("metadata", {}).get("name")
+        state = pod_state(pod)
+        if state["app"] not in self.apps:
+            return
+        with self._lock:
+            self._diff(name, state, now)
+            if event_type == "DELETED":
+                self._deleted(name, now)
+
+    def update(self, pods, now=None):
+        now = time.time() if now is None else now
+        seen = set()
+        for pod in pods:
+            seen.add(pod.get("metadata", {}).get("name"))
+            self.observe("MODIFIED", pod, now)
+        with self._lock:
+            for name in [n for n in self._pods if n not in seen]:
+                self._deleted(name, now)
+
+    def _deleted(self, name, now):
+        state = self._pods.pop(name, None)
+        if state is None:
+            return
+        final = state.get("final") or {}
+        self._emit(name, state, "deleted", None, now, reason=final.get("reason"), exit_code=final.get("exitCode"))
+
+    def drain(self):
+        with self._lock:
+            events, self._events = self._events, []
+        return sorted(events, key=lambda e: e["timestamp"])
+
+
+def get_pods_json(apps=APPS):
+    """
+    Backend / frontend Pod objects via kubectl, or None if the call failed
+    (so a failed poll is not mistaken for every pod disappearing).
+    """
+    try:
+        cmd = ["kubectl", "get", "pods", "-l", f"app in ({','.join(apps)})", "-o", "json"]
+        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=20).decode("utf-8")
+        return json.loads(out).get("items", [])
+    except Exception:
+        return None
+
+
+# --- Analysis ---
+
+def _round(value, digits=1):
+    return round(value, digits) if value is not None else None
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def _stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "median": _round(statistics.median(values)),
+        "p90": _round(_percentile(values, 90)),
+        "max": _round(max(values)),
+    }
+
+
+def fold_events(events):
+    """
+    One lifecycle dict per pod from its events (oldest first).
+    """
+    pods = {}
+    for e in events:
+        pod = pods.setdefault(e["pod"], {"pod": e["pod"], "app": e.get("app"), "node": None, "created": None,
+                                         "scheduled": None, "started": None, "ready": None, "unready": [],
+                                         "restarts": [], "waiting": [], "terminating": None, "deleted": None,
+                                         "failed": None, "final": None})
+        kind, t = e["event"], e["timestamp"]
+        pod["node"] = e.get("node") or pod["node"]
+        if kind in ("created", "scheduled", "started"):
+            pod[kind] = pod[kind] or t
+        elif kind == "ready":
+            pod["ready"] = pod["ready"] or t
+        elif kind == "unready":
+            pod["unready"].append(t)
+        elif kind == "restart":
+            pod["restarts"].append({"at": t, "count": e.get("count", 1), "reason": e.get("reason"),
+                                    "exit_code": e.get("exit_code")})
+        elif kind == "waiting":
+            pod["waiting"].append(e.get("reason"))
+        elif kind == "terminating":
+            pod["terminating"] = pod["terminating"] or t
+        elif kind == "failed":
+            pod["failed"] = e.get("reason") or "Failed"
+        elif kind == "deleted":
+            pod["deleted"] = t
+            if e.get("reason"):
+                pod["final"] = {"reason": e["reason"], "exit_code": e.get("exit_code")}
+    return pods
+
+
+def analyze(store_dir, start=None):
+    """
+    Lifecycle of every tracked pod plus per-app startup distributions and
+    restart / termination counts. Times are seconds on the run timebase
+    (elapsed 0 = K8s monitor start). Startup distributions only count pods
+    created during the run; pods already running at the start are listed too.
+    """
+    start = report_data.run_start(store_dir) if start is None else start
+    pods = fold_events(sample_store.iter_records(store_dir, STREAM))
+    base = start or 0
+
+    lifecycles = []
+    for pod in pods.values():
+        entry = {
+            "pod": pod["pod"], "app": pod["app"], "node": pod["node"],
+            "preexisting": bool(start is not None and pod["created"] is not None and pod["created"] < start),
+        }
+        for key in ("created", "scheduled", "started", "ready", "terminating", "deleted"):
+            entry[key] = _round(pod[key] - base) if pod[key] is not None else None
+        for phase, (a, b) in PHASES.items():
+            entry[phase] = _round(pod[b] - pod[a]) if pod[a] is not None and pod[b] is not None else None
+        entry["restarts"] = [{**r, "at": _round(r["at"] - base) if r["at"] is not None else None} for r in pod["restarts"]]
+        entry["unready"] = [_round(t - base) for t in pod["unready"]]
+        entry["waiting"] = sorted(set(pod["waiting"]))
+        entry["failed"] = pod["failed"]
+        entry["final"] = pod["final"]
+        lifecycles.append(entry)
+    lifecycles.sort(key=lambda p: (p["app"] or "", p["created"] if p["created"] is not None else math.inf))
+
+    summary = {}
+    for app in APPS:
+        app_pods = [p for p in lifecycles if p["app"] == app]
+        new_pods = [p for p in app_pods if not p["preexisting"]]
+        reasons = {}
+        for p in app_pods:
+            for r in p["restarts"]:
+                reasons[r["reason"] or "Unknown"] = reasons.get(r["reason"] or "Unknown", 0) + r["count"]
+        summary[app] = {
+            "pods": len(app_pods),
+            "created_during_run": len(new_pods),
+            "never_ready": sum(1 for p in new_pods if p["ready"] is None),
+            **{phase: _stats(p[phase] for p in new_pods) for phase in PHASES},
+            "restarts": sum(r["count"] for p in app_pods for r in p["restarts"]),
+            "restart_reasons": reasons,
+            "oom_kills": reasons.get("OOMKilled", 0),
+            "evictions": sum(1 for p in app_pods if p["failed"] == "Evicted"),
+            "terminated": sum(1 for p in app_pods if p["terminating"] is not None or p["deleted"] is not None),
+        }
+    return {
+        "store": os.path.abspath(store_dir),
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "run_start": start,
+        "summary": summary,
+        "pods": lifecycles,
+    }
+
+
+def startup_histogram(lifecycles, apps=APPS):
+    """
+    Bins the created -> ready time of pods started during the run: (bin lower
+    edges, {app: counts}) with a round bin width giving at most ~12 bins.
+    """
+    values = {app: [p["startup_s"] for p in lifecycles if p["app"] == app and not p["preexisting"] and p["startup_s"] is not None]
+              for app in apps}
+    everything = [v for vs in values.values() for v in vs]
+    if not everything:
+        return [], {app: [] for app in apps}
+    width = next((w for w in (1, 2, 5, 10, 15, 30, 60, 120, 300) if max(everything) / w <= 12), 600)
+    bins = int(max(everything) // width) + 1
+    counts = {app: [0] * bins for app in apps}
+    for app, vs in values.items():
+        for v in vs:
+            counts[app][int(v // width)] += 1
+    return [i * width for i in range(bins)], counts
+
+
+def write_analysis(store_dir, out_path=None):
+    analysis = analyze(store_dir)
+    out_path = out_path or os.path.join(store_dir, RESULTS_FILE)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(analysis, f, indent=2)
+    return analysis, out_path
+
+
+def print_summary(analysis):
+    def fmt(stats):
+        return f"median {stats['median']}s / p90 {stats['p90']}s / max {stats['max']}s (n={stats['count']})" if stats else "-"
+
+    print("\n🔁 Pod lifecycle")
+    for app in APPS:
+        s = analysis["summary"][app]
+        reasons = ", ".join(f"{reason} {n}" for reason, n in sorted(s["restart_reasons"].items())) or "none"
+        print(f"   {app:<9} {s['pods']} pods ({s['created_during_run']} new, {s['never_ready']} never ready) | "
+              f"startup {fmt(s['startup_s'])}")
+        print(f"   {'':<9} restarts {s['restarts']} ({reasons}) | evicted {s['evictions']} | terminated {s['terminated']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Per-pod lifecycle, startup latency and restart analysis of a run')
+    parser.add_argument('store', help='Sample store directory of a run (results_hpa/samples_*)')
+    parser.add_argument('--out', default=None, help='Output JSON (default: <store>/pod_lifecycle.json)')
+    args = parser.parse_args()
+
+    analysis, out = write_analysis(args.store, args.out)
+    for pod in analysis["pods"]:
+        restarts = "; ".join(f"{r['reason']} (exit {r['exit_code']}) at {r['at']}s" for r in pod["restarts"])
+        print(f"   {pod['pod']:<45} startup {pod['startup_s']}s" + (f" | restarts: {restarts}" if restarts else ""))
+    print_summary(analysis)
+    print(f"\n📄 {out}")
@@ -0,0 +1,428 @@
+from array import array
+
+import sample_store
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, the pure Python path gives the same results
+    np = None
+
+# Columnar aggregation layer for generate_k8s_report.
+#
+# Sample records are pivoted into dense per-series columns in a single pass over
+# the store: scalar fields become one column each, and {name: value} maps
+# (pod CPU, node CPU) become a (samples x names) matrix. With numpy the matrix is
+# filled with one vectorized scatter; without it per-name sparse dicts are used.
+# Pod series are embedded trimmed to the samples in which the pod existed, which
+# keeps the report small when HPA churn produces hundreds of pod names.
+#
+# Long runs are downsampled to a point budget per chart: largest-triangle-three-
+# buckets (LTTB) for smooth series, change points for stepped replica / node
+# counts, and LTTB plus per-bucket min/max for series whose peaks must stay exact
+# (CPU, DB `waiting`).
+
+MIN_SERIES_POINTS = 20  # smallest per-series share of a chart's point budget
+
+K8S_COLUMNS = {
+    "time": ("time",),
+    "elapsed": ("elapsed",),
+    "be_desired": ("backend", "desired_replicas"),
+    "be_ready": ("backend", "ready_replicas"),
+    "be_hpa_cpu": ("backend", "hpa_cpu"),
+    "fe_desired": ("frontend", "desired_replicas"),
+    "fe_ready": ("frontend", "ready_replicas"),
+    "fe_hpa_cpu": ("frontend", "hpa_cpu"),
+    "total_nodes": ("nodes", "total"),
+    "ready_nodes": ("nodes", "ready"),
+    "be_memory_request": ("backend", "memory_request_mib"),
+    "be_memory_limit": ("backend", "memory_limit_mib"),
+    "fe_memory_request": ("frontend", "memory_request_mib"),
+    "fe_memory_limit": ("frontend", "memory_limit_mib"),
+}
+K8S_PIVOTS = {
+    "be_pods": ("backend", "pods"),
+    "fe_pods": ("frontend", "pods"),
+    "node_cpu": ("nodes", "cpu_utilization"),
+    "node_memory": ("nodes", "memory_utilization"),
+}
+# Memory / throttling per pod (resource_usage.py), same layout for both deployments
+for _prefix, _deployment in (("be", "backend"), ("fe", "frontend")):
+    K8S_PIVOTS.update({
+        f"{_prefix}_memory": (_deployment, "memory"),
+        f"{_prefix}_memory_request_pct": (_deployment, "memory_request_pct"),
+        f"{_prefix}_memory_limit_pct": (_deployment, "memory_limit_pct"),
+        f"{_prefix}_cpu_limit_pct": (_deployment, "cpu_limit_pct"),
+        f"{_prefix}_throttled": (_deployment, "throttled"),
+    })
+DB_POOL_COLUMNS = {
+    "time": ("time",),
+    "elapsed": ("elapsed",),
+    "total": ("total",),
+    "active": ("active",),
+    "idle": ("idle",),
+    "waiting": ("waiting",),
+}
+LATENCY_COLUMNS = {
+    "elapsed": ("elapsed",),
+    "count": ("total", "count"),
+    "p50": ("total", "p50"),
+    "p95": ("total", "p95"),
+    "p99": ("total", "p99"),
+    "p999": ("total", "p999"),
+    "max": ("total", "max"),
+}
+LATENCY_PIVOTS = {
+    "endpoint_p99": ("p99",),
+}
+
+TEXT_COLUMNS = {"time"}
+
+
+def _lookup(record, path):
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+class Pivot:
+    """
+    Dense (samples x names) view of one {name: value} field.
+    Cells where a name was absent are NaN.
+    """
+
+    def __init__(self, names, rows, cols, values, sample_count):
+        self.names = names
+        self.sample_count = sample_count
+        if np is not None:
+            self.matrix = np.full((sample_count, len(names)), np.nan)
+            if values:
+                self.matrix[np.asarray(rows), np.asarray(cols)] = np.asarray(values, dtype=float)
+        else:
+            # Sparse fallback: one {row: value} dict per name
+            self.cells = [{} for _ in names]
+            for r, c, v in zip(rows, cols, values):
+                self.cells[c][r] = v
+
+    def present(self, idx):
+        """
+        Returns (rows, values) for the samples in which the name existed.
+        """
+        if np is not None:
+            col = self.matrix[:, idx]
+            rows = np.nonzero(~np.isnan(col))[0]
+            return rows.tolist(), col[rows].tolist()
+        cells = sorted(self.cells[idx].items())
+        return [r for r, _ in cells], [float(v) for _, v in cells]
+
+    def merged_max(self, indices):
+        """
+        Returns (rows, values) of the element-wise max over several names, for the
+        samples in which at least one of them existed.
+        """
+        if np is not None:
+            sub = self.matrix[:, indices]
+            rows = np.nonzero(~np.all(np.isnan(sub), axis=1))[0]
+            return rows.tolist(), np.nanmax(sub[rows], axis=1).tolist() if len(rows) else []
+        merged = {}
+        for idx in indices:
+            for r, v in self.cells[idx].items():
+                merged[r] = max(merged.get(r, v), v)
+        cells = sorted(merged.items())
+        return [r for r, _ in cells], [float(v) for _, v in cells]
+
+    def rows_present(self):
+        """
+        Per sample: True if any name existed in it.
+        """
+        if np is not None:
+            return (~np.all(np.isnan(self.matrix), axis=1)).tolist() if self.names else [False] * self.sample_count
+        present = [False] * self.sample_count
+        for cells in self.cells:
+            for r in cells:
+                present[r] = True
+        return present
+
+    def peak(self, idx):
+        return max(self.present(idx)[1], default=0)
+
+    def column_max(self):
+        if np is not None:
+            if not self.matrix.size:
+                return 0
+            return _compact(np.nanmax(self.matrix)) if not np.all(np.isnan(self.matrix)) else 0
+        return _compact(max((v for cells in self.cells for v in cells.values()), default=0))
+
+
+class SeriesTable:
+    """
+    Columns + pivots built from one stream of the sample store.
+    """
+
+    def __init__(self, columns, pivots, sample_count):
+        self.columns = columns
+        self.pivots = pivots
+        self.sample_count = sample_count
+
+    def __len__(self):
+        return self.sample_count
+
+    def column(self, name):
+        return self.columns[name]
+
+    def values(self, name):
+        """
+        Column as a JSON-ready list.
+        """
+        col = self.columns[name]
+        if name in TEXT_COLUMNS:
+            return list(col)
+        return [_compact(v) for v in col]
+
+    def max(self, name, default=0):
+        col = self.columns[name]
+        if not len(col):
+            return default
+        return _compact(col.max() if np is not None else max(col))
+
+    def mean(self, name, default=0):
+        col = self.columns[name]
+        if not len(col):
+            return default
+        return float(col.mean()) if np is not None else sum(col) / len(col)
+
+    def count_where_positive(self, name):
+        col = self.columns[name]
+        if np is not None:
+            return int((col > 0).sum())
+        return sum(1 for v in col if v > 0)
+
+    def take(self, name, indices):
+        """
+        JSON-ready values of a column at the given sample indices.
+        """
+        col = self.columns[name]
+        if name in TEXT_COLUMNS:
+            return [col[i] for i in indices]
+        return [_compact(col[i]) for i in indices]
+
+    def last(self, name, default=None):
+        col = self.columns[name]
+        return col[-1] if len(col) else default
+
+    def series(self, name, budget, mode="lttb"):
+        """
+        One column as {"x": elapsed, "y": values} downsampled to `budget` points.
+        Returns (series, raw_points).
+        """
+        xs = list(self.columns["elapsed"])
+        ys = list(self.columns[name])
+        keep = select_indices(xs, ys, budget, mode)
+        return {"x": [_compact(xs[i]) for i in keep], "y": [_compact(ys[i]) for i in keep]}, len(ys)
+
+    def datasets(self, pivot_name, colors, budget, mode="lttb"):
+        """
+        Chart.js datasets for a pivot, one per name, each limited to the samples in
+        which the name existed. The chart's point budget is split across names; when
+        that would leave fewer than MIN_SERIES_POINTS per name, the names with the
+        highest peaks are kept and the rest are merged into one max series.
+        Returns (datasets, raw_points, rendered_points).
+        """
+        pivot = self.pivots[pivot_name]
+        elapsed = self.columns["elapsed"]
+        series = [([idx], name) for idx, name in sorted(enumerate(pivot.names), key=lambda item: item[1])]
+        max_series = max(1, budget // MIN_SERIES_POINTS)
+        if len(series) > max_series:
+            ranked = sorted(range(len(pivot.names)), key=lambda idx: (-pivot.peak(idx), pivot.names[idx]))
+            kept, merged = set(ranked[:max_series - 1]), ranked[max_series - 1:]
+            series = [entry for entry in series if entry[0][0] in kept]
+            series.append((merged, f"max of {len(merged)} {'others' if kept else 'series'}"))
+        per_series = max(1, budget // max(1, len(series)))
+        datasets = []
+        raw = rendered = 0
+        for indices, name in series:
+            if len(indices) == 1:
+                rows, ys = pivot.present(indices[0])
+                raw += len(ys)
+            else:
+                rows, ys = pivot.merged_max(indices)
+                raw += sum(len(pivot.present(idx)[0]) for idx in indices)
+            xs = [float(elapsed[r]) for r in rows]
+            keep = select_indices(xs, ys, per_series, mode)
+            rendered += len(keep)
+            color = colors[len(datasets) % len(colors)]
+            datasets.append({
+                "label": name,
+                "x": [_compact(xs[i]) for i in keep],
+                "y": [_compact(ys[i]) for i in keep],
+                "borderColor": color,
+                "backgroundColor": color,
+                "fill": False,
+                "tension": 0.1
+            })
+        return datasets, raw, rendered
+
+
+def build_table(records, columns, pivots=None):
+    """
+    Single pass pivot of an iterable of records.
+    """
+    pivots = pivots or {}
+    raw = {name: ([] if name in TEXT_COLUMNS else array('d')) for name in columns}
+    pivot_state = {name: ({}, array('l'), array('l'), array('d')) for name in pivots}
+    count = 0
+    for record in records:
+        for name, path in columns.items():
+            value = _lookup(record, path)
+            if name in TEXT_COLUMNS:
+                raw[name].append(value)
+            else:
+                raw[name].append(float(value or 0))
+        for name, path in pivots.items():
+            index, rows, cols, values = pivot_state[name]
+            for key, value in (_lookup(record, path) or {}).items():
+                col = index.setdefault(key, len(index))
+                rows.append(count)
+                cols.append(col)
+                values.append(float(value or 0))
+        count += 1
+
+    if np is not None:
+        cols_out = {
+            name: (col if name in TEXT_COLUMNS else np.frombuffer(col, dtype=float) if len(col) else np.zeros(0))
+            for name, col in raw.items()
+        }
+    else:
+        cols_out = raw
+    pivots_out = {
+        name: Pivot(list(index), rows, cols, values, count)
+        for name, (index, rows, cols, values) in pivot_state.items()
+    }
+    return SeriesTable(cols_out, pivots_out, count)
+
+
+def load_k8s_table(store_dir):
+    return build_table(sample_store.iter_records(store_dir, "k8s"), K8S_COLUMNS, K8S_PIVOTS)
+
+
+def load_db_pool_table(store_dir):
+    table = build_table(sample_store.iter_records(store_dir, "db_pool"), DB_POOL_COLUMNS)
+    # Utilization % of the pool, treating an unknown pool size as the HikariCP default of 10
+    total, active = table.columns["total"], table.columns["active"]
+    if np is not None:
+        table.columns["utilization"] = np.round(active / np.where(total > 0, total, 10) * 100, 1)
+    else:
+        table.columns["utilization"] = array('d', (
+            round(a / (t if t > 0 else 10) * 100, 1) for a, t in zip(active, total)
+        ))
+    return table
+
+
+def run_start(store_dir):
+    """
+    Epoch time at which the K8s monitor started (elapsed 0), or None without samples.
+    """
+    for record in sample_store.iter_records(store_dir, "k8s"):
+        return record["timestamp"] - record["elapsed"]
+    return None
+
+
+def load_latency_table(store_dir, start):
+    """
+    Latency snapshots written by the Locust master, on the K8s elapsed timebase.
+    """
+    def with_elapsed(records):
+        for record in records:
+            record["elapsed"] = record["timestamp"] - start
+            yield record
+
+    return build_table(with_elapsed(sample_store.iter_records(store_dir, "latency")), LATENCY_COLUMNS, LATENCY_PIVOTS)
+
+
+def lttb(xs, ys, budget):
+    """
+    Largest-triangle-three-buckets: indices of `budget` points that preserve the
+    visual shape of the series. First and last points are always kept.
+    """
+    n = len(ys)
+    if budget >= n or n <= 2:
+        return list(range(n))
+    if budget < 3:
+        return [0, n - 1]
+    keep = [0]
+    bucket = (n - 2) / (budget - 2)
+    a = 0
+    for i in range(budget - 2):
+        start, end = int(i * bucket) + 1, int((i + 1) * bucket) + 1
+        next_start, next_end = end, min(int((i + 2) * bucket) + 1, n)
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        span = max(1, next_end - next_start)
+        avg_x = sum(xs[next_start:next_end]) / span if next_end > next_start else xs[-1]
+        avg_y = sum(ys[next_start:next_end]) / span if next_end > next_start else ys[-1]
+        best, best_area = start, -1.0
+        for j in range(start, min(end, n - 1)):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def minmax_indices(ys, buckets):
+    """
+    Index of the min and max of each of `buckets` equal slices, so every peak survives exactly.
+    """
+    n = len(ys)
+    keep = set()
+    size = n / max(1, buckets)
+    for b in range(buckets):
+        start, end = int(b * size), min(int((b + 1) * size), n)
+        if start >= end:
+            continue
+        chunk = range(start, end)
+        keep.add(min(chunk, key=ys.__getitem__))
+        keep.add(max(chunk, key=ys.__getitem__))
+    return keep
+
+
+def step_indices(ys):
+    """
+    First / last point plus both sides of every value change of a stepped series.
+    """
+    keep = {0, len(ys) - 1} if ys else set()
+    for i in range(1, len(ys)):
+        if ys[i] != ys[i - 1]:
+            keep.update((i - 1, i))
+    return keep
+
+
+def select_indices(xs, ys, budget, mode="lttb"):
+    """
+    Sorted indices to render for one series within `budget` points.
+    mode: "lttb" (shape), "extremes" (shape + exact min/max) or "step" (change points).
+    """
+    n = len(ys)
+    if n <= budget:
+        return list(range(n))
+    if mode == "step":
+        keep = step_indices(ys)
+        if len(keep) <= budget:
+            return sorted(keep)
+        return lttb(xs, ys, budget)
+    if mode == "extremes":
+        # A third of the budget for the overall shape, the rest for per-bucket min/max
+        keep = set(lttb(xs, ys, max(3, budget // 3)))
+        keep.update(minmax_indices(ys, max(1, (budget - len(keep)) // 2)))
+        return sorted(keep)
+    return lttb(xs, ys, budget)
+
+
+def _compact(value):
+    """
+    Floats that hold whole numbers are emitted as ints to keep the embedded JSON small.
+    """
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
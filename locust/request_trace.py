@@ -0,0 +1,240 @@
+import argparse
+import datetime
+import gzip
+import json
+import random
+import re
+import sys
+import time
+
+import payloads
+from user_pool import random_string
+
+# Trace-driven replay.
+#
+# A trace is a JSONL file (optionally .gz) with one request per line, in time order:
+#
+#   {"ts": 1718000000.25, "method": "POST", "path": "/api/feeds/like", "body_shape": "like"}
+#   {"ts": "2024-06-10T06:13:20Z", "method": "GET", "path": "/api/recipe/get?recipeId={recipeId}"}
+#
+# `ts` is epoch seconds or ISO-8601. Instead of a literal `body`, records usually
+# carry a `body_shape` naming one of BODY_SHAPES, and `{feedId}` / `{recipeId}`
+# placeholders in the path or body are filled from the shared ID catalog, so a
+# trace recorded against production replays against any database.
+# `python request_trace.py from-access-log` turns ingress-nginx access logs into a trace.
+#
+# The file is streamed, never loaded: each Locust process reads only its shard
+# (every `shards`-th record) and its users take records from one shared
+# iterator. Each record is sent at its original offset from the first record
+# divided by `speed`, independent of how fast earlier responses came back.
+
+TS_FORMATS = ("%d/%b/%Y:%H:%M:%S %z",)
+LATE_THRESHOLD = 1.0  # seconds behind schedule after which a send counts as late
+PLACEHOLDER = re.compile(r'\{(feedId|recipeId)\}')
+
+BODY_SHAPES = {
+    "like": lambda ids: {"feedId": ids["feedId"]},
+    "comment": lambda ids: {"feedId": ids["feedId"], "message": random.choice(["Great!", "Yummy!", "Nice photo", "Will try this"])},
+    "save": lambda ids: {"recipeId": ids["recipeId"]},
+    "credentials": lambda ids: {"username": f"user_{random_string()}@test.com", "password": "password123"},
+    "interest_form": lambda ids: payloads.interest_form_fields(f"User_{random_string(4)}", f"Surname_{random_string(4)}"),
+    "recipe": lambda ids: payloads.recipe_fields(f"Recipe {random_string()}"),
+}
+
+# Body shape of the known write endpoints, used when converting access logs (which carry no bodies)
+PATH_BODY_SHAPES = {
+    "/api/feeds/like": "like",
+    "/api/feeds/unlike": "like",
+    "/api/feeds/comment": "comment",
+    "/api/saved-recipes/save": "save",
+    "/api/saved-recipes/unsave": "save",
+    "/api/auth/register": "credentials",
+    "/api/auth/login": "credentials",
+    "/api/interest-form/submit": "interest_form",
+    "/api/recipe/create": "recipe",
+}
+
+
+def parse_ts(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    for fmt in TS_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def iter_trace(path):
+    """
+    Lazily yields (ts, record) for every valid record of a trace file. Lines that
+    are not JSON or lack a timestamp, method or path are skipped.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or not record.get("method") or not record.get("path"):
+                continue
+            ts = parse_ts(record.get("ts", record.get("timestamp")))
+            if ts is not None:
+                yield ts, record
+
+
+def fill_placeholders(value, ids):
+    """
+    Substitutes {feedId} / {recipeId} in strings, recursively in dicts and lists.
+    Raises KeyError when an ID is needed but not available.
+    """
+    if isinstance(value, str):
+        return PLACEHOLDER.sub(lambda m: str(ids[m.group(1)]), value)
+    if isinstance(value, dict):
+        return {k: fill_placeholders(v, ids) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill_placeholders(v, ids) for v in value]
+    return value
+
+
+def request_name(record):
+    return record.get("name") or f"{record['path'].split('?', 1)[0]} [Replay]"
+
+
+class TraceReplayer:
+    """
+    Per-process source of scheduled trace records, shared by all replay users of
+    the process. `next()` returns (due, record) where `due` is the time.monotonic()
+    at which the record should be sent, or None once the shard is exhausted.
+    """
+
+    def __init__(self, path, speed=1.0, shard=0, shards=1, loop=False):
+        self.path = path
+        self.speed = speed if speed > 0 else 1.0
+        self.shard = shard
+        self.shards = max(1, shards)
+        self.loop = loop
+        self.started = None
+        self.first_ts = None
+        self.offset = 0.0  # trace seconds added per completed loop
+        self.sent = self.late = self.skipped = 0
+        self.max_lag = 0.0
+        self._records = None
+
+    def _shard_records(self):
+        while True:
+            last_ts = None
+            for i, (ts, record) in enumerate(iter_trace(self.path)):
+                if self.first_ts is None:
+                    self.first_ts = ts
+                last_ts = ts
+                if i % self.shards == self.shard:
+                    yield ts + self.offset, record
+            if not self.loop or last_ts is None:
+                return
+            # Next pass starts one second after the last record of this one
+            self.offset += last_ts - self.first_ts + 1.0
+
+    def next(self):
+        if self._records is None:
+            self._records = self._shard_records()
+            self.started = time.monotonic()
+        item = next(self._records, None)
+        if item is None:
+            return None
+        ts, record = item
+        return self.started + (ts - self.first_ts) / self.speed, record
+
+    def record_send(self, due):
+        lag = time.monotonic() - due
+        self.sent += 1
+        if lag > LATE_THRESHOLD:
+            self.late += 1
+        self.max_lag = max(self.max_lag, lag)
+
+    def summary(self):
+        return (f"   🎞️  Trace replay: {self.sent} sent, {self.skipped} skipped, "
+                f"{self.late} late by >{LATE_THRESHOLD:.0f}s (max lag {self.max_lag:.1f}s)")
+
+
+# --- Access log conversion ---
+
+ACCESS_LOG_PATTERN = re.compile(
+    r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+) [^"]*" (?P<status>\d{3})'
+)
+ID_PARAMS = re.compile(r'(?P<key>feedId|recipeId)=\d+')
+
+
+def convert_access_log(lines, out, api_prefix="/api/"):
+    """
+    Converts ingress-nginx access log lines to trace records. Concrete feed and
+    recipe IDs become placeholders and write endpoints get their body shape.
+    Returns the number of records written.
+    """
+    count = 0
+    for line in lines:
+        match = ACCESS_LOG_PATTERN.search(line)
+        if not match or not match.group("path").startswith(api_prefix):
+            continue
+        ts = parse_ts(match.group("time"))
+        if ts is None:
+            continue
+        path = ID_PARAMS.sub(lambda m: f"{m.group('key')}={{{m.group('key')}}}", match.group("path"))
+        record = {"ts": ts, "method": match.group("method"), "path": path}
+        shape = PATH_BODY_SHAPES.get(path.split("?", 1)[0])
+        if shape and record["method"] != "GET":
+            record["body_shape"] = shape
+        out.write(json.dumps(record, separators=(',', ':')) + "\n")
+        count += 1
+    return count
+
+
+def describe(path):
+    """
+    Streams a trace once and prints its length, duration, rate and endpoint mix.
+    """
+    count, first, last, mix = 0, None, None, {}
+    for ts, record in iter_trace(path):
+        first = ts if first is None else first
+        last = ts
+        count += 1
+        key = f"{record['method']} {record['path'].split('?', 1)[0]}"
+        mix[key] = mix.get(key, 0) + 1
+    duration = (last - first) if count else 0
+    print(f"📼 {path}: {count} requests over {duration:.0f}s ({count / duration if duration else 0:.1f} req/s)")
+    for key, n in sorted(mix.items(), key=lambda item: -item[1]):
+        print(f"   {n:>8}  {n / count * 100:5.1f}%  {key}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Trace files for the replay user classes')
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("from-access-log", help="Convert ingress-nginx access logs (stdin or files) to a trace")
+    convert.add_argument("logs", nargs="*")
+    convert.add_argument("--out", required=True)
+    info = sub.add_parser("info", help="Print length, duration and endpoint mix of a trace")
+    info.add_argument("trace")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        describe(args.trace)
+    else:
+        written = 0
+        with (gzip.open(args.out, "wt", encoding="utf-8") if args.out.endswith(".gz") else open(args.out, "w")) as out:
+            if not args.logs:
+                written = convert_access_log(sys.stdin, out)
+            for log_path in args.logs:
+                with open(log_path, encoding="utf-8", errors="replace") as f:
+                    written += convert_access_log(f, out)
+        print(f"📼 Wrote {written} requests to {args.out}")
@@ -0,0 +1,146 @@
+import re
+import subprocess
+
+from k8s_api import CADVISOR_PATH, parse_cpu_millicores, parse_memory_bytes
+
+# Memory and CPU throttling per pod, next to the CPU the monitor already samples.
+#
+#   memory working set   metrics API (the MEMORY column of `kubectl top pods`)
+#   request / limit      pod spec, summed over the pod's containers; usage is
+#                        reported as % of the memory request and limit and the
+#                        CPU as % of its limit
+#   CFS throttling       the kubelet's cAdvisor counters, read through the API
+#                        server's node proxy for every node running a tracked
+#                        pod. container_cpu_cfs_throttled_periods_total over
+#                        container_cpu_cfs_periods_total between two ticks is
+#                        the share of 100 ms CFS periods in which the pod hit
+#                        its CPU limit (0 when it never did, absent without a limit)
+
+MIB = 1024 ** 2
+CFS_METRICS = {
+    "container_cpu_cfs_periods_total": 0,
+    "container_cpu_cfs_throttled_periods_total": 1,
+}
+METRIC_LINE = re.compile(r'^(?P<name>[a-z_]+)\{(?P<labels>[^}]*)\}\s+(?P<value>\S+)')
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def pod_resources(pod):
+    """
+    Requests and limits of a Pod object summed over its containers:
+    {"cpu_request_m", "cpu_limit_m", "memory_request", "memory_limit"} (bytes),
+    0 where a container does not set one (the pod total is then unbounded: None).
+    """
+    totals = {"cpu_request_m": 0, "cpu_limit_m": 0, "memory_request": 0, "memory_limit": 0}
+    unbounded = set()
+    for container in pod.get("spec", {}).get("containers", []):
+        resources = container.get("resources") or {}
+        for kind, prefix in (("requests", "request"), ("limits", "limit")):
+            values = resources.get(kind) or {}
+            for resource, key, parse in (("cpu", f"cpu_{prefix}_m", parse_cpu_millicores),
+                                         ("memory", f"memory_{prefix}", parse_memory_bytes)):
+                if resource in values:
+                    totals[key] += parse(values[resource])
+                else:
+                    unbounded.add(key)
+    return {key: (None if key in unbounded or not value else value) for key, value in totals.items()}
+
+
+def parse_cadvisor(text, pods, namespace="default"):
+    """
+    CFS period counters per pod from a cAdvisor exposition: {pod: [periods, throttled]},
+    summed over the pod's containers, for the pods in `pods` only.
+    """
+    counters = {}
+    for line in text.splitlines():
+        if not line.startswith("container_cpu_cfs_"):
+            continue
+        match = METRIC_LINE.match(line)
+        if not match or match.group("name") not in CFS_METRICS:
+            continue
+        labels = dict(LABEL_PAIR.findall(match.group("labels")))
+        pod = labels.get("pod")
+        # The pod-level cgroup has no container label; "POD" is the pause container
+        if pod not in pods or labels.get("namespace") != namespace or labels.get("container") in (None, "", "POD"):
+            continue
+        try:
+            value = float(match.group("value"))
+        except ValueError:
+            continue
+        counters.setdefault(pod, [0.0, 0.0])[CFS_METRICS[match.group("name")]] += value
+    return counters
+
+
+def get_cadvisor_metrics(node):
+    """
+    cAdvisor metrics of one node via `kubectl get --raw`, or "" on failure.
+    """
+    try:
+        cmd = ["kubectl", "get", "--raw", CADVISOR_PATH.format(node=node)]
+        return subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=20).decode("utf-8")
+    except Exception:
+        return ""
+
+
+class ThrottleTracker:
+    """
+    Turns the cumulative CFS counters of successive ticks into the throttled
+    share (%) of each pod's periods since its previous sample.
+    """
+
+    def __init__(self):
+        self._previous = {}
+
+    def update(self, counters):
+        ratios = {}
+        for pod, (periods, throttled) in counters.items():
+            previous = self._previous.get(pod)
+            if previous:
+                d_periods, d_throttled = periods - previous[0], throttled - previous[1]
+                # A restarted container resets its counters; skip that interval
+                if d_periods > 0 and d_throttled >= 0:
+                    ratios[pod] = round(d_throttled / d_periods * 100, 1)
+                elif d_periods == 0:
+                    ratios[pod] = 0.0
+        self._previous = {pod: values for pod, values in counters.items()}
+        return ratios
+
+
+def _pct(value, bound):
+    return round(value / bound * 100, 1) if value is not None and bound else None
+
+
+def usage_fields(cpu, memory, resources, throttled):
+    """
+    The fields added to a deployment's K8s sample. `cpu` (millicores) and
+    `memory` (bytes) are {pod: usage}, `resources` {pod: pod_resources} of the
+    deployment's pods, `throttled` {pod: %}. Pods without the respective request
+    / limit are left out of the percentage maps. The deployment's memory request
+    / limit (MiB) and CPU limit (m) are the largest over its pods, which only
+    differ during a rollout.
+    """
+    def largest(key, scale=1):
+        values = [r[key] for r in resources.values() if r.get(key)]
+        return round(max(values) / scale, 1) if values else None
+
+    fields = {
+        "memory": {pod: round(value / MIB, 1) for pod, value in memory.items()},
+        "memory_request_pct": {},
+        "memory_limit_pct": {},
+        "cpu_limit_pct": {},
+        "throttled": dict(throttled),
+        "memory_request_mib": largest("memory_request", MIB),
+        "memory_limit_mib": largest("memory_limit", MIB),
+        "cpu_limit_m": largest("cpu_limit_m"),
+    }
+    for pod, value in memory.items():
+        limits = resources.get(pod) or {}
+        for key, bound in (("memory_request_pct", "memory_request"), ("memory_limit_pct", "memory_limit")):
+            pct = _pct(value, limits.get(bound))
+            if pct is not None:
+                fields[key][pod] = pct
+    for pod, value in cpu.items():
+        pct = _pct(value, (resources.get(pod) or {}).get("cpu_limit_m"))
+        if pct is not None:
+            fields["cpu_limit_pct"][pod] = pct
+    return fields
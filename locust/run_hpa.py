@@ -9,28 +9,67 @@ import datetime
 import shutil
 import re
 import argparse
+import base64
+import gzip
+import urllib.request
+import socket
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+import k8s_api
+import log_follower
+import report_data
+import hpa_analyzer
+import sample_store
+import timeline
+import capacity_search
+import dashboard
+import metrics_exporter
+import payloads
+import pod_lifecycle
+import resource_usage
+import user_pool
 
 # Configuration
 HOST = "http://136.114.153.163/" # Ensure this matches your Ingress IP
 OUTPUT_DIR = "results_hpa" # Relative to script location
+SAMPLES_PREFIX = "samples_" # default sample store: results_hpa/samples_<timestamp>
 USER_CLASS = "AuthenticatedUser" # High CPU usage profile
 POLL_INTERVAL = 5 # seconds
+THROTTLE_WARNING = 25  # % of CFS periods throttled that marks a pod as CPU-starved by its limit
+MEMORY_WARNING = 90  # % of the memory limit that marks memory pressure (OOMKill risk)
+MAX_CHART_POINTS = 1000 # point budget per chart in the K8s report (downsampled beyond this)
+OFFLINE_REPORT = False # embed Chart.js + gzip'd data so the report opens without internet
+CHARTJS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"
+CHARTJS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "heath-locust", "chart-4.4.1.umd.min.js")
+CHARTJS_PATH = None # local Chart.js build to embed (overrides the cache)
 TEST_DURATION = 120 # seconds
 
 USERS = 10
 SPAWN_RATE = 1
+WORKERS = 0 # 0 = single Locust process, N = one master + N local workers
+LOCUST_SHUTDOWN_TIMEOUT = 60 # seconds Locust gets after Ctrl-C to write its report
+LOCUST_AUTOQUIT = 10 # seconds the Locust web UI stays up after the run ends
 
-# Global list to store metrics
-metrics_data = []
-db_pool_data = []  # DB Connection Pool metrics
+# Samples are streamed to disk as they are collected (see sample_store.py):
+#   "k8s"       one record per tick (replicas, HPA CPU, pod / node CPU)
+#   "db_pool"   one aggregated DB connection pool record per tick
+#   "db_events" every HikariCP event seen by the log follower
+sample_store_dir = None
+samples = None  # sample_store.SampleStore for the current run
 monitoring_active = True
+k8s_api_collector = None  # Set when --k8s-api is used instead of kubectl forks
+db_log_follower = None  # Streams HikariCP events from every backend pod
+pod_tracker = None  # pod_lifecycle.PodLifecycleTracker for backend / frontend pods
+throttle_tracker = resource_usage.ThrottleTracker()  # CFS counters of the previous tick
 
-def get_pod_metrics(app_label):
+def get_pod_usage(app_label):
     """
-    Parses `kubectl top pods -l app={app_label}` to get CPU for each individual pod.
-    Returns a dict: { "pod_name": cpu_millicores, ... }
+    Parses `kubectl top pods -l app={app_label}` to get CPU and memory for each individual pod.
+    Returns: ({ "pod_name": cpu_millicores, ... }, { "pod_name": memory_working_set_bytes, ... })
     """
     pod_cpu_map = {}
+    pod_memory_map = {}
     try:
         # kubectl top pods -l app={app_label} --no-headers
         cmd = ["kubectl", "top", "pods", "-l", f"app={app_label}", "--no-headers"]
@@ -52,9 +91,11 @@ def get_pod_metrics(app_label):
                         cpu_val = 0
                         
                 pod_cpu_map[pod_name] = cpu_val
+                if len(parts) >= 3:
+                    pod_memory_map[pod_name] = k8s_api.parse_memory_bytes(parts[2])  # e.g. "245Mi"
     except:
         pass
-    return pod_cpu_map
+    return pod_cpu_map, pod_memory_map
 
 def get_hpa_metrics(hpa_name):
     """
@@ -125,12 +166,13 @@ def get_node_metrics():
         pass
     return total, ready
 
-def get_node_cpu_utilization():
+def get_node_usage():
     """
-    Parses `kubectl top nodes --no-headers` to get CPU % for each node.
-    Returns: dict { "node_name": cpu_percent }
+    Parses `kubectl top nodes --no-headers` to get CPU % and memory % for each node.
+    Returns: ({ "node_name": cpu_percent }, { "node_name": memory_percent })
     """
     node_cpu_map = {}
+    node_memory_map = {}
     try:
         cmd = ["kubectl", "top", "nodes", "--no-headers"]
         output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode('utf-8').strip()
@@ -146,9 +188,14 @@ def get_node_cpu_utilization():
                     node_cpu_map[node_name] = int(cpu_percent_str)
                 except:
                     node_cpu_map[node_name] = 0
+                if len(parts) >= 5:
+                    try:
+                        node_memory_map[node_name] = int(parts[4].replace('%', ''))
+                    except ValueError:
+                        pass
     except:
         pass
-    return node_cpu_map
+    return node_cpu_map, node_memory_map
 
 def fetch_recent_db_pool_logs(since_seconds=10):
     """
@@ -196,11 +243,18 @@ def fetch_recent_db_pool_logs(since_seconds=10):
 
 def poll_db_pool_metrics():
     """
-    Polls DB pool metrics by fetching recent logs (same approach as visualize_db_bottleneck.py).
+    Drains the HikariCP events streamed since the previous tick. Falls back to
+    fetching a recent log window when no follower is running.
     Returns: dict with total, active, idle, waiting
     """
-    # Fetch recent logs and parse them
-    recent_data = fetch_recent_db_pool_logs(since_seconds=POLL_INTERVAL + 2)
+    follower = db_log_follower
+    if follower:
+        recent_data = follower.drain()
+        if samples:
+            for event in recent_data:
+                samples.append("db_events", event)
+    else:
+        recent_data = fetch_recent_db_pool_logs(since_seconds=POLL_INTERVAL + 2)
     
     if recent_data:
         # Aggregate: use max waiting from recent period (captures spikes)
@@ -221,73 +275,196 @@ def poll_db_pool_metrics():
         "waiting": 0
     }
 
+def k8s_probes(source):
+    """
+    The per-tick probes as {key: (callable, *args)}, read from the in-process API
+    collector `source` when one is running and from kubectl otherwise.
+    """
+    probes = {
+        "be_hpa": (source.get_hpa_metrics if source else get_hpa_metrics, "heath-backend-hpa"),
+        "fe_hpa": (source.get_hpa_metrics if source else get_hpa_metrics, "heath-frontend-hpa"),
+        "be_deploy": (source.get_deployment_metrics if source else get_deployment_metrics, "heath-backend"),
+        "fe_deploy": (source.get_deployment_metrics if source else get_deployment_metrics, "heath-frontend"),
+        "be_pods": (source.get_pod_usage if source else get_pod_usage, "backend"),
+        "fe_pods": (source.get_pod_usage if source else get_pod_usage, "frontend"),
+        "nodes": (source.get_node_metrics if source else get_node_metrics,),
+        "node_cpu": (source.get_node_usage if source else get_node_usage,),
+        "db_pool": (poll_db_pool_metrics,),
+    }
+    if not source:
+        # The API collector feeds the pod tracker from its watch instead
+        probes["pod_objects"] = (pod_lifecycle.get_pods_json,)
+    return probes
+
+def collect_k8s_sample(executor):
+    """
+    Runs every per-tick probe concurrently so one slow `kubectl` call does not
+    delay the others. Uses the in-process API collector when one is running.
+    A second, parallel stage reads the cAdvisor CFS counters of the nodes the
+    backend / frontend pods run on (see resource_usage.py).
+    Returns (sample, db_metrics, latency_seconds).
+    """
+    source = k8s_api_collector
+    started = time.perf_counter()
+    futures = {key: executor.submit(*probe) for key, probe in k8s_probes(source).items()}
+    results = {key: future.result() for key, future in futures.items()}
+    pod_objects = source.pod_objects(pod_lifecycle.APPS) if source else results["pod_objects"]
+    if pod_tracker and not source and pod_objects is not None:
+        pod_tracker.update(pod_objects)
+
+    # Requests / limits from the pod specs, CFS throttling from the nodes running the pods
+    resources = {app: {} for app in pod_lifecycle.APPS}
+    pod_nodes = set()
+    for pod in pod_objects or []:
+        app = pod['metadata'].get('labels', {}).get('app')
+        resources.setdefault(app, {})[pod['metadata']['name']] = resource_usage.pod_resources(pod)
+        if pod.get('spec', {}).get('nodeName'):
+            pod_nodes.add(pod['spec']['nodeName'])
+    fetch_cadvisor = source.get_cadvisor_metrics if source else resource_usage.get_cadvisor_metrics
+    tracked = {name for pods in resources.values() for name in pods}
+    counters = {}
+    for text in executor.map(fetch_cadvisor, sorted(pod_nodes)):
+        counters.update(resource_usage.parse_cadvisor(text, tracked))
+    throttled = throttle_tracker.update(counters)
+    latency = time.perf_counter() - started
+
+    def usage(app, key):
+        cpu, memory = results[key]
+        app_throttled = {pod: value for pod, value in throttled.items() if pod in resources[app]}
+        return resource_usage.usage_fields(cpu, memory, resources[app], app_throttled)
+
+    _, be_hpa_cpu = results["be_hpa"]
+    _, fe_hpa_cpu = results["fe_hpa"]
+    be_desired, be_ready = results["be_deploy"]
+    fe_desired, fe_ready = results["fe_deploy"]
+    total_nodes, ready_nodes = results["nodes"]
+
+    sample = {
+        "nodes": {
+            "total": total_nodes,
+            "ready": ready_nodes,
+            "cpu_utilization": results["node_cpu"][0],
+            "memory_utilization": results["node_cpu"][1]
+        },
+        "backend": {
+            "desired_replicas": be_desired,
+            "ready_replicas": be_ready,
+            "hpa_cpu": be_hpa_cpu,
+            "pods": results["be_pods"][0],
+            **usage("backend", "be_pods")
+        },
+        "frontend": {
+            "desired_replicas": fe_desired,
+            "ready_replicas": fe_ready,
+            "hpa_cpu": fe_hpa_cpu,
+            "pods": results["fe_pods"][0],
+            **usage("frontend", "fe_pods")
+        }
+    }
+    return sample, results["db_pool"], latency
+
 def monitor_k8s_metrics(results_dir):
     """
     Background thread function to poll Kubernetes HPA and Pod metrics for both Backend and Frontend.
     Also polls DB connection pool metrics at each interval by fetching recent logs.
+
+    Ticks are scheduled on a fixed-rate clock (start + n * POLL_INTERVAL) rather than
+    sleeping after the work, so a slow tick does not stretch the sampling interval.
+    If a tick overruns a whole interval, the missed ticks are skipped instead of bursting.
+
+    `elapsed` is measured on the monotonic clock and `timestamp` is derived from it
+    (start wall time + elapsed), so every sample maps onto the run timebase that
+    the Locust history and latency streams are joined on (see timeline.py).
     """
-    global monitoring_active, db_pool_data
     print("   👀 Kubernetes Monitoring Started (Backend, Frontend & DB Pool)...")
     
     start_time = time.time()
+    start_mono = time.monotonic()
+    tick = 0
     
-    while monitoring_active:
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        elapsed = int(time.time() - start_time)
-        
-        # HPA Metrics (CPU target)
-        _, be_hpa_cpu = get_hpa_metrics("heath-backend-hpa")
-        _, fe_hpa_cpu = get_hpa_metrics("heath-frontend-hpa")
+    # One worker per probe, so a tick never waits for a free worker
+    workers = len(k8s_probes(k8s_api_collector))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="k8s-probe") as executor:
+        while monitoring_active:
+            elapsed = round(time.monotonic() - start_mono, 3)
+            captured_at = start_time + elapsed
+            timestamp = datetime.datetime.fromtimestamp(captured_at).strftime("%H:%M:%S")
 
-        # Deployment Metrics (True Replica Counts)
-        be_desired, be_ready = get_deployment_metrics("heath-backend")
-        fe_desired, fe_ready = get_deployment_metrics("heath-frontend")
+            sample, db_metrics, latency = collect_k8s_sample(executor)
 
-        # Pod CPU Metrics
-        be_pods = get_pod_metrics("backend")
-        fe_pods = get_pod_metrics("frontend")
+            # DB Connection Pool Metrics (polled at same interval)
+            samples.append("db_pool", {
+                "time": timestamp,
+                "elapsed": elapsed,
+                "timestamp": captured_at,
+                "total": db_metrics.get('total', 10),
+                "active": db_metrics.get('active', 0),
+                "idle": db_metrics.get('idle', 0),
+                "waiting": db_metrics.get('waiting', 0)
+            })
 
-        # Node Metrics
-        total_nodes, ready_nodes = get_node_metrics()
-        node_cpu_usage = get_node_cpu_utilization()
-        
-        # DB Connection Pool Metrics (polled at same interval)
-        db_metrics = poll_db_pool_metrics()
-        db_pool_data.append({
-            "time": timestamp,
-            "elapsed": elapsed,
-            "total": db_metrics.get('total', 10),
-            "active": db_metrics.get('active', 0),
-            "idle": db_metrics.get('idle', 0),
-            "waiting": db_metrics.get('waiting', 0)
-        })
-
-        # Store data point
-        metrics_data.append({
-            "time": timestamp,
-            "elapsed": elapsed,
-            "nodes": {
-                "total": total_nodes,
-                "ready": ready_nodes,
-                "cpu_utilization": node_cpu_usage
-            },
-            "backend": {
-                "desired_replicas": be_desired,
-                "ready_replicas": be_ready,
-                "hpa_cpu": be_hpa_cpu,
-                "pods": be_pods
-            },
-            "frontend": {
-                "desired_replicas": fe_desired,
-                "ready_replicas": fe_ready,
-                "hpa_cpu": fe_hpa_cpu,
-                "pods": fe_pods
-            }
-        })
-        
-        time.sleep(POLL_INTERVAL)
+            # Store data point
+            samples.append("k8s", {
+                "time": timestamp,
+                "elapsed": elapsed,
+                "timestamp": captured_at,
+                "collection_latency": round(latency, 3),
+                **sample
+            })
+            if pod_tracker:
+                for event in pod_tracker.drain():
+                    samples.append(pod_lifecycle.STREAM, event)
+
+            if latency > POLL_INTERVAL:
+                print(f"   ⚠️  K8s sample took {latency:.1f}s (> {POLL_INTERVAL}s interval)")
+
+            # Fixed-rate schedule: wait for the next tick boundary that is still ahead of us
+            now = time.monotonic()
+            tick = max(tick + 1, int((now - start_mono) // POLL_INTERVAL) + 1)
+            while monitoring_active and time.monotonic() < start_mono + tick * POLL_INTERVAL:
+                time.sleep(max(0, min(0.5, start_mono + tick * POLL_INTERVAL - time.monotonic())))
 
-def generate_k8s_report(results_dir):
+def load_chartjs_runtime():
+    """
+    Returns the Chart.js source to embed in offline reports: CHARTJS_PATH if set,
+    else the local cache, else one download that fills the cache.
+    Raises RuntimeError if none is available; an offline report must not fall back to the CDN.
+    """
+    if CHARTJS_PATH:
+        if not os.path.exists(CHARTJS_PATH):
+            raise RuntimeError(f"Chart.js build not found: {CHARTJS_PATH}")
+        with open(CHARTJS_PATH, encoding="utf-8") as f:
+            return f.read()
+    if os.path.exists(CHARTJS_CACHE):
+        with open(CHARTJS_CACHE, encoding="utf-8") as f:
+            return f.read()
+    try:
+        with urllib.request.urlopen(CHARTJS_URL, timeout=15) as resp:
+            source = resp.read().decode("utf-8")
+    except Exception as e:
+        raise RuntimeError(f"Could not fetch Chart.js for the offline report ({e}); pass a local build with --chartjs")
+    os.makedirs(os.path.dirname(CHARTJS_CACHE), exist_ok=True)
+    with open(CHARTJS_CACHE, "w", encoding="utf-8") as f:
+        f.write(source)
+    return source
+
+def embed_report_data(payload, compressed):
+    """
+    Returns the JS that calls renderReport(DATA) with the chart data, either as a
+    JSON literal or as a base64 gzip blob inflated in the browser (DecompressionStream).
+    """
+    data = json.dumps(payload, separators=(',', ':')).replace("</", "<\\/")
+    if not compressed:
+        return f"renderReport({data});"
+    blob = base64.b64encode(gzip.compress(data.encode("utf-8"), compresslevel=9, mtime=0)).decode("ascii")
+    return f"""
+            (async () => {{
+                const bytes = Uint8Array.from(atob('{blob}'), c => c.charCodeAt(0));
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                renderReport(JSON.parse(await new Response(stream).text()));
+            }})();"""
+
+def generate_k8s_report(results_dir, store_dir):
     """
     Generates HTML report with charts:
     1. Backend HPA
@@ -296,84 +473,192 @@ def generate_k8s_report(results_dir):
     4. Frontend Pods
     5. Nodes
     6. DB Connection Pool (if data available)
+    7. Request latency percentiles (if the Locust master wrote histograms)
+    8. Load vs scaling timeline (Locust history joined with the K8s / DB samples)
+    9. Pod lifecycle (per-pod phases, startup latency distribution, restarts)
+    10. Memory and CPU throttling per pod (if the monitor recorded them)
+
+    Samples are pivoted from the on-disk store into columns in a single pass
+    (see report_data.py); only the series the charts draw are embedded, each
+    downsampled to MAX_CHART_POINTS per chart.
     """
-    
-    # helper to extract pod datasets
-    def get_pod_datasets(data_key):
-        all_names = set()
-        for entry in metrics_data:
-            all_names.update(entry[data_key]['pods'].keys())
-        
-        datasets = []
-        colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF', '#E7E9ED', '#767676']
-        
-        for idx, name in enumerate(sorted(all_names)):
-            points = []
-            for entry in metrics_data:
-                points.append(entry[data_key]['pods'].get(name, 0))
-            
-            datasets.append({
-                "label": name,
-                "data": points,
-                "borderColor": colors[idx % len(colors)],
-                "backgroundColor": colors[idx % len(colors)],
-                "fill": False,
-                "tension": 0.1
-            })
-        return datasets
+    colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF', '#E7E9ED', '#767676']
+    budget = MAX_CHART_POINTS
+    point_counts = {}  # chart -> (raw, rendered)
 
-    be_pod_datasets = get_pod_datasets('backend')
-    fe_pod_datasets = get_pod_datasets('frontend')
-    
-    # NEW: Node CPU Datasets
-    def get_node_cpu_datasets():
-        all_nodes = set()
-        for entry in metrics_data:
-            if 'cpu_utilization' in entry['nodes']:
-                all_nodes.update(entry['nodes']['cpu_utilization'].keys())
-            
-        datasets = []
-        colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40', '#C9CBCF', '#E7E9ED', '#767676']
-        
-        for idx, name in enumerate(sorted(all_nodes)):
-            points = []
-            for entry in metrics_data:
-                if 'cpu_utilization' in entry['nodes']:
-                    points.append(entry['nodes']['cpu_utilization'].get(name, 0))
-                else:
-                    points.append(0)
-            
-            datasets.append({
-                "label": name,
-                "data": points,
-                "borderColor": colors[idx % len(colors)],
-                "backgroundColor": colors[idx % len(colors)],
-                "fill": False,
-                "tension": 0.1
-            })
-        return datasets
+    k8s = report_data.load_k8s_table(store_dir)
+    sample_count = len(k8s)
+    last_elapsed = k8s.last("elapsed", 0)
+    clock_start = k8s.values("time")[0] if sample_count else "00:00:00"
 
-    node_cpu_datasets = get_node_cpu_datasets()
+    # helper to downsample the series of one chart and record its point counts
+    def chart_series(chart, specs, table=k8s):
+        per_series = budget // len(specs)
+        series, raw, rendered = [], 0, 0
+        for name, mode in specs:
+            data, raw_points = table.series(name, per_series, mode)
+            series.append(data)
+            raw += raw_points
+            rendered += len(data["x"])
+        point_counts[chart] = (raw, rendered)
+        return series
+
+    be_desired, be_ready, be_hpa_cpu = chart_series("beHpaChart", [("be_desired", "step"), ("be_ready", "step"), ("be_hpa_cpu", "extremes")])
+    fe_desired, fe_ready, fe_hpa_cpu = chart_series("feHpaChart", [("fe_desired", "step"), ("fe_ready", "step"), ("fe_hpa_cpu", "extremes")])
+    total_nodes, ready_nodes = chart_series("nodeChart", [("total_nodes", "step"), ("ready_nodes", "step")])
+
+    be_pod_datasets, *point_counts["bePodsChart"] = k8s.datasets("be_pods", colors, budget, "extremes")
+    fe_pod_datasets, *point_counts["fePodsChart"] = k8s.datasets("fe_pods", colors, budget, "extremes")
+    node_cpu_datasets, *point_counts["nodeCpuChart"] = k8s.datasets("node_cpu", colors, budget, "extremes")
+    db_event_count = sum(1 for _ in sample_store.iter_records(store_dir, "db_events"))
 
     # Prepare DB Pool data (now collected at regular intervals)
-    db_pool_labels = [d['time'] for d in db_pool_data]
-    db_pool_total = [d['total'] for d in db_pool_data]
-    db_pool_active = [d['active'] for d in db_pool_data]
-    db_pool_idle = [d['idle'] for d in db_pool_data]
-    db_pool_waiting = [d['waiting'] for d in db_pool_data]
-    max_waiting = max(db_pool_waiting) if db_pool_waiting else 0
-    max_active = max(db_pool_active) if db_pool_active else 0
-    total_exhaustion_events = sum(1 for w in db_pool_waiting if w > 0)
-    
-    # Calculate pool utilization percentage for better visualization
-    db_pool_utilization = []
-    for i in range(len(db_pool_active)):
-        total = db_pool_total[i] if db_pool_total[i] > 0 else 10
-        util = (db_pool_active[i] / total) * 100
-        db_pool_utilization.append(round(util, 1))
+    db = report_data.load_db_pool_table(store_dir)
+    # Bars share one x axis: keep exact `waiting` peaks plus the utilization shape
+    db_elapsed = list(db.column("elapsed"))
+    db_keep = sorted(
+        set(report_data.select_indices(db_elapsed, list(db.column("waiting")), budget // 2, "extremes"))
+        | set(report_data.select_indices(db_elapsed, list(db.column("utilization")), budget // 2))
+    )
+    point_counts["dbPoolChart"] = (len(db), len(db_keep))
+    db_pool_labels = db.take("time", db_keep)
+    db_pool_total = db.values("total")
+    db_pool_active = db.take("active", db_keep)
+    db_pool_idle = db.take("idle", db_keep)
+    db_pool_waiting = db.take("waiting", db_keep)
+    db_pool_utilization = db.take("utilization", db_keep)
+    db_pool_total_shown = db.take("total", db_keep)
+
+    # Request latency: merged HDR histogram snapshots, on the same elapsed axis as the K8s samples
+    run_start = report_data.run_start(store_dir)
+    latency = report_data.load_latency_table(store_dir, run_start) if run_start is not None else None
+    has_latency = bool(latency is not None and len(latency))
+    lat_p50 = lat_p95 = lat_p99 = lat_p999 = {"x": [], "y": []}
+    endpoint_p99_datasets = []
+    if has_latency:
+        lat_p50, lat_p95, lat_p99, lat_p999 = chart_series(
+            "latencyChart", [("p50", "extremes"), ("p95", "extremes"), ("p99", "extremes"), ("p999", "extremes")], latency
+        )
+        endpoint_p99_datasets, *point_counts["endpointP99Chart"] = latency.datasets("endpoint_p99", colors, budget, "extremes")
+
+    # Unified timeline: Locust's history joined as-of with the K8s, DB pool and latency samples
+    has_timeline = sample_store.has_stream(store_dir, "locust") and run_start is not None
+    tl_rps = tl_p99 = tl_be_ready = tl_db_waiting = {"x": [], "y": []}
+    if has_timeline:
+        timeline_path = os.path.join(results_dir, "timeline.csv")
+        timeline_rows = timeline.write_timeline_csv(store_dir, timeline_path)
+        print(f"🧵 Timeline ({timeline_rows} rows, {timeline.STEP:g}s grid): {timeline_path}")
+        tl = timeline.load_timeline_table(store_dir)
+        tl_rps, tl_p99, tl_be_ready, tl_db_waiting = chart_series("timelineChart", [
+            ("rps", "lttb"), ("hdr_p99" if has_latency else "locust_p99", "extremes"),
+            ("be_ready", "step"), ("db_waiting", "extremes")
+        ], tl)
+    # Pod lifecycle: phases of every backend / frontend pod on the run timebase
+    has_pods = sample_store.has_stream(store_dir, pod_lifecycle.STREAM) and run_start is not None
+    lifecycle = None
+    pod_payload = {"podLabels": [], "podPhases": {}, "podRestarts": [], "podRunEnd": 0, "startupBins": [], "startupCounts": {}}
+    if has_pods:
+        lifecycle = pod_lifecycle.analyze(store_dir, run_start)
+        run_end = last_elapsed + POLL_INTERVAL
+        # Pods that were alive at some point of the run, in creation order per app
+        shown = [p for p in lifecycle["pods"] if p["deleted"] is None or p["deleted"] >= 0]
+        phases = {name: [] for name in ("pending", "starting", "notReady", "ready", "terminating")}
+        for pod in shown:
+            ended = pod["deleted"] if pod["deleted"] is not None else run_end
+            stops = pod["terminating"] if pod["terminating"] is not None else ended
+            # Each phase ends where the next one the pod reached begins
+            until = lambda *keys: next((pod[k] for k in keys if pod[k] is not None), stops)
+            spans = {
+                "pending": (pod["created"], until("scheduled", "started", "ready")),
+                "starting": (pod["scheduled"], until("started", "ready")),
+                "notReady": (pod["started"], until("ready")),
+                "ready": (pod["ready"], stops),
+                "terminating": (pod["terminating"], ended),
+            }
+            for name, (a, b) in spans.items():
+                phases[name].append([a, b] if a is not None and b is not None else None)
+        startup_bins, startup_counts = pod_lifecycle.startup_histogram(lifecycle["pods"])
+        pod_payload = {
+            "podLabels": [p["pod"] for p in shown],
+            "podPhases": phases,
+            "podRestarts": [
+                {"x": r["at"], "y": p["pod"], "reason": r["reason"] or "Unknown", "exitCode": r["exit_code"]}
+                for p in shown for r in p["restarts"] if r["at"] is not None
+            ],
+            "podRunEnd": run_end,
+            "startupBins": startup_bins,
+            "startupCounts": startup_counts,
+        }
+
+    # Memory and CPU throttling per pod (resource_usage.py); stores from before it have no such series
+    has_resources = bool(k8s.pivots["be_memory"].names or k8s.pivots["fe_memory"].names)
+    resource_payload = {}
+    resource_peaks = {}
+    if has_resources:
+        def share_above(pivot_name, threshold):
+            # % of pod samples above `threshold`
+            pivot = k8s.pivots[pivot_name]
+            values = [v for idx in range(len(pivot.names)) for v in pivot.present(idx)[1]]
+            return round(sum(1 for v in values if v > threshold) / len(values) * 100, 1) if values else 0
+
+        for prefix in ("be", "fe"):
+            memory, *point_counts[f"{prefix}MemoryChart"] = k8s.datasets(f"{prefix}_memory", colors, budget, "extremes")
+            throttled, *point_counts[f"{prefix}ThrottleChart"] = k8s.datasets(f"{prefix}_throttled", colors, budget, "extremes")
+            request, limit = chart_series(f"{prefix}MemoryBounds", [(f"{prefix}_memory_request", "step"), (f"{prefix}_memory_limit", "step")])
+            empty = {"x": [], "y": []}
+            resource_payload.update({
+                f"{prefix}Memory": memory,
+                f"{prefix}Throttled": throttled,
+                f"{prefix}MemoryRequest": request if k8s.max(f"{prefix}_memory_request") else empty,
+                f"{prefix}MemoryLimit": limit if k8s.max(f"{prefix}_memory_limit") else empty,
+            })
+            resource_peaks[prefix] = {
+                "memory": k8s.pivots[f"{prefix}_memory"].column_max(),
+                "request_pct": k8s.pivots[f"{prefix}_memory_request_pct"].column_max(),
+                "limit_pct": k8s.pivots[f"{prefix}_memory_limit_pct"].column_max(),
+                "cpu_limit_pct": k8s.pivots[f"{prefix}_cpu_limit_pct"].column_max(),
+                "throttled": k8s.pivots[f"{prefix}_throttled"].column_max(),
+                "throttled_share": share_above(f"{prefix}_throttled", THROTTLE_WARNING),
+                "has_throttling": bool(k8s.pivots[f"{prefix}_throttled"].names),
+            }
+        resource_payload["nodeMemory"], *point_counts["nodeMemoryChart"] = k8s.datasets("node_memory", colors, budget, "extremes")
+
+    raw_points = sum(raw for raw, _ in point_counts.values())
+    rendered_points = sum(rendered for _, rendered in point_counts.values())
+
+    report_payload = {
+        "beDesired": be_desired, "beReady": be_ready, "beHpaCpu": be_hpa_cpu,
+        "feDesired": fe_desired, "feReady": fe_ready, "feHpaCpu": fe_hpa_cpu,
+        "totalNodes": total_nodes, "readyNodes": ready_nodes,
+        "bePods": be_pod_datasets, "fePods": fe_pod_datasets, "nodeCpu": node_cpu_datasets,
+        "dbPoolLabels": db_pool_labels, "dbPoolTotal": db_pool_total_shown, "dbPoolActive": db_pool_active,
+        "dbPoolIdle": db_pool_idle, "dbPoolWaiting": db_pool_waiting, "dbPoolUtilization": db_pool_utilization,
+        "latP50": lat_p50, "latP95": lat_p95, "latP99": lat_p99, "latP999": lat_p999,
+        "endpointP99": endpoint_p99_datasets,
+        "tlRps": tl_rps, "tlP99": tl_p99, "tlBeReady": tl_be_ready, "tlDbWaiting": tl_db_waiting,
+        **pod_payload,
+        **resource_payload,
+    }
+
+    # Offline mode: Chart.js is inlined once and the data is a gzip blob; otherwise load it from the CDN
+    chartjs_source = load_chartjs_runtime() if OFFLINE_REPORT else None
+    if chartjs_source:
+        chartjs_tag = "<script>" + chartjs_source.replace("</script", "<\\/script") + "</script>"
+    else:
+        chartjs_tag = f'<script src="{CHARTJS_URL}"></script>'
+    data_script = embed_report_data(report_payload, compressed=bool(chartjs_source))
+
+    def points_note(chart):
+        raw, rendered = point_counts[chart]
+        if raw == rendered:
+            return f'<div class="points-note">{raw} points</div>'
+        return f'<div class="points-note">{rendered} of {raw} points rendered (downsampled)</div>'
     
-    avg_utilization = round(sum(db_pool_utilization) / len(db_pool_utilization), 1) if db_pool_utilization else 0
-    max_utilization = max(db_pool_utilization) if db_pool_utilization else 0
+    max_waiting = db.max("waiting")
+    max_active = db.max("active")
+    total_exhaustion_events = db.count_where_positive("waiting")
+    avg_utilization = round(db.mean("utilization"), 1)
+    max_utilization = db.max("utilization")
     pool_size = db_pool_total[0] if db_pool_total else 10
     
     # DB Pool section HTML - show status based on whether exhaustion occurred
@@ -423,25 +708,26 @@ def generate_k8s_report(results_dir):
                 </div>
             </div>
             <canvas id="dbPoolChart"></canvas>
+            {points_note("dbPoolChart")}
         </div>
     </div>
     """
     
-    db_pool_script = f"""
+    db_pool_script = """
         // --- DB Connection Pool Chart ---
-        const dbPoolLabels = {json.dumps(db_pool_labels)};
-        const dbPoolTotal = {json.dumps(db_pool_total)};
-        const dbPoolActive = {json.dumps(db_pool_active)};
-        const dbPoolIdle = {json.dumps(db_pool_idle)};
-        const dbPoolWaiting = {json.dumps(db_pool_waiting)};
-        const dbPoolUtilization = {json.dumps(db_pool_utilization)};
+        const dbPoolLabels = DATA.dbPoolLabels;
+        const dbPoolTotal = DATA.dbPoolTotal;
+        const dbPoolActive = DATA.dbPoolActive;
+        const dbPoolIdle = DATA.dbPoolIdle;
+        const dbPoolWaiting = DATA.dbPoolWaiting;
+        const dbPoolUtilization = DATA.dbPoolUtilization;
         
-        new Chart(document.getElementById('dbPoolChart'), {{
+        new Chart(document.getElementById('dbPoolChart'), {
             type: 'bar',
-            data: {{
+            data: {
                 labels: dbPoolLabels,
                 datasets: [
-                    {{
+                    {
                         label: 'Pool Utilization %',
                         data: dbPoolUtilization,
                         backgroundColor: dbPoolUtilization.map(v => 
@@ -457,8 +743,8 @@ def generate_k8s_report(results_dir):
                         borderWidth: 1,
                         yAxisID: 'y',
                         order: 2
-                    }},
-                    {{
+                    },
+                    {
                         label: 'Requests Waiting (Queue)',
                         data: dbPoolWaiting,
                         type: 'line',
@@ -471,44 +757,44 @@ def generate_k8s_report(results_dir):
                         pointBackgroundColor: '#e74c3c',
                         yAxisID: 'y1',
                         order: 1
-                    }}
+                    }
                 ]
-            }},
-            options: {{
+            },
+            options: {
                 responsive: true,
-                interaction: {{ mode: 'index', intersect: false }},
-                scales: {{
-                    y: {{
+                interaction: { mode: 'index', intersect: false },
+                scales: {
+                    y: {
                         beginAtZero: true,
                         max: 100,
                         position: 'left',
-                        title: {{ display: true, text: 'Pool Utilization (%)' }},
-                        ticks: {{
-                            callback: function(value) {{ return value + '%'; }}
-                        }}
-                    }},
-                    y1: {{
+                        title: { display: true, text: 'Pool Utilization (%)' },
+                        ticks: {
+                            callback: function(value) { return value + '%'; }
+                        }
+                    },
+                    y1: {
                         beginAtZero: true,
                         position: 'right',
-                        title: {{ display: true, text: 'Waiting Requests' }},
-                        grid: {{ drawOnChartArea: false }}
-                    }},
-                    x: {{
-                        title: {{ display: true, text: 'Time' }},
-                        ticks: {{ maxTicksLimit: 20 }}
-                    }}
-                }},
-                plugins: {{
-                    title: {{
+                        title: { display: true, text: 'Waiting Requests' },
+                        grid: { drawOnChartArea: false }
+                    },
+                    x: {
+                        title: { display: true, text: 'Time' },
+                        ticks: { maxTicksLimit: 20 }
+                    }
+                },
+                plugins: {
+                    title: {
                         display: true,
                         text: 'DB Connection Pool: Utilization & Queue (Red bars = >90% | Orange = >70% | Green = Healthy)'
-                    }},
-                    legend: {{
+                    },
+                    legend: {
                         position: 'bottom'
-                    }},
-                    tooltip: {{
-                        callbacks: {{
-                            afterBody: function(context) {{
+                    },
+                    tooltip: {
+                        callbacks: {
+                            afterBody: function(context) {
                                 const idx = context[0].dataIndex;
                                 return [
                                     '',
@@ -516,20 +802,324 @@ def generate_k8s_report(results_dir):
                                     'Active: ' + dbPoolActive[idx],
                                     'Idle: ' + dbPoolIdle[idx]
                                 ];
-                            }}
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                            }
+                        }
+                    }
+                }
+            }
+        });
+    """
+
+    peak_p99 = f"{latency.max('p99')} ms" if has_latency else "n/a"
+    latency_section = f"""
+    <!-- REQUEST LATENCY SECTION -->
+    <div class="row">
+        <div class="col card">
+            <h2>Request Latency (ms, all endpoints)</h2>
+            <canvas id="latencyChart"></canvas>
+            {points_note("latencyChart")}
+        </div>
+        <div class="col card">
+            <h2>p99 Latency per Endpoint (ms)</h2>
+            <canvas id="endpointP99Chart"></canvas>
+            {points_note("endpointP99Chart")}
+        </div>
+    </div>
+    """ if has_latency else ""
+
+    latency_script = """
+            // --- Request Latency Charts ---
+            new Chart(document.getElementById('latencyChart'), {
+                type: 'line',
+                data: {
+                    datasets: [
+                        { label: 'p50', data: xy(DATA.latP50), borderColor: '#2ecc71' },
+                        { label: 'p95', data: xy(DATA.latP95), borderColor: '#f39c12' },
+                        { label: 'p99', data: xy(DATA.latP99), borderColor: '#e74c3c' },
+                        { label: 'p99.9', data: xy(DATA.latP999), borderColor: '#8e44ad', borderDash: [5, 5] }
+                    ]
+                },
+                options: {
+                    ...commonOptions,
+                    scales: { x: timeAxis, y: { beginAtZero: true, title: { display: true, text: 'Latency (ms)' } } },
+                    plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                }
+            });
+
+            new Chart(document.getElementById('endpointP99Chart'), {
+                type: 'line',
+                data: { datasets: xyDatasets(DATA.endpointP99) },
+                options: {
+                    ...commonOptions,
+                    scales: { x: timeAxis, y: { beginAtZero: true, title: { display: true, text: 'p99 (ms)' } } },
+                    plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                }
+            });
+    """ if has_latency else ""
+
+    timeline_section = f"""
+    <!-- TIMELINE SECTION -->
+    <div class="row">
+        <div class="col card" style="min-width: 100%;">
+            <h2>🧵 Load vs Scaling (one timebase)</h2>
+            <canvas id="timelineChart"></canvas>
+            {points_note("timelineChart")}
+        </div>
+    </div>
+    """ if has_timeline else ""
+
+    timeline_script = """
+            // --- Load vs Scaling Timeline ---
+            new Chart(document.getElementById('timelineChart'), {
+                type: 'line',
+                data: {
+                    datasets: [
+                        { label: 'Requests/s', data: xy(DATA.tlRps), borderColor: '#36A2EB', yAxisID: 'y' },
+                        { label: 'p99 (ms)', data: xy(DATA.tlP99), borderColor: '#e74c3c', yAxisID: 'y1' },
+                        { label: 'Backend Ready Replicas', data: xy(DATA.tlBeReady), borderColor: '#2ecc71', stepped: true, yAxisID: 'y2' },
+                        { label: 'DB Waiting', data: xy(DATA.tlDbWaiting), borderColor: '#8e44ad', borderDash: [5, 5], yAxisID: 'y2' }
+                    ]
+                },
+                options: {
+                    ...commonOptions,
+                    scales: {
+                        x: timeAxis,
+                        y: { beginAtZero: true, position: 'left', title: { display: true, text: 'Requests/s' } },
+                        y1: { beginAtZero: true, position: 'right', title: { display: true, text: 'p99 (ms)' }, grid: { drawOnChartArea: false } },
+                        y2: { beginAtZero: true, position: 'right', title: { display: true, text: 'Replicas / Waiting' }, grid: { drawOnChartArea: false }, ticks: { stepSize: 1 } }
+                    },
+                    plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                }
+            });
+    """ if has_timeline else ""
+
+    pod_section = pod_script = ""
+    if has_pods:
+        summary = lifecycle["summary"]
+
+        def phase_cell(stats):
+            return f"{stats['median']}s / {stats['p90']}s / {stats['max']}s" if stats else "–"
+
+        def app_row(app):
+            s = summary[app]
+            reasons = ", ".join(f"{reason}: {n}" for reason, n in sorted(s["restart_reasons"].items())) or "–"
+            return f"""
+                <tr>
+                    <td><b>{app}</b></td>
+                    <td>{s['pods']} ({s['created_during_run']} new)</td>
+                    <td>{phase_cell(s['schedule_s'])}</td>
+                    <td>{phase_cell(s['start_s'])}</td>
+                    <td>{phase_cell(s['readiness_s'])}</td>
+                    <td><b>{phase_cell(s['startup_s'])}</b></td>
+                    <td style="color: {'#e74c3c' if s['restarts'] else '#2ecc71'};">{s['restarts']} ({reasons})</td>
+                    <td style="color: {'#e74c3c' if s['oom_kills'] else '#2ecc71'};">{s['oom_kills']}</td>
+                    <td style="color: {'#e74c3c' if s['evictions'] else '#2ecc71'};">{s['evictions']}</td>
+                    <td>{s['never_ready']}</td>
+                </tr>"""
+
+        troubled = [p for p in lifecycle["pods"] if p["restarts"] or p["failed"] or p["waiting"] or p["unready"]]
+        trouble_rows = "".join(f"""
+                <tr>
+                    <td>{p['pod']}</td><td>{p['app']}</td><td>{p['node'] or '–'}</td>
+                    <td>{sum(r['count'] for r in p['restarts'])}</td>
+                    <td>{', '.join(f"{r['reason'] or 'Unknown'} (exit {r['exit_code']})" for r in p['restarts']) or '–'}</td>
+                    <td>{', '.join(p['waiting']) or '–'}</td>
+                    <td>{len(p['unready'])}</td>
+                    <td>{p['failed'] or (p['final'] or {}).get('reason') or '–'}</td>
+                </tr>""" for p in troubled)
+        trouble_table = f"""
+            <h3>Pods with restarts, failures or readiness loss</h3>
+            <table class="pod-table">
+                <tr><th>Pod</th><th>App</th><th>Node</th><th>Restarts</th><th>Last terminations</th><th>Waiting</th><th>Became unready</th><th>Failed / final state</th></tr>
+                {trouble_rows}
+            </table>""" if troubled else '<p class="stat-box">✅ No restarts, OOMKills, evictions or readiness loss.</p>'
+
+        pod_section = f"""
+    <!-- POD LIFECYCLE SECTION -->
+    <div class="row">
+        <div class="col card" style="min-width: 100%;">
+            <h2>🔁 Pod Lifecycle</h2>
+            <table class="pod-table">
+                <tr><th>App</th><th>Pods</th><th>Scheduling</th><th>Container start</th><th>Readiness</th><th>Created → Ready</th><th>Restarts</th><th>OOMKilled</th><th>Evicted</th><th>Never ready</th></tr>
+                {app_row("backend")}{app_row("frontend")}
+            </table>
+            <div class="points-note">median / p90 / max over pods created during the run</div>
+            {trouble_table}
+        </div>
+    </div>
+    <div class="row">
+        <div class="col card" style="min-width: 60%;">
+            <h2>Pod Timeline</h2>
+            <div style="position: relative; height: {60 + 22 * len(pod_payload['podLabels'])}px;"><canvas id="podGanttChart" style="max-height: none;"></canvas></div>
+        </div>
+        <div class="col card" style="min-width: 30%;">
+            <h2>Startup Latency (created → ready)</h2>
+            <canvas id="podStartupChart"></canvas>
+        </div>
+    </div>
     """
 
+        pod_script = """
+            // --- Pod Lifecycle ---
+            const podPhase = (label, data, color) => ({ label, data, backgroundColor: color, grouped: false, barPercentage: 0.8, categoryPercentage: 1.0 });
+            new Chart(document.getElementById('podGanttChart'), {
+                type: 'bar',
+                data: {
+                    labels: DATA.podLabels,
+                    datasets: [
+                        podPhase('Pending (scheduling)', DATA.podPhases.pending, '#C9CBCF'),
+                        podPhase('Starting (pull / create)', DATA.podPhases.starting, '#FFCE56'),
+                        podPhase('Running, not ready', DATA.podPhases.notReady, '#FF9F40'),
+                        podPhase('Ready', DATA.podPhases.ready, '#2ecc71'),
+                        podPhase('Terminating', DATA.podPhases.terminating, '#9966FF'),
+                        { type: 'scatter', label: 'Restart', data: DATA.podRestarts, pointStyle: 'crossRot', pointRadius: 8,
+                          borderColor: '#e74c3c', backgroundColor: '#e74c3c', borderWidth: 3 }
+                    ]
+                },
+                options: {
+                    indexAxis: 'y',
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    scales: {
+                        x: { type: 'linear', min: 0, max: DATA.podRunEnd, ticks: { callback: clock, maxTicksLimit: 12 } },
+                        y: { ticks: { autoSkip: false, font: { size: 10 } } }
+                    },
+                    plugins: {
+                        legend: { position: 'bottom' },
+                        tooltip: { callbacks: { label: ctx => ctx.dataset.type === 'scatter'
+                            ? `Restart at ${clock(ctx.raw.x)}: ${ctx.raw.reason} (exit ${ctx.raw.exitCode})`
+                            : `${ctx.dataset.label}: ${clock(ctx.raw[0])} – ${clock(ctx.raw[1])} (${Math.round(ctx.raw[1] - ctx.raw[0])}s)` } }
+                    }
+                }
+            });
+
+            const startupWidth = DATA.startupBins.length > 1 ? DATA.startupBins[1] - DATA.startupBins[0] : 1;
+            new Chart(document.getElementById('podStartupChart'), {
+                type: 'bar',
+                data: {
+                    labels: DATA.startupBins.map(b => `${b}–${b + startupWidth}s`),
+                    datasets: [
+                        { label: 'Backend pods', data: DATA.startupCounts.backend, backgroundColor: '#36A2EB' },
+                        { label: 'Frontend pods', data: DATA.startupCounts.frontend, backgroundColor: '#4BC0C0' }
+                    ]
+                },
+                options: {
+                    responsive: true,
+                    scales: { y: { beginAtZero: true, ticks: { stepSize: 1 }, title: { display: true, text: 'Pods' } } },
+                    plugins: { legend: { position: 'bottom' } }
+                }
+            });
+        """
+
+    resource_section = resource_script = ""
+    if has_resources:
+        def resource_row(prefix, name):
+            p = resource_peaks[prefix]
+            throttle_color = '#e74c3c' if p['throttled'] >= THROTTLE_WARNING else '#2ecc71'
+            memory_color = '#e74c3c' if p['limit_pct'] >= MEMORY_WARNING else '#2ecc71'
+            if p['throttled'] >= THROTTLE_WARNING and p['limit_pct'] >= MEMORY_WARNING:
+                verdict = "🔥 CPU throttling + 🧠 memory pressure"
+            elif p['throttled'] >= THROTTLE_WARNING:
+                verdict = "🔥 CPU throttling"
+            elif p['limit_pct'] >= MEMORY_WARNING:
+                verdict = "🧠 Memory pressure"
+            else:
+                verdict = "✅ Within limits"
+            throttled = f"{p['throttled']}% ({p['throttled_share']}% of samples &gt; {THROTTLE_WARNING}%)" if p['has_throttling'] else "n/a"
+            return f"""
+                <tr>
+                    <td><b>{name}</b></td>
+                    <td>{p['memory']} MiB</td>
+                    <td>{p['request_pct']}%</td>
+                    <td style="color: {memory_color};">{p['limit_pct']}%</td>
+                    <td>{p['cpu_limit_pct']}%</td>
+                    <td style="color: {throttle_color};">{throttled}</td>
+                    <td>{verdict}</td>
+                </tr>"""
+
+        def deployment_charts(prefix, name):
+            return f"""
+    <div class="row">
+        <div class="col card">
+            <h2>{name} Pod Memory (MiB working set)</h2>
+            <canvas id="{prefix}MemoryChart"></canvas>
+            {points_note(f"{prefix}MemoryChart")}
+        </div>
+        <div class="col card">
+            <h2>{name} CPU Throttling (% of CFS periods)</h2>
+            <canvas id="{prefix}ThrottleChart"></canvas>
+            {points_note(f"{prefix}ThrottleChart")}
+        </div>
+    </div>"""
+
+        resource_section = f"""
+    <!-- MEMORY & THROTTLING SECTION -->
+    <div class="row">
+        <div class="col card" style="min-width: 100%;">
+            <h2>🧠 Memory &amp; CPU Throttling</h2>
+            <table class="pod-table">
+                <tr><th>Deployment</th><th>Peak memory</th><th>Peak % of request</th><th>Peak % of limit</th><th>Peak CPU % of limit</th><th>Peak throttled</th><th>Verdict</th></tr>
+                {resource_row("be", "Backend")}{resource_row("fe", "Frontend")}
+            </table>
+            <div class="points-note">peaks over all pods; throttled = CFS periods in which a pod hit its CPU limit</div>
+        </div>
+    </div>
+    {deployment_charts("be", "Backend")}
+    {deployment_charts("fe", "Frontend")}
+    <div class="row">
+        <div class="col card" style="min-width: 100%;">
+            <h2>Node Memory Utilization (%)</h2>
+            <canvas id="nodeMemoryChart"></canvas>
+            {points_note("nodeMemoryChart")}
+        </div>
+    </div>
+    """
+
+        resource_script = """
+            // --- Memory & CPU Throttling ---
+            const bound = (label, series, color) => ({ label, data: xy(series), borderColor: color, borderDash: [6, 4], pointRadius: 0, stepped: true, fill: false });
+            ['be', 'fe'].forEach(prefix => {
+                new Chart(document.getElementById(prefix + 'MemoryChart'), {
+                    type: 'line',
+                    data: { datasets: [
+                        ...xyDatasets(DATA[prefix + 'Memory']),
+                        bound('Request', DATA[prefix + 'MemoryRequest'], '#f39c12'),
+                        bound('Limit', DATA[prefix + 'MemoryLimit'], '#e74c3c')
+                    ] },
+                    options: {
+                        ...commonOptions,
+                        scales: { x: timeAxis, y: { beginAtZero: true, title: { display: true, text: 'MiB' } } },
+                        plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                    }
+                });
+                new Chart(document.getElementById(prefix + 'ThrottleChart'), {
+                    type: 'line',
+                    data: { datasets: xyDatasets(DATA[prefix + 'Throttled']) },
+                    options: {
+                        ...commonOptions,
+                        scales: { x: timeAxis, y: { beginAtZero: true, max: 100, title: { display: true, text: 'Throttled periods (%)' } } },
+                        plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                    }
+                });
+            });
+
+            new Chart(document.getElementById('nodeMemoryChart'), {
+                type: 'line',
+                data: { datasets: xyDatasets(DATA.nodeMemory) },
+                options: {
+                    ...commonOptions,
+                    scales: { x: timeAxis, y: { beginAtZero: true, max: 110, title: { display: true, text: 'Memory Utilization (%)' } } },
+                    plugins: { ...commonOptions.plugins, legend: { position: 'bottom' } }
+                }
+            });
+        """
+
     html_content = f"""
     <!DOCTYPE html>
     <html>
     <head>
         <title>K8s Full Stack Metrics Report</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+        {chartjs_tag}
         <style>
             body {{ font-family: 'Segoe UI', sans-serif; padding: 20px; background: #f4f4f4; }}
             .card {{ background: white; padding: 20px; margin-bottom: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
@@ -538,6 +1128,7 @@ def generate_k8s_report(results_dir):
             .col {{ flex: 1; min-width: 45%; }}
             canvas {{ max-height: 350px; }}
             .stat-box {{ text-align: center; margin-top: 15px; font-size: 1.1em; color: #666; }}
+            .points-note {{ text-align: right; font-size: 0.8em; color: #999; margin-top: 5px; }}
             .highlight {{ color: #e74c3c; font-weight: bold; font-size: 1.3em; }}
             .summary {{ background: #fff; padding: 20px; margin-bottom: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
             .summary h2 {{ margin-top: 0; }}
@@ -545,6 +1136,9 @@ def generate_k8s_report(results_dir):
             .summary-item {{ text-align: center; padding: 15px; background: #f8f9fa; border-radius: 8px; }}
             .summary-item .value {{ font-size: 2em; font-weight: bold; color: #333; }}
             .summary-item .label {{ font-size: 0.9em; color: #666; }}
+            .pod-table {{ width: 100%; border-collapse: collapse; font-size: 0.9em; }}
+            .pod-table th, .pod-table td {{ border: 1px solid #ddd; padding: 6px 8px; text-align: center; }}
+            .pod-table th {{ background: #f8f9fa; }}
         </style>
     </head>
     <body>
@@ -555,35 +1149,53 @@ def generate_k8s_report(results_dir):
             <h2>📊 Test Summary</h2>
             <div class="summary-grid">
                 <div class="summary-item">
-                    <div class="value">{len(metrics_data) * POLL_INTERVAL}s</div>
+                    <div class="value">{int(last_elapsed) + POLL_INTERVAL if sample_count else 0}s</div>
                     <div class="label">Test Duration</div>
                 </div>
                 <div class="summary-item">
-                    <div class="value">{max([d['backend']['ready_replicas'] for d in metrics_data]) if metrics_data else 0}</div>
+                    <div class="value">{k8s.max('be_ready')}</div>
                     <div class="label">Max Backend Pods</div>
                 </div>
                 <div class="summary-item">
-                    <div class="value">{max([d['nodes']['ready'] for d in metrics_data]) if metrics_data else 0}</div>
+                    <div class="value">{k8s.max('ready_nodes')}</div>
                     <div class="label">Max Nodes</div>
                 </div>
                 <div class="summary-item">
                     <div class="value" style="color: {'#e74c3c' if max_waiting > 0 else '#2ecc71'};">{max_waiting}</div>
                     <div class="label">Max DB Queue Wait</div>
                 </div>
+                <div class="summary-item">
+                    <div class="value">{peak_p99}</div>
+                    <div class="label">Peak p99 Latency</div>
+                </div>
+                <div class="summary-item">
+                    <div class="value">{rendered_points:,}</div>
+                    <div class="label">Chart Points Rendered (of {raw_points:,} raw)</div>
+                </div>
             </div>
         </div>
         
+        {timeline_section}
+
+        {pod_section}
+
+        {resource_section}
+
         {db_pool_section}
+
+        {latency_section}
         
         <!-- BACKEND SECTION -->
         <div class="row">
             <div class="col card">
                 <h2>Backend HPA (Replicas vs Avg CPU)</h2>
                 <canvas id="beHpaChart"></canvas>
+                {points_note("beHpaChart")}
             </div>
             <div class="col card">
                 <h2>Backend Pod CPU (millicores)</h2>
                 <canvas id="bePodsChart"></canvas>
+                {points_note("bePodsChart")}
             </div>
         </div>
 
@@ -592,10 +1204,12 @@ def generate_k8s_report(results_dir):
             <div class="col card">
                 <h2>Frontend HPA (Replicas vs Avg CPU)</h2>
                 <canvas id="feHpaChart"></canvas>
+                {points_note("feHpaChart")}
             </div>
             <div class="col card">
                 <h2>Frontend Pod CPU (millicores)</h2>
                 <canvas id="fePodsChart"></canvas>
+                {points_note("fePodsChart")}
             </div>
         </div>
 
@@ -604,34 +1218,49 @@ def generate_k8s_report(results_dir):
             <div class="col card">
                 <h2>Cluster Nodes (Autoscaling)</h2>
                 <canvas id="nodeChart"></canvas>
+                {points_note("nodeChart")}
             </div>
             <div class="col card">
                 <h2>Node CPU Utilization (%)</h2>
                 <canvas id="nodeCpuChart"></canvas>
+                {points_note("nodeCpuChart")}
             </div>
         </div>
 
         <script>
-            const rawData = {json.dumps(metrics_data)};
-            const labels = rawData.map(d => d.time);
-            
-            const beDesired = rawData.map(d => d.backend.desired_replicas);
-            const beReady = rawData.map(d => d.backend.ready_replicas);
-            const beHpaCpu = rawData.map(d => d.backend.hpa_cpu);
+          function renderReport(DATA) {{
+            // Series are embedded as downsampled {{x: elapsed seconds, y}} columns
+            const xy = s => s.x.map((x, i) => ({{ x: x, y: s.y[i] }}));
+            const xyDatasets = datasets => datasets.map(d => ({{ ...d, data: xy(d) }}));
+
+            const beDesired = xy(DATA.beDesired);
+            const beReady = xy(DATA.beReady);
+            const beHpaCpu = xy(DATA.beHpaCpu);
             
-            const feDesired = rawData.map(d => d.frontend.desired_replicas);
-            const feReady = rawData.map(d => d.frontend.ready_replicas);
-            const feHpaCpu = rawData.map(d => d.frontend.hpa_cpu);
+            const feDesired = xy(DATA.feDesired);
+            const feReady = xy(DATA.feReady);
+            const feHpaCpu = xy(DATA.feHpaCpu);
 
-            const totalNodes = rawData.map(d => d.nodes.total);
-            const readyNodes = rawData.map(d => d.nodes.ready);
+            const totalNodes = xy(DATA.totalNodes);
+            const readyNodes = xy(DATA.readyNodes);
+
+            // Wall clock labels (HH:MM:SS) from the elapsed seconds of each point
+            const clockStart = '{clock_start}'.split(':').reduce((acc, v) => acc * 60 + Number(v), 0);
+            const clock = v => {{
+                const t = Math.round(clockStart + v) % 86400;
+                return [Math.floor(t / 3600), Math.floor(t / 60) % 60, t % 60].map(n => String(n).padStart(2, '0')).join(':');
+            }};
+            const timeAxis = {{ type: 'linear', ticks: {{ callback: clock, maxTicksLimit: 12 }} }};
 
             const commonOptions = {{
                 responsive: true,
-                interaction: {{ mode: 'index', intersect: false }},
+                parsing: false,
+                interaction: {{ mode: 'nearest', axis: 'x', intersect: false }},
+                plugins: {{ tooltip: {{ callbacks: {{ title: items => items.length ? clock(items[0].parsed.x) : '' }} }} }}
             }};
 
             const hpaScales = {{
+                x: timeAxis,
                 y: {{
                     type: 'linear', display: true, position: 'left',
                     title: {{ display: true, text: 'Pod Count' }},
@@ -650,7 +1279,6 @@ def generate_k8s_report(results_dir):
             new Chart(document.getElementById('beHpaChart'), {{
                 type: 'line',
                 data: {{
-                    labels: labels,
                     datasets: [
                         {{ label: 'Desired Replicas', data: beDesired, borderColor: '#36A2EB', borderDash: [5, 5], yAxisID: 'y', stepped: true }},
                         {{ label: 'Ready Replicas', data: beReady, borderColor: '#36A2EB', backgroundColor: 'rgba(54, 162, 235, 0.2)', yAxisID: 'y', stepped: true, fill: true }},
@@ -662,15 +1290,14 @@ def generate_k8s_report(results_dir):
 
             new Chart(document.getElementById('bePodsChart'), {{
                 type: 'line',
-                data: {{ labels: labels, datasets: {json.dumps(be_pod_datasets)} }},
-                options: {{ ...commonOptions, plugins: {{ legend: {{ position: 'bottom' }} }} }}
+                data: {{ datasets: xyDatasets(DATA.bePods) }},
+                options: {{ ...commonOptions, scales: {{ x: timeAxis }}, plugins: {{ ...commonOptions.plugins, legend: {{ position: 'bottom' }} }} }}
             }});
 
             // --- Frontend Charts ---
             new Chart(document.getElementById('feHpaChart'), {{
                 type: 'line',
                 data: {{
-                    labels: labels,
                     datasets: [
                         {{ label: 'Desired Replicas', data: feDesired, borderColor: '#4BC0C0', borderDash: [5, 5], yAxisID: 'y', stepped: true }},
                         {{ label: 'Ready Replicas', data: feReady, borderColor: '#4BC0C0', backgroundColor: 'rgba(75, 192, 192, 0.2)', yAxisID: 'y', stepped: true, fill: true }},
@@ -682,15 +1309,14 @@ def generate_k8s_report(results_dir):
 
             new Chart(document.getElementById('fePodsChart'), {{
                 type: 'line',
-                data: {{ labels: labels, datasets: {json.dumps(fe_pod_datasets)} }},
-                options: {{ ...commonOptions, plugins: {{ legend: {{ position: 'bottom' }} }} }}
+                data: {{ datasets: xyDatasets(DATA.fePods) }},
+                options: {{ ...commonOptions, scales: {{ x: timeAxis }}, plugins: {{ ...commonOptions.plugins, legend: {{ position: 'bottom' }} }} }}
             }});
 
             // --- Node Chart ---
             new Chart(document.getElementById('nodeChart'), {{
                 type: 'line',
                 data: {{
-                    labels: labels,
                     datasets: [
                         {{ label: 'Total Nodes', data: totalNodes, borderColor: '#9966FF', borderDash: [5, 5], stepped: true }},
                         {{ label: 'Ready Nodes', data: readyNodes, borderColor: '#9966FF', backgroundColor: 'rgba(153, 102, 255, 0.2)', stepped: true, fill: true }}
@@ -699,6 +1325,7 @@ def generate_k8s_report(results_dir):
                 options: {{
                     ...commonOptions,
                     scales: {{
+                        x: timeAxis,
                         y: {{
                             beginAtZero: true,
                             title: {{ display: true, text: 'Node Count' }},
@@ -711,63 +1338,398 @@ def generate_k8s_report(results_dir):
             // --- Node CPU Chart ---
             new Chart(document.getElementById('nodeCpuChart'), {{
                 type: 'line',
-                data: {{ labels: labels, datasets: {json.dumps(node_cpu_datasets)} }},
+                data: {{ datasets: xyDatasets(DATA.nodeCpu) }},
                 options: {{
                     ...commonOptions,
                     scales: {{
+                        x: timeAxis,
                         y: {{
                             beginAtZero: true,
                             max: 110,
                             title: {{ display: true, text: 'CPU Utilization (%)' }}
                         }}
                     }},
-                    plugins: {{ legend: {{ position: 'bottom' }} }}
+                    plugins: {{ ...commonOptions.plugins, legend: {{ position: 'bottom' }} }}
                 }}
             }});
             
             {db_pool_script}
+            {latency_script}
+            {timeline_script}
+            {pod_script}
+            {resource_script}
+          }}
+          {data_script}
         </script>
     </body>
     </html>
     """
     
     report_path = os.path.join(results_dir, "k8s_metrics.html")
-    with open(report_path, "w") as f:
+    with open(report_path, "w", encoding="utf-8") as f:
         f.write(html_content)
     
-    print(f"📊 Kubernetes Metrics Report generated: {report_path}")
-    print(f"   📈 DB Pool events captured: {len(db_pool_data)}")
+    print(f"📊 Kubernetes Metrics Report generated: {report_path}" + (" (offline, self-contained)" if chartjs_source else ""))
+    print(f"   📈 DB Pool samples captured: {len(db)} ({db_event_count} HikariCP log events)")
+
+def write_run_config(store_dir, script_dir, args):
+    """
+    Writes config.txt into the store in the layout of the results_hpa/<id>.txt
+    files (USERS / SPAWN_RATE, then the cluster's terraform.tfvars) so that
+    compare_runs.py can index the run next to the earlier experiments.
+    """
+    lines = [
+        f"USERS = {USERS}",
+        f"SPAWN_RATE = {SPAWN_RATE}",
+        f"USER_CLASS = \"{USER_CLASS}\"",
+        f"DURATION = {TEST_DURATION}",
+        f"WORKERS = {WORKERS}",
+    ]
+    if args.load_profile:
+        lines.append(f"LOAD_PROFILE = \"{args.load_profile}\"")
+    if args.capacity_search:
+        lines.append(f"CAPACITY_SEARCH = \"{args.capacity_search}\"")
+    lines.append(f"PAYLOADS = \"{args.photo_sizes or payloads.PLACEHOLDER_CLASS}\"")
+    if args.tags:
+        lines.append(f"TAGS = \"{args.tags}\"")
+    tfvars = os.path.join(script_dir, "..", "terraform", "terraform.tfvars")
+    if os.path.exists(tfvars):
+        with open(tfvars, encoding="utf-8") as f:
+            lines += ["", f.read()]
+    with open(os.path.join(store_dir, "config.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+def analyze_run(store_dir, cpu_target):
+    """
+    Writes hpa_analysis.json (scale events, reaction / startup latencies, efficiency)
+    and pod_lifecycle.json (per-pod startup phases, restarts) into the store.
+    """
+    try:
+        analysis, out_path = hpa_analyzer.write_analysis(store_dir, cpu_target=cpu_target)
+    except Exception as e:
+        print(f"   ⚠️  HPA analysis failed: {e}")
+        return
+    hpa_analyzer.print_summary(analysis)
+    print(f"   📄 HPA analysis: {out_path}")
+    if sample_store.has_stream(store_dir, pod_lifecycle.STREAM):
+        try:
+            lifecycle, out_path = pod_lifecycle.write_analysis(store_dir)
+        except Exception as e:
+            print(f"   ⚠️  Pod lifecycle analysis failed: {e}")
+            return
+        pod_lifecycle.print_summary(lifecycle)
+        print(f"   📄 Pod lifecycle: {out_path}")
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def stop_process(proc, timeout=10, interrupted=False):
+    """
+    SIGINT first (lets Locust write its report), then terminate / kill.
+    `interrupted`: the process already got the terminal's Ctrl-C, so it is only
+    given `timeout` to finish; a second SIGINT would abort Locust's report writing.
+    """
+    if proc.poll() is not None:
+        return proc.returncode
+    steps = ((None, timeout), (signal.SIGTERM, 5)) if interrupted else ((signal.SIGINT, timeout), (signal.SIGTERM, 5))
+    for sig, wait in steps:
+        if sig is not None:
+            proc.send_signal(sig)
+        try:
+            return proc.wait(wait)
+        except subprocess.TimeoutExpired:
+            pass
+    proc.kill()
+    return proc.wait()
+
+def run_locust(cmd):
+    """
+    Runs a single Locust process and returns its exit code. Unlike subprocess.run,
+    a Ctrl-C leaves Locust time to write its report before it is stopped.
+    """
+    proc = subprocess.Popen(cmd)
+    try:
+        return proc.wait()
+    except KeyboardInterrupt:
+        stop_process(proc, LOCUST_SHUTDOWN_TIMEOUT, interrupted=True)
+        raise
+
+def run_distributed_locust(locust_executable, locust_args, master_args, workers):
+    """
+    Runs one Locust master (web UI, HTML report) plus `workers` local worker
+    processes, supervises them until the master exits and aggregates their exit status.
+    Raises subprocess.CalledProcessError if the master or any worker failed.
+    """
+    port = free_port()
+    master_cmd = locust_executable + locust_args + master_args + [
+        "--master", "--master-bind-port", str(port),
+        "--expect-workers", str(workers), "--expect-workers-max-wait", "60",
+    ]
+    worker_cmd = locust_executable + locust_args + [
+        "--worker", "--master-host", "127.0.0.1", "--master-port", str(port),
+    ]
+
+    master = subprocess.Popen(master_cmd)
+    worker_procs = [subprocess.Popen(worker_cmd) for _ in range(workers)]
+    reported = set()
+    try:
+        while master.poll() is None:
+            for idx, proc in enumerate(worker_procs):
+                # Workers quit with 0 when the master ends the test; only a failure is early
+                if proc.poll() not in (None, 0) and idx not in reported:
+                    reported.add(idx)
+                    print(f"\n   ⚠️  Locust worker {idx} exited early with code {proc.returncode}")
+            time.sleep(1)
+    except KeyboardInterrupt:
+        # The master got the same Ctrl-C from the terminal and is writing its report
+        stop_process(master, LOCUST_SHUTDOWN_TIMEOUT, interrupted=True)
+        raise
+    finally:
+        # Workers quit on their own once the master stops; make sure none is left behind
+        if master.poll() is None:
+            stop_process(master)
+        for proc in worker_procs:
+            try:
+                proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                stop_process(proc)
+
+    failed_workers = [idx for idx, proc in enumerate(worker_procs) if proc.returncode not in (0, None)]
+    print(f"\n   👷 Workers: {workers - len(failed_workers)}/{workers} exited cleanly | master exit code {master.returncode}")
+    if master.returncode != 0 or failed_workers:
+        raise subprocess.CalledProcessError(master.returncode or 1, master_cmd)
+
+def run_capacity_search(args, locust_executable, locust_args):
+    """
+    Runs constant-rate open-loop steps chosen by the search strategy, one Locust
+    run per step, and checks each step's measurement window against the SLO.
+    Per-step Locust reports go to <store>/locust_stepNN.html; every step is
+    recorded in <store>/capacity_search.json.
+    """
+    slo = capacity_search.Slo(args.slo_p99, args.slo_error_rate, args.slo_max_waiting, args.slo_min_throughput)
+    if args.capacity_search == "step":
+        search = capacity_search.StepSearch(args.search_start, args.search_step, args.search_max)
+    else:
+        search = capacity_search.BisectSearch(args.search_start, args.search_max, args.search_resolution)
+    settings = {
+        "user_class": USER_CLASS, "workers": WORKERS,
+        "start": args.search_start, "step": args.search_step, "max": args.search_max,
+        "resolution": args.search_resolution, "step_duration": args.step_duration,
+        "warmup": args.step_warmup, "cooldown": args.step_cooldown,
+    }
+    print(f"\n🔎 Capacity search ({args.capacity_search}): {args.step_duration}s steps, "
+          f"SLO p99 <= {slo.p99_ms:g} ms, errors <= {slo.max_error_pct:g}%, DB waiting <= {slo.max_waiting}")
+
+    steps = []
+    rate = search.next_rate()
+    while rate is not None:
+        number = len(steps) + 1
+        prefix = os.path.join(sample_store_dir, f"locust_step{number:02d}")
+        # Read by locustfile.py at import time, so each step's processes get their own rate
+        os.environ["LOCUST_LOAD_PROFILE"] = f"constant:rps={rate:g}"
+        os.environ["LOCUST_LOAD_PROFILE_DURATION"] = str(args.step_duration)
+        os.environ["LOCUST_SENDERS_PER_RPS"] = str(args.senders_per_rps)
+        step_args = locust_args + ["--arrival-shards", str(max(1, WORKERS))]
+        master_args = ["--headless", "--only-summary", "--html", prefix + ".html", "--csv", prefix, "--csv-full-history"]
+
+        print(f"\n   ▶️  Step {number}: {rate:g} req/s for {args.step_duration}s")
+        tailer = timeline.LocustStatsTailer(prefix + "_stats_history.csv", samples)
+        tailer.start()
+        started = time.time()
+        try:
+            if WORKERS:
+                run_distributed_locust(locust_executable, step_args, master_args, WORKERS)
+            else:
+                # The SLO decides whether the step passed, not Locust's exit code
+                run_locust(locust_executable + step_args + master_args)
+        except subprocess.CalledProcessError:
+            pass
+        finally:
+            tailer.stop()
+        samples.flush()
+
+        step = capacity_search.evaluate_step(sample_store_dir, started + args.step_warmup, time.time(), rate, slo)
+        step = {"step": number, "report": prefix + ".html", **step}
+        steps.append(step)
+        search.record(rate, step["passed"])
+        path = capacity_search.write_results(sample_store_dir, args.capacity_search, search, slo, steps, settings)
+        print("   " + capacity_search.format_step(step))
+
+        rate = search.next_rate()
+        if rate is not None and args.step_cooldown:
+            print(f"   💤 Cooling down {args.step_cooldown}s")
+            time.sleep(args.step_cooldown)
+
+    best = f"{search.best:g} req/s" if search.best is not None else "none (the first step already failed)"
+    print(f"\n🏁 Max sustainable rate: {best} after {len(steps)} steps")
+    print(f"   📄 {path}")
 
 def run_hpa_test():
     parser = argparse.ArgumentParser(description='Run Locust HPA Test')
+    parser.add_argument('--host', type=str, default=None,
+                        help='Target base URL instead of HOST (e.g. http://127.0.0.1:18080 for stub_server.py)')
     parser.add_argument('--users', type=int, default=10, help='Number of users')
     parser.add_argument('--spawn-rate', type=int, default=1, help='Spawn rate')
     parser.add_argument('--duration', type=int, default=120, help='Test duration in seconds')
     parser.add_argument('--user-class', type=str, default="AuthenticatedUser", help='Locust User Class')
+    parser.add_argument('--fast-client', action='store_true',
+                        help='Use the FastHttpUser twin of the user class (e.g. FastAuthenticatedUser)')
+    parser.add_argument('--seed-users', type=int, default=0,
+                        help='Create N accounts in parallel before the test and add them to the user pool file')
+    parser.add_argument('--user-pool', type=str, default=None,
+                        help='Pre-seeded account file for the users to check out (default with --seed-users: results_hpa/user_pool.json)')
+    parser.add_argument('--trace', type=str, default=None,
+                        help='Replay a recorded JSONL request trace open-loop with ReplayUser (see request_trace.py)')
+    parser.add_argument('--trace-speed', type=float, default=1.0,
+                        help='Replay speed factor for --trace (2 = twice the recorded request rate)')
+    parser.add_argument('--trace-loop', action='store_true',
+                        help='Start the trace over when it ends')
+    parser.add_argument('--load-profile', type=str, default=None,
+                        help='Open-loop arrival-rate profile instead of a fixed user count, e.g. "constant:rps=50", '
+                             '"step:start=10,step=10,every=60,steps=6", "spike:base=10,peak=100,at=120,length=30", '
+                             '"diurnal:low=5,high=80,period=600" (see load_shapes.py)')
+    parser.add_argument('--senders-per-rps', type=float, default=2.0,
+                        help='Users kept per request/s of target rate with --load-profile')
+    parser.add_argument('--workers', type=str, default="0",
+                        help='Local Locust worker processes: 0 = single process, N, or "auto" for one per CPU core')
+    parser.add_argument('--k8s-api', type=str, default=None,
+                        help='Read the cluster through the in-process API collector instead of kubectl forks. '
+                             '"proxy" starts one `kubectl proxy`; a URL uses that API server (e.g. a fixture server)')
+    parser.add_argument('--max-points', type=int, default=1000,
+                        help='Point budget per chart in the K8s report; longer series are downsampled (LTTB, exact CPU / DB waiting peaks)')
+    parser.add_argument('--offline-report', action='store_true',
+                        help='Write a self-contained K8s report (Chart.js inlined, data gzip+base64) that opens without internet')
+    parser.add_argument('--chartjs', type=str, default=None,
+                        help='Local Chart.js UMD build to inline in offline reports (default: cached download)')
+    parser.add_argument('--cpu-target', type=float, default=hpa_analyzer.DEFAULT_CPU_TARGET,
+                        help='HPA CPU target (%%) used by the scale event analysis (hpa_analysis.json)')
+    parser.add_argument('--capacity-search', choices=sorted(capacity_search.STRATEGIES), default=None,
+                        help='Search the highest sustainable open-loop rate instead of a single run')
+    parser.add_argument('--search-start', type=float, default=10, help='Capacity search: first (bisect: lowest) rate in req/s')
+    parser.add_argument('--search-step', type=float, default=10, help='Capacity search: rate increase per step (step strategy)')
+    parser.add_argument('--search-max', type=float, default=200, help='Capacity search: highest rate tried in req/s')
+    parser.add_argument('--search-resolution', type=float, default=5,
+                        help='Capacity search: bisection stops once pass/fail rates are this close (req/s)')
+    parser.add_argument('--step-duration', type=int, default=180, help='Capacity search: seconds per step')
+    parser.add_argument('--step-warmup', type=int, default=60,
+                        help='Capacity search: seconds at the start of a step excluded from the SLO check')
+    parser.add_argument('--step-cooldown', type=int, default=30, help='Capacity search: pause between steps (s)')
+    parser.add_argument('--slo-p99', type=float, default=1000, help='Capacity search SLO: p99 latency limit (ms)')
+    parser.add_argument('--slo-error-rate', type=float, default=1.0, help='Capacity search SLO: max failed requests (%%)')
+    parser.add_argument('--slo-max-waiting', type=int, default=0,
+                        help='Capacity search SLO: max HikariCP threads waiting for a connection')
+    parser.add_argument('--slo-min-throughput', type=float, default=0.95,
+                        help='Capacity search SLO: min achieved / offered rate')
+    parser.add_argument('--dashboard-port', type=int, default=dashboard.DEFAULT_PORT,
+                        help='Port of the live dashboard streamed during the test (0 = off)')
+    parser.add_argument('--metrics-port', type=int, default=metrics_exporter.DEFAULT_PORT,
+                        help='Port of the OpenMetrics /metrics endpoint for Prometheus-compatible scrapers (0 = off)')
+    parser.add_argument('--metrics-host', type=str, default="127.0.0.1",
+                        help='Bind address of /metrics (0.0.0.0 for scrapers on other machines)')
+    parser.add_argument('--run-dir', type=str, default=None,
+                        help='Write the sample store and every report of this run into this directory '
+                             '(default: a samples_<timestamp> store and reports in results_hpa/)')
+    parser.add_argument('--photo-sizes', type=str, default=payloads.DEFAULT_PHOTO_SIZES,
+                        help='Opt into generated recipe / interest-form payloads with these photo size classes, e.g. '
+                             f'"{payloads.SIZED_PHOTO_SIZES}" (default: the 1x1 GIF placeholder payloads of the stored results)')
+    parser.add_argument('--tags', type=str, default=None,
+                        help='Comma-separated labels recorded in the run config (e.g. "baseline,1node")')
+    parser.add_argument('--report-from', type=str, default=None,
+                        help='Only (re)generate the K8s report from an existing sample store, e.g. of an interrupted run')
     args = parser.parse_args()
+    if args.capacity_search and args.load_profile:
+        parser.error("--capacity-search sets its own constant-rate profile per step; drop --load-profile")
+    if args.search_resolution < capacity_search.MIN_RESOLUTION:
+        parser.error(f"--search-resolution must be at least {capacity_search.MIN_RESOLUTION:g} req/s")
+    if args.photo_sizes:
+        try:
+            for label, _ in payloads.parse_weights(args.photo_sizes):
+                payloads.parse_size(label)
+        except ValueError as e:
+            parser.error(f"--photo-sizes: {e}")
+    if args.max_points < 3 * report_data.MIN_SERIES_POINTS:
+        parser.error(f"--max-points must be at least {3 * report_data.MIN_SERIES_POINTS} (3 series per chart)")
 
-    global monitoring_active, metrics_data, db_pool_data
+    global monitoring_active, samples, sample_store_dir, k8s_api_collector, db_log_follower, pod_tracker
     
     # Update global vars
-    global USERS, SPAWN_RATE, TEST_DURATION, USER_CLASS
+    global HOST, USERS, SPAWN_RATE, TEST_DURATION, USER_CLASS, WORKERS, MAX_CHART_POINTS, OFFLINE_REPORT, CHARTJS_PATH
+    HOST = args.host or HOST
     USERS = args.users
     SPAWN_RATE = args.spawn_rate
     TEST_DURATION = args.duration
     USER_CLASS = args.user_class
+    if args.trace and USER_CLASS == parser.get_default('user_class'):
+        USER_CLASS = "ReplayUser"
+    if args.fast_client and not USER_CLASS.startswith("Fast"):
+        USER_CLASS = "Fast" + USER_CLASS
+    WORKERS = (os.cpu_count() or 1) if args.workers == "auto" else int(args.workers)
+    MAX_CHART_POINTS = args.max_points
+    OFFLINE_REPORT = args.offline_report
+    CHARTJS_PATH = args.chartjs
+    if OFFLINE_REPORT:
+        # Checked (and cached) up front rather than when the report is written after the test
+        try:
+            load_chartjs_runtime()
+        except RuntimeError as e:
+            parser.error(str(e))
 
-    # Reset global data for fresh test
-    metrics_data = []
-    db_pool_data = []
-    monitoring_active = True
-    
     script_dir = os.path.dirname(os.path.abspath(__file__))
     locustfile_path = os.path.join(script_dir, "locustfile.py")
     results_dir = os.path.join(script_dir, OUTPUT_DIR)
+
+    if args.report_from:
+        store = os.path.abspath(args.report_from)
+        # A samples_<timestamp> store has its reports in results_hpa/, a --run-dir store in itself
+        report_dir = os.path.dirname(store) if os.path.basename(store).startswith(SAMPLES_PREFIX) else store
+        generate_k8s_report(report_dir, args.report_from)
+        analyze_run(args.report_from, args.cpu_target)
+        return
+
+    # Fresh sample store for this run (a named run directory keeps its reports next to the store)
+    if args.run_dir:
+        results_dir = sample_store_dir = os.path.abspath(args.run_dir)
+    else:
+        sample_store_dir = os.path.join(results_dir, datetime.datetime.now().strftime(SAMPLES_PREFIX + "%Y%m%d_%H%M%S"))
+    samples = sample_store.SampleStore(sample_store_dir)
+    write_run_config(sample_store_dir, script_dir, args)
+    live_dashboard = None
+    if args.dashboard_port:
+        live_dashboard = dashboard.LiveDashboard(args.dashboard_port, title=f"{USER_CLASS} on {HOST}")
+        try:
+            url = live_dashboard.start()
+            samples.add_listener(live_dashboard.publish)
+            print(f"📡 Live dashboard: {url}")
+        except OSError as e:
+            print(f"   ⚠️  Live dashboard unavailable on port {args.dashboard_port}: {e}")
+            live_dashboard = None
+    exporter = None
+    if args.metrics_port:
+        exporter = metrics_exporter.MetricsExporter(args.metrics_port, args.metrics_host,
+                                                    run=os.path.basename(sample_store_dir))
+        # The Locust process writes the latency histograms; the rest arrives through the listener
+        exporter.follow(sample_store_dir, ["latency"])
+        try:
+            print(f"📈 Metrics: {exporter.start()}")
+            samples.add_listener(exporter.observe)
+        except OSError as e:
+            print(f"   ⚠️  Metrics endpoint unavailable on port {args.metrics_port}: {e}")
+            exporter = None
+    monitoring_active = True
     
     print(f"\n🚀 Starting HPA Test: {USER_CLASS}")
     print("🎯 Target: Trigger CPU > 50% to scale from 1 -> N replicas")
-    print(f"⏱️  Duration: {TEST_DURATION} seconds")
-    print(f"👥 Users: {USERS} | Spawn Rate: {SPAWN_RATE}/s")
+    if not args.capacity_search:
+        print(f"⏱️  Duration: {TEST_DURATION} seconds")
+    print(f"💾 Samples: {sample_store_dir}")
+    if not args.capacity_search:
+        print(f"👥 Users: {USERS} | Spawn Rate: {SPAWN_RATE}/s")
+    if args.load_profile:
+        print(f"📈 Open-loop profile: {args.load_profile} (--users / --spawn-rate ignored)")
+    if WORKERS:
+        print(f"👷 Distributed: 1 master + {WORKERS} workers")
     
     os.makedirs(results_dir, exist_ok=True)
     html_report = os.path.join(results_dir, "locust_report.html")
@@ -782,41 +1744,147 @@ def run_hpa_test():
     except Exception:
         locust_executable = [sys.executable, "-m", "locust"]
 
+    # Seeding phase: create accounts ahead of the ramp instead of in every on_start
+    pool_path = args.user_pool
+    if args.seed_users:
+        pool_path = pool_path or os.path.join(results_dir, "user_pool.json")
+        user_pool.seed_accounts(HOST, args.seed_users, pool_path)
+    if pool_path:
+        print(f"   🎟️  Users check accounts out of {pool_path}")
+    if args.trace:
+        print(f"   🎞️  Replaying {args.trace} at {args.trace_speed}x")
+
+    pod_tracker = pod_lifecycle.PodLifecycleTracker()
+
+    # Optional in-process API collector (one pooled session + list/watch caches)
+    kubectl_proxy = None
+    if args.k8s_api:
+        api_url = args.k8s_api
+        if api_url == "proxy":
+            kubectl_proxy, api_url = k8s_api.start_kubectl_proxy()
+        print(f"   🔌 Using Kubernetes API collector at {api_url}")
+        k8s_api_collector = k8s_api.K8sApiCollector(api_url)
+        k8s_api_collector.add_listener("pods", pod_tracker.observe)
+        k8s_api_collector.start()
+
+    # Follow backend logs for HikariCP pool events (one `kubectl logs -f` per pod)
+    if k8s_api_collector:
+        collector = k8s_api_collector
+        db_log_follower = log_follower.HikariLogFollower(
+            "backend", pod_lister=lambda: collector.pod_names("backend"), discovery_interval=1
+        )
+    else:
+        db_log_follower = log_follower.HikariLogFollower("backend")
+    db_log_follower.start()
+
+    # Follow Locust's stats history into the store while the run is in progress
+    # (a capacity search follows each step's history itself)
+    stats_tailer = None
+    if not args.capacity_search:
+        stats_tailer = timeline.LocustStatsTailer(os.path.join(sample_store_dir, "locust_stats_history.csv"), samples)
+        stats_tailer.start()
+
     # Start K8s Metrics Monitoring (also polls DB pool metrics)
     monitor_thread = threading.Thread(target=monitor_k8s_metrics, args=(results_dir,))
     monitor_thread.daemon = True 
     monitor_thread.start()
 
-    cmd = locust_executable + [
+    locust_args = [
         "-f", locustfile_path,   
         USER_CLASS,
         "--host", HOST,
-        "--autostart",           
-        "--autoquit", str(TEST_DURATION),     
-        "--users", str(USERS),         
-        "--spawn-rate", str(SPAWN_RATE),
-        "--html", html_report
+        # Per-endpoint latency histograms go to the same store as the K8s samples
+        "--sample-store", sample_store_dir,
+        "--latency-interval", str(POLL_INTERVAL),
+        # Failed requests are results, recorded in the reports; a non-zero exit means Locust itself failed
+        "--exit-code-on-error", "0",
+    ]
+    if args.photo_sizes:
+        locust_args += ["--photo-sizes", args.photo_sizes]
+    if pool_path:
+        locust_args += ["--user-pool", os.path.abspath(pool_path), "--user-pool-shards", str(max(1, WORKERS))]
+    if args.trace:
+        locust_args += ["--trace", os.path.abspath(args.trace), "--trace-speed", str(args.trace_speed),
+                        "--trace-shards", str(max(1, WORKERS))]
+        if args.trace_loop:
+            locust_args.append("--trace-loop")
+    if args.load_profile:
+        # Read by locustfile.py at import time, which is when the shape class is defined
+        os.environ["LOCUST_LOAD_PROFILE"] = args.load_profile
+        os.environ["LOCUST_LOAD_PROFILE_DURATION"] = str(TEST_DURATION)
+        os.environ["LOCUST_SENDERS_PER_RPS"] = str(args.senders_per_rps)
+        locust_args += ["--arrival-shards", str(max(1, WORKERS))]
+    # Run control and reporting belong to the master (or the single process)
+    master_args = [
+        "--autostart",
+        "--autoquit", str(LOCUST_AUTOQUIT),
+        "--html", html_report,
+        # Per-second stats history, followed live into the sample store for the timeline
+        "--csv", os.path.join(sample_store_dir, "locust"),
+        "--csv-full-history",
     ]
+    if not args.load_profile:
+        # With a profile the shape sizes the user count from the arrival rate and ends the run
+        master_args += ["--users", str(USERS), "--spawn-rate", str(SPAWN_RATE), "--run-time", f"{TEST_DURATION}s"]
 
+    exit_code = 0
     try:
+        if args.capacity_search:
+            run_capacity_search(args, locust_executable, locust_args)
+            return
         print("   ...Starting Locust Web UI...")
         print("   📊 Live Charts available at: http://localhost:8089")
         print("   🗄️  DB pool metrics polled every", POLL_INTERVAL, "seconds...")
 
-        subprocess.run(cmd, check=True)
+        if WORKERS:
+            run_distributed_locust(locust_executable, locust_args, master_args, WORKERS)
+        else:
+            cmd = locust_executable + locust_args + master_args
+            returncode = run_locust(cmd)
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, cmd)
         print("\n✅ Test Complete.")
         print(f"📊 Locust Report generated: {html_report}")
         
     except subprocess.CalledProcessError:
         print("\n⚠️ Test interrupted or failed.")
+        exit_code = 1
     except KeyboardInterrupt:
         print("\n🛑 Test stopped by user.")
+        exit_code = 130
     finally:
         monitoring_active = False
         print("\n   ⏳ Finalizing reports...")
+        # The follower, collector and store are torn down below; the monitor must be out of its tick first
+        # (a tick can take a while: cAdvisor allows 20s and kubectl probes have no timeout)
         monitor_thread.join(timeout=5)
-        generate_k8s_report(results_dir)
+        while monitor_thread.is_alive():
+            print("   ⏳ Waiting for the current K8s sample to finish...")
+            monitor_thread.join(timeout=10)
+        db_log_follower.stop()
+        if db_log_follower.dropped:
+            print(f"   ⚠️  {db_log_follower.dropped} HikariCP events dropped (ring buffer full)")
+        db_log_follower = None
+        if stats_tailer:
+            stats_tailer.stop()
+        for event in pod_tracker.drain():
+            samples.append(pod_lifecycle.STREAM, event)
+        if k8s_api_collector:
+            k8s_api_collector.stop()
+            k8s_api_collector = None
+        if kubectl_proxy:
+            kubectl_proxy.terminate()
+        samples.close()
+        if live_dashboard:
+            live_dashboard.stop()
+        if exporter:
+            exporter.stop()
+        generate_k8s_report(results_dir, sample_store_dir)
+        analyze_run(sample_store_dir, args.cpu_target)
         print(f"\n📁 All reports saved to: {results_dir}")
+    # Non-zero unless Locust ran to its end, so run_matrix.py can tell complete runs apart
+    if exit_code:
+        raise SystemExit(exit_code)
 
 if __name__ == "__main__":
     run_hpa_test()
@@ -0,0 +1,382 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON matrices only
+    tomllib = None
+
+import compare_runs
+import run_hpa
+import sample_store
+
+# Declarative experiment matrix: runs run_hpa.py once per entry, in order.
+#
+# Before every run the cluster has to be back at its baseline (backend and
+# frontend desired == ready == baseline replicas, node count == baseline nodes,
+# all Ready) and stay there for `stable_for` seconds, so a run never starts on
+# the replicas the previous one scaled up. Each run writes its sample store,
+# reports and config.txt into results_hpa/<matrix name>/<run id>/ (picked up by
+# compare_runs.py as group <matrix name>), plus matrix_run.json with the run's
+# settings and how long the gate waited.
+#
+# Progress is kept in results_hpa/<matrix name>/matrix_state.json: running the
+# same file again skips the runs that finished; an interrupted run is moved to
+# _interrupted/ and started over.
+#
+# Matrix file (TOML, or the same structure as JSON):
+#
+#   name = "3_backend_limits"
+#
+#   [defaults]                  # per-run keys, overridable by each run
+#   user_class = "AuthenticatedUser"
+#   users = 500
+#   spawn_rate = 25
+#   duration = 600
+#   workers = "auto"
+#   tags = ["gke"]
+#   args = ["--k8s-api", "proxy"]   # any other run_hpa.py flags
+#
+#   [gating]                    # all optional
+#   cooldown = 60               # s after the previous run before checking
+#   stable_for = 60             # s the baseline must hold
+#   timeout = 1800              # s to wait for the baseline at most
+#   poll = 10
+#   backend_replicas = 1        # default: HPA minReplicas (else terraform.tfvars)
+#   frontend_replicas = 1
+#   nodes = 1                   # default: gke_min_node_count / gke_node_count from terraform.tfvars
+#   on_timeout = "abort"        # or "run": start anyway, marked in matrix_run.json
+#
+#   [[runs]]
+#   id = "3_1"
+#   users = 200
+#   tags = ["baseline"]
+#
+#   [[runs]]
+#   id = "3_2"
+#   args = ["--load-profile", "step:start=10,step=10,every=60,steps=6"]
+#
+#   python run_matrix.py experiments.toml [--dry-run] [--only 3_1 3_2] [--rerun 3_1]
+#
+# Terraform variables are not applied by the runner; the cluster settings of
+# each run are recorded from terraform.tfvars as before (see write_run_config).
+
+STATE_FILE = "matrix_state.json"
+RUN_FILE = "matrix_run.json"
+INTERRUPTED_DIR = "_interrupted"
+# s run_hpa.py gets after Ctrl-C: Locust's report, the last K8s sample and the K8s report
+RUN_SHUTDOWN_TIMEOUT = run_hpa.LOCUST_SHUTDOWN_TIMEOUT + 120
+RUN_FLAGS = {
+    "user_class": "--user-class",
+    "users": "--users",
+    "spawn_rate": "--spawn-rate",
+    "duration": "--duration",
+    "workers": "--workers",
+    "host": "--host",
+}
+RUN_KEYS = set(RUN_FLAGS) | {"id", "tags", "args"}
+GATING_DEFAULTS = {
+    "cooldown": 60,
+    "stable_for": 60,
+    "timeout": 1800,
+    "poll": 10,
+    "backend_replicas": None,
+    "frontend_replicas": None,
+    "nodes": None,
+    "on_timeout": "abort",
+}
+DEPLOYMENTS = {"backend": "heath-backend", "frontend": "heath-frontend"}
+ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+
+def load_matrix(path):
+    """
+    Reads and validates a matrix file. Returns {"name", "gating", "runs"} with
+    every run's settings merged over the defaults.
+    """
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML matrices need Python 3.11+ (tomllib); use the JSON form")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+    name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+    if not ID_PATTERN.match(name):
+        raise ValueError(f"Matrix name '{name}' must be a plain directory name")
+    defaults = data.get("defaults", {})
+    gating = {**GATING_DEFAULTS, **data.get("gating", {})}
+    unknown = set(gating) - set(GATING_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown gating keys: {', '.join(sorted(unknown))}")
+    if gating["on_timeout"] not in ("abort", "run"):
+        raise ValueError(f"gating.on_timeout must be 'abort' or 'run', got '{gating['on_timeout']}'")
+
+    runs, seen = [], set()
+    for i, entry in enumerate(data.get("runs", [])):
+        run = {"tags": [], "args": [], **defaults, **entry}
+        unknown = set(run) - RUN_KEYS
+        if unknown:
+            raise ValueError(f"Run #{i + 1}: unknown keys {', '.join(sorted(unknown))} (use args = [...] for other flags)")
+        run_id = str(run.get("id", ""))
+        if not ID_PATTERN.match(run_id):
+            raise ValueError(f"Run #{i + 1}: id '{run_id}' must be a plain directory name")
+        if run_id in seen:
+            raise ValueError(f"Duplicate run id '{run_id}'")
+        seen.add(run_id)
+        if isinstance(run["tags"], str):
+            run["tags"] = [t.strip() for t in run["tags"].split(",") if t.strip()]
+        run["args"] = [str(a) for a in run["args"]]
+        runs.append(run)
+    if not runs:
+        raise ValueError("The matrix has no [[runs]]")
+    return {"name": name, "gating": gating, "runs": runs}
+
+
+def run_command(run, run_dir):
+    cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_hpa.py"), "--run-dir", run_dir]
+    for key, flag in RUN_FLAGS.items():
+        if run.get(key) is not None:
+            cmd += [flag, str(run[key])]
+    if run["tags"]:
+        cmd += ["--tags", ",".join(run["tags"])]
+    return cmd + run["args"]
+
+
+def spec_key(run):
+    return json.dumps(run, sort_keys=True)
+
+
+# --- State (resume) ---
+
+def load_state(matrix_dir, name):
+    path = os.path.join(matrix_dir, STATE_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"matrix": name, "runs": {}}
+
+
+def save_state(matrix_dir, state):
+    # Written to a temp file and renamed, so an interruption never leaves half a state file
+    path = os.path.join(matrix_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def set_aside(matrix_dir, run_id):
+    """
+    Moves the directory of an interrupted (or re-run) run to _interrupted/.
+    """
+    run_dir = os.path.join(matrix_dir, run_id)
+    if not os.path.exists(run_dir):
+        return None
+    target = os.path.join(matrix_dir, INTERRUPTED_DIR, f"{run_id}_{datetime.datetime.now():%Y%m%d_%H%M%S}")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(run_dir, target)
+    return target
+
+
+# --- Baseline gating ---
+
+def hpa_min_replicas(hpa_name):
+    try:
+        cmd = ["kubectl", "get", "hpa", hpa_name, "-o", "json"]
+        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=30).decode("utf-8")
+        return json.loads(out).get("spec", {}).get("minReplicas")
+    except Exception:
+        return None
+
+
+def resolve_baseline(gating, script_dir):
+    """
+    Baseline replicas per deployment and node count: the matrix's gating values,
+    else the live HPA minReplicas and the terraform.tfvars of the cluster.
+    A None node count disables the node check.
+    """
+    tfvars_path = os.path.join(script_dir, "..", "terraform", "terraform.tfvars")
+    tfvars = compare_runs.parse_config(tfvars_path if os.path.exists(tfvars_path) else None)
+    baseline = {}
+    for deployment, name in DEPLOYMENTS.items():
+        replicas = gating[f"{deployment}_replicas"]
+        if replicas is None:
+            replicas = hpa_min_replicas(f"{name}-hpa")
+        if replicas is None:
+            replicas = tfvars.get(f"{deployment}_hpa_min_replicas")
+        baseline[deployment] = replicas if replicas is not None else 1
+    nodes = gating["nodes"]
+    if nodes is None:
+        autoscaling = str(tfvars.get("gke_autoscaling_enabled", "")).lower() == "true"
+        nodes = tfvars.get("gke_min_node_count" if autoscaling else "gke_node_count")
+    baseline["nodes"] = nodes if isinstance(nodes, int) else None
+    return baseline
+
+
+def cluster_state():
+    state = {deployment: run_hpa.get_deployment_metrics(name) for deployment, name in DEPLOYMENTS.items()}
+    state["nodes"] = run_hpa.get_node_metrics()
+    return state
+
+
+def baseline_gaps(state, baseline):
+    """
+    What still differs from the baseline (empty when the cluster is at it).
+    """
+    gaps = []
+    for deployment in DEPLOYMENTS:
+        desired, ready = state[deployment]
+        if not desired == ready == baseline[deployment]:
+            gaps.append(f"{deployment} {ready}/{desired} ready (baseline {baseline[deployment]})")
+    total, ready = state["nodes"]
+    if baseline["nodes"] is not None and not total == ready == baseline["nodes"]:
+        gaps.append(f"nodes {ready}/{total} ready (baseline {baseline['nodes']})")
+    return gaps
+
+
+def wait_for_baseline(baseline, gating, since_last_run):
+    """
+    Waits out the cooldown, then until the cluster has been at the baseline for
+    `stable_for` seconds. Returns {"result": "ok" | "timeout", "waited_s", "gaps"}.
+    """
+    started = time.monotonic()
+    cooldown = max(0, gating["cooldown"] - since_last_run) if since_last_run is not None else 0
+    if cooldown:
+        print(f"   😴 Cooldown {cooldown:.0f}s")
+        time.sleep(cooldown)
+
+    stable_since = None
+    last_report = ""
+    while True:
+        gaps = baseline_gaps(cluster_state(), baseline)
+        now = time.monotonic()
+        if gaps:
+            stable_since = None
+            report = "; ".join(gaps)
+            if report != last_report:
+                print(f"   ⏳ Waiting for baseline: {report}")
+                last_report = report
+        else:
+            stable_since = stable_since or now
+            if now - stable_since >= gating["stable_for"]:
+                return {"result": "ok", "waited_s": round(now - started, 1), "gaps": []}
+        if now - started >= gating["timeout"]:
+            return {"result": "timeout", "waited_s": round(now - started, 1), "gaps": gaps}
+        time.sleep(gating["poll"])
+
+
+# --- Runner ---
+
+def run_matrix(matrix, out_root, only=None, rerun=(), dry_run=False, matrix_path=None):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    matrix_dir = os.path.join(out_root, matrix["name"])
+    state = load_state(matrix_dir, matrix["name"])
+    runs = [r for r in matrix["runs"] if not only or r["id"] in only]
+
+    print(f"\n🧪 Matrix {matrix['name']}: {len(runs)} runs -> {matrix_dir}")
+    plan = []
+    for run in runs:
+        entry = state["runs"].get(run["id"], {})
+        status = entry.get("status", "pending")
+        if status == "done" and run["id"] not in rerun:
+            changed = entry.get("spec") != spec_key(run)
+            print(f"   ✅ {run['id']}: done" + (" (settings changed since; --rerun to repeat)" if changed else ""))
+            continue
+        print(f"   ▶️  {run['id']}: {status} -> {' '.join(run_command(run, os.path.join(matrix_dir, run['id']))[2:])}")
+        plan.append(run)
+    if dry_run or not plan:
+        return 0
+
+    os.makedirs(matrix_dir, exist_ok=True)
+    if matrix_path:
+        shutil.copy(matrix_path, os.path.join(matrix_dir, "matrix" + os.path.splitext(matrix_path)[1]))
+    baseline = resolve_baseline(matrix["gating"], script_dir)
+    print(f"   🎯 Baseline: backend {baseline['backend']}, frontend {baseline['frontend']}, "
+          f"nodes {baseline['nodes'] if baseline['nodes'] is not None else 'unchecked'}")
+
+    failures = 0
+    for i, run in enumerate(plan, 1):
+        run_id = run["id"]
+        run_dir = os.path.join(matrix_dir, run_id)
+        previous = state["runs"].get(run_id, {})
+        if os.path.exists(run_dir):
+            moved = set_aside(matrix_dir, run_id)
+            print(f"   📦 Previous {previous.get('status', 'partial')} output of {run_id} moved to {moved}")
+
+        print(f"\n🔬 [{i}/{len(plan)}] {run_id}")
+        finished = [r.get("finished") for r in state["runs"].values() if r.get("finished")]
+        gate = wait_for_baseline(baseline, matrix["gating"], time.time() - max(finished) if finished else None)
+        if gate["result"] == "timeout":
+            print(f"   ⚠️  Baseline not reached within {matrix['gating']['timeout']}s: {'; '.join(gate['gaps'])}")
+            if matrix["gating"]["on_timeout"] == "abort":
+                state["runs"][run_id] = {**previous, "status": "blocked", "gate": gate}
+                save_state(matrix_dir, state)
+                print("   🛑 Matrix stopped; run it again to resume once the cluster has scaled down")
+                return 1
+
+        cmd = run_command(run, run_dir)
+        entry = {"status": "running", "spec": spec_key(run), "started": time.time(), "gate": gate, "dir": run_dir}
+        state["runs"][run_id] = entry
+        save_state(matrix_dir, state)
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, RUN_FILE), "w", encoding="utf-8") as f:
+            json.dump({"matrix": matrix["name"], "run": run, "baseline": baseline, "gate": gate,
+                       "command": cmd, "started": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=2)
+
+        proc = subprocess.Popen(cmd)
+        try:
+            returncode = proc.wait()
+        except KeyboardInterrupt:
+            # run_hpa.py got the Ctrl-C too; give it time to finalize its reports. The run is redone on resume
+            print(f"\n   ⏳ Waiting up to {RUN_SHUTDOWN_TIMEOUT}s for {run_id} to finalize its reports...")
+            run_hpa.stop_process(proc, RUN_SHUTDOWN_TIMEOUT, interrupted=True)
+            entry.update(status="interrupted", finished=time.time())
+            save_state(matrix_dir, state)
+            print(f"\n🛑 Matrix interrupted during {run_id}; run it again to resume")
+            return 130
+
+        # run_hpa.py exits 0 only when Locust ran to its end (single runs and capacity searches alike)
+        complete = returncode == 0 and sample_store.has_stream(run_dir, "k8s")
+        entry.update(status="done" if complete else "failed", returncode=returncode, finished=time.time())
+        save_state(matrix_dir, state)
+        if not complete:
+            failures += 1
+            print(f"   ❌ {run_id} failed (exit {returncode}); it is retried on the next invocation")
+
+    print(f"\n🏁 Matrix {matrix['name']}: {len(plan) - failures}/{len(plan)} runs completed")
+    print(f"   📊 Compare: python compare_runs.py --root {out_root} --runs {' '.join(r['id'] for r in matrix['runs'])}")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a declarative matrix of HPA experiments with baseline gating and resume")
+    parser.add_argument("matrix", help="Matrix file (.toml or .json)")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), run_hpa.OUTPUT_DIR),
+                        help="Results root; runs go to <out>/<matrix name>/<run id>/")
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these run ids")
+    parser.add_argument("--rerun", nargs="+", default=[], help="Repeat these runs even if they completed")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without running anything")
+    args = parser.parse_args()
+
+    try:
+        matrix = load_matrix(args.matrix)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    unknown = set(args.only or []) | set(args.rerun)
+    unknown -= {r["id"] for r in matrix["runs"]}
+    if unknown:
+        parser.error(f"Unknown run ids: {', '.join(sorted(unknown))}")
+    sys.exit(run_matrix(matrix, args.out, args.only, set(args.rerun), args.dry_run, args.matrix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import glob
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+# Append-only, line-delimited sample store for long soak tests.
+#
+# Every record is written as one compact JSON line as soon as it is collected,
+# so memory stays flat and an interrupted run keeps everything up to the last
+# flush. Each stream ("k8s", "db_pool", ...) has its own chunk files:
+#
+#   <store_dir>/<stream>-00000.jsonl.gz   rotated (closed) chunks
+#   <store_dir>/<stream>-00001.jsonl      chunk currently being written
+#
+# Readers iterate chunks in order and tolerate a truncated last line, which is
+# what a crash or Ctrl-C mid-write leaves behind.
+
+FSYNC_INTERVAL = 5  # seconds between fsyncs of the open chunks
+CHUNK_RECORDS = 5000  # records per chunk before rotation
+
+CHUNK_PATTERN = re.compile(r'^(?P<stream>.+)-(?P<seq>\d{5})\.jsonl(?:\.gz)?$')
+
+
+class SampleStore:
+    """
+    Thread-safe writer for one store directory. Several processes may write to
+    the same directory as long as they use different stream names. Listeners
+    added with `add_listener` see every appended record (live consumers such as
+    the dashboard); they are called outside the lock and must not block.
+    """
+
+    def __init__(self, directory, fsync_interval=FSYNC_INTERVAL, chunk_records=CHUNK_RECORDS):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.chunk_records = chunk_records
+        self._lock = threading.Lock()
+        self._files = {}  # stream -> [file, seq, records_in_chunk]
+        self._last_fsync = time.monotonic()
+        self._listeners = []
+        os.makedirs(directory, exist_ok=True)
+
+    def add_listener(self, listener):
+        """
+        Registers `listener(stream, record)`, called after each append.
+        """
+        self._listeners.append(listener)
+
+    def append(self, stream, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            entry = self._files.get(stream)
+            if entry is None:
+                entry = self._files[stream] = self._open_chunk(stream, next_sequence(self.directory, stream))
+            elif entry[2] >= self.chunk_records:
+                self._rotate(stream, entry)
+                entry = self._files[stream] = self._open_chunk(stream, entry[1] + 1)
+            entry[0].write(line)
+            entry[2] += 1
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+        for listener in self._listeners:
+            try:
+                listener(stream, record)
+            except Exception as e:
+                print(f"   ⚠️  Sample listener failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            for entry in self._files.values():
+                entry[0].close()
+            self._files.clear()
+
+    def _open_chunk(self, stream, seq):
+        path = os.path.join(self.directory, f"{stream}-{seq:05d}.jsonl")
+        return [open(path, "a", encoding="utf-8"), seq, 0]
+
+    def _rotate(self, stream, entry):
+        f = entry[0]
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        # Closed chunks are compressed; the open chunk stays plain so it survives a crash.
+        # The .gz only appears under its final name once complete, and the plain file
+        # is removed after that (readers prefer it while both exist).
+        tmp = f.name + ".gz.tmp"
+        with open(f.name, "rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, f.name + ".gz")
+        os.remove(f.name)
+
+    def _sync(self):
+        for entry in self._files.values():
+            entry[0].flush()
+            os.fsync(entry[0].fileno())
+        self._last_fsync = time.monotonic()
+
+
+def chunk_files(directory, stream):
+    """
+    Returns the chunk files of a stream in write order. While a chunk is being
+    rotated (or a crash interrupted the rotation) both its .jsonl and .jsonl.gz
+    exist; the plain one is complete and is the one returned.
+    """
+    chunks = {}
+    for path in glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(stream)}-*.jsonl*")):
+        match = CHUNK_PATTERN.match(os.path.basename(path))
+        if match and match.group('stream') == stream:
+            seq = int(match.group('seq'))
+            if seq not in chunks or not path.endswith(".gz"):
+                chunks[seq] = path
+    return [chunks[seq] for seq in sorted(chunks)]
+
+
+def next_sequence(directory, stream):
+    """
+    New writers (e.g. a resumed run) always start a fresh chunk after the existing ones.
+    """
+    chunks = chunk_files(directory, stream)
+    if not chunks:
+        return 0
+    return int(CHUNK_PATTERN.match(os.path.basename(chunks[-1])).group('seq')) + 1
+
+
+def iter_records(directory, stream):
+    """
+    Lazily yields every record of a stream, oldest first. Lines that cannot be
+    decoded (a write cut short by a crash) are skipped, and a truncated .gz is
+    read up to where it ends.
+    """
+    for path in chunk_files(directory, stream):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            lines = iter(f)
+            while True:
+                try:
+                    line = next(lines)
+                except (StopIteration, EOFError, OSError):
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def has_stream(directory, stream):
+    return bool(chunk_files(directory, stream))
+
+
+class StreamFollower:
+    """
+    Incrementally reads a stream another process is still writing: each
+    `read_new()` returns the complete records appended since the previous call,
+    following the writer across chunk rotations (a rotated chunk is resumed
+    from the same byte offset in its .gz).
+    """
+
+    def __init__(self, directory, stream):
+        self.directory = directory
+        self.stream = stream
+        self._seq = None
+        self._offset = 0
+
+    def read_new(self):
+        paths = {int(CHUNK_PATTERN.match(os.path.basename(path)).group('seq')): path
+                 for path in chunk_files(self.directory, self.stream)}
+        records = []
+        for seq in sorted(paths):
+            if self._seq is not None and seq < self._seq:
+                continue
+            if seq != self._seq:
+                self._seq, self._offset = seq, 0
+            path = paths[seq]
+            opener = gzip.open if path.endswith(".gz") else open
+            try:
+                with opener(path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except OSError:
+                break  # rotated away between listing and opening; next call picks it up
+            end = data.rfind(b"\n") + 1  # a partial last line is left for the next call
+            self._offset += end
+            for line in data[:end].splitlines():
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import base64
+import fnmatch
+import itertools
+import json
+import math
+import random
+import time
+from urllib.parse import parse_qs
+
+# Minimal asyncio HTTP/1.1 stub of the backend API, used to benchmark the load
+# generator itself and to try locustfile.py changes without a cluster. Keeps
+# connections alive like the real ingress so client-side connection handling is
+# part of what is measured.
+#
+# Every endpoint the user classes hit is implemented against small in-memory
+# state (accounts, recipes, feeds, likes, comments, saved recipes) with the
+# response shapes of the Spring controllers, so catalog loading, journeys and
+# token refresh behave as they do against the cluster. Protected endpoints only
+# check that a bearer token is present.
+#
+# Server-side behaviour can be shaped per endpoint (glob patterns on the path):
+#   --latency '/api/recipe/*=lognormal:20,0.8' --latency '*=fixed:2'
+#       fixed:<ms> | uniform:<lo>,<hi> | lognormal:<median>,<sigma> | exp:<mean>
+#   --upload-ms-per-mb 40          extra latency per MB of request body (photo upload to GCS)
+#   --errors '/api/feeds/like=0.05:500' --errors '*=0.01:503'
+#       rate of injected error responses, with the status to return
+#   --drop-rate 0.001              connections closed without a response
+# The first matching rule wins; rules are tried in the order given.
+#
+#   python stub_server.py --port 18080 --latency '*=lognormal:5,0.5' --errors '/api/recipe/create=0.02:500'
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+    429: "Too Many Requests", 500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable",
+}
+SEED_RECIPES = 50
+MAX_RECIPES = 5000  # oldest recipes / feeds are dropped beyond this to keep memory flat
+PAGE_SIZE = 20  # feeds per /api/feeds/recent page, as in FeedService
+TOKEN_TTL = 3600  # seconds; tokens are JWT-shaped so user_pool.token_expiry can read them
+
+PUBLIC_PATHS = {"/api/auth/register", "/api/auth/login", "/api/auth/refresh-token", "/api/auth/exists"}
+
+
+def make_token(username, ttl=TOKEN_TTL):
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{part({'alg': 'none'})}.{part({'sub': username, 'exp': int(time.time()) + ttl})}.stub"
+
+
+def token_subject(token):
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))).get("sub")
+    except Exception:
+        return None
+
+
+# --- Latency / error rules ---
+
+def parse_distribution(spec):
+    """
+    "<kind>:<params>" -> function returning a delay in seconds.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda: random.lognormvariate(mu, values[1]) / 1000
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0]) / 1000
+    raise ValueError(f"Unknown latency distribution '{spec}' (fixed, uniform, lognormal, exp)")
+
+
+def parse_rules(specs, parse_value):
+    """
+    ["<path glob>=<value>", ...] -> [(glob, parsed value), ...] in the given order.
+    """
+    rules = []
+    for spec in specs or []:
+        pattern, sep, value = spec.partition("=")
+        if not sep:
+            raise ValueError(f"Expected '<path glob>=<value>', got '{spec}'")
+        rules.append((pattern.strip(), parse_value(value.strip())))
+    return rules
+
+
+def parse_error(spec):
+    rate, _, status = spec.partition(":")
+    return float(rate), int(status or 500)
+
+
+def match_rule(rules, path):
+    for pattern, value in rules:
+        if fnmatch.fnmatchcase(path, pattern):
+            return value
+    return None
+
+
+# --- In-memory backend ---
+
+class Backend:
+    """
+    State and handlers of the stubbed API. `handle` returns (status, json_payload).
+    """
+
+    def __init__(self, seed_recipes=SEED_RECIPES):
+        self.passwords = {}
+        self.recipes = {}  # id -> recipe (insertion ordered, oldest first)
+        self.feeds = {}  # id -> feed
+        self.likes = set()  # (username, feed id)
+        self.comments = {}  # feed id -> [comment]
+        self.saved = {}  # username -> {recipe id}
+        self.forms = {}  # username -> interest form
+        # Separate ID sequences per table, as in the database
+        self.ids = {table: itertools.count(1) for table in ("recipe", "feed", "comment")}
+        self.requests = 0
+        for i in range(seed_recipes):
+            self.create_recipe("seed", {"title": f"Seed Recipe {i}", "ingredients": [], "instructions": ["Step 1"],
+                                        "type": "Dinner", "tag": "Seed", "totalCalorie": 400, "price": 10.0})
+
+    def create_recipe(self, username, request):
+        recipe_id = next(self.ids["recipe"])
+        photo = request.get("photo") or ""
+        recipe = {
+            "id": recipe_id,
+            "title": request.get("title", ""),
+            "totalCalorie": request.get("totalCalorie", 0),
+            "ingredients": request.get("ingredients") or [],
+            "tag": request.get("tag"),
+            "price": request.get("price", 0.0),
+            "type": request.get("type"),
+            "instructions": request.get("instructions") or [],
+            # The real backend uploads the photo to GCS and stores its URL
+            "photo": f"https://storage.googleapis.com/heath-stub/recipe-{recipe_id}.png" if photo else "",
+            "healthinessScore": 5.0,
+            "easinessScore": 5.0,
+            "nutritionData": None,
+        }
+        self.recipes[recipe_id] = recipe
+        feed_id = next(self.ids["feed"])
+        self.feeds[feed_id] = {
+            "id": feed_id, "userId": hash(username) % 100000, "type": "RECIPE", "text": None, "image": None,
+            "recipe": recipe, "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"), "likeCount": 0, "commentCount": 0,
+            "likedByCurrentUser": False, "name": username.split("@")[0], "surname": "", "profilePhoto": "",
+        }
+        while len(self.recipes) > MAX_RECIPES:
+            self.recipes.pop(next(iter(self.recipes)))
+        while len(self.feeds) > MAX_RECIPES:
+            old = next(iter(self.feeds))
+            self.feeds.pop(old)
+            self.comments.pop(old, None)
+        return recipe
+
+    def handle(self, method, path, query, body, username):
+        """
+        Returns (status, json_payload) for one request.
+        """
+        self.requests += 1
+        try:
+            request = json.loads(body) if body else {}
+        except ValueError:
+            return 400, {"message": "Malformed JSON"}
+        if not isinstance(request, dict):
+            request = {}
+
+        # --- /api/auth ---
+        if path == "/api/auth/register":
+            if request.get("username") in self.passwords:
+                return 400, {"message": "User already exists"}
+            self.passwords[request.get("username")] = request.get("password")
+            return 200, self._tokens(request.get("username"))
+        if path == "/api/auth/login":
+            if self.passwords.get(request.get("username")) != request.get("password"):
+                return 401, {"message": "Bad credentials"}
+            return 200, self._tokens(request.get("username"))
+        if path == "/api/auth/refresh-token":
+            subject = token_subject(request.get("refreshToken") or "")
+            return (200, self._tokens(subject)) if subject else (401, {"message": "Invalid refresh token"})
+        if path == "/api/auth/exists":
+            return 200, _param(query, "email") in self.passwords
+
+        # --- /api/interest-form ---
+        if path == "/api/interest-form/submit" or path == "/api/interest-form/update-form":
+            form = {k: v for k, v in request.items() if k != "profilePhoto"}
+            form["profilePhoto"] = "https://storage.googleapis.com/heath-stub/profile.png" if request.get("profilePhoto") else ""
+            self.forms[username] = form
+            return 200, form
+        if path == "/api/interest-form/get-form":
+            return (200, self.forms[username]) if username in self.forms else (404, {"message": "No form"})
+        if path == "/api/interest-form/check-first-login":
+            return 200, username not in self.forms
+
+        # --- /api/recipe ---
+        if path == "/api/recipe/create":
+            recipe = self.create_recipe(username, request)
+            return 200, {"id": recipe["id"], "title": recipe["title"]}
+        if path == "/api/recipe/get":
+            recipe = self.recipes.get(_int(_param(query, "recipeId")))
+            return (200, recipe) if recipe else (404, {"message": "Recipe not found"})
+        if path == "/api/recipe/get-all":
+            return 200, list(self.recipes.values())[-200:]
+        if path == "/api/recipe/delete-recipe":
+            return (200, "Deleted") if self.recipes.pop(_int(request.get("recipeId")), None) else (404, "Not found")
+
+        # --- /api/feeds ---
+        if path == "/api/feeds/recent":
+            page = _int(_param(query, "pageNumber")) or 0
+            newest = list(reversed(self.feeds.values()))[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+            return 200, [self._feed_view(feed, username) for feed in newest]
+        if path == "/api/feeds/feed-by-user":
+            return 200, [self._feed_view(f, username) for f in self.feeds.values() if f["name"] == username.split("@")[0]][-50:]
+        if path in ("/api/feeds/like", "/api/feeds/unlike"):
+            feed = self.feeds.get(_int(request.get("feedId")))
+            if feed is None:
+                return 404, {"message": "Feed not found"}
+            key = (username, feed["id"])
+            if path.endswith("/like") and key not in self.likes:
+                self.likes.add(key)
+                feed["likeCount"] += 1
+            elif path.endswith("/unlike") and key in self.likes:
+                self.likes.discard(key)
+                feed["likeCount"] -= 1
+            return 200, {"likeCount": feed["likeCount"]}
+        if path == "/api/feeds/comment":
+            feed = self.feeds.get(_int(request.get("feedId")))
+            if feed is None:
+                return 404, {"message": "Feed not found"}
+            comment = {"id": next(self.ids["comment"]), "name": username.split("@")[0], "surname": "", "profilePhoto": "",
+                       "message": request.get("message", ""), "createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "userId": hash(username) % 100000}
+            comments = self.comments.setdefault(feed["id"], [])
+            comments.append(comment)
+            del comments[:-100]
+            feed["commentCount"] += 1
+            return 200, comment
+        if path == "/api/feeds/get-feed-comments":
+            return 200, self.comments.get(_int(_param(query, "feedId")), [])
+
+        # --- /api/saved-recipes ---
+        if path == "/api/saved-recipes/save":
+            self.saved.setdefault(username, set()).add(_int(request.get("recipeId")))
+            return 200, "Recipe saved"
+        if path == "/api/saved-recipes/unsave":
+            self.saved.get(username, set()).discard(_int(request.get("recipeId")))
+            return 200, "Recipe unsaved"
+        if path in ("/api/saved-recipes/get", "/api/saved-recipes/get-all"):
+            return 200, [
+                {"recipeId": rid, "photo": self.recipes[rid]["photo"], "title": self.recipes[rid]["title"]}
+                for rid in self.saved.get(username, ()) if rid in self.recipes
+            ]
+        return 404, {"message": f"No handler for {method} {path}"}
+
+    def _tokens(self, username):
+        return {"accessToken": make_token(username), "refreshToken": make_token(username, ttl=7 * 24 * 3600)}
+
+    def _feed_view(self, feed, username):
+        return {**feed, "likedByCurrentUser": (username, feed["id"]) in self.likes}
+
+
+def _param(query, name):
+    return (query.get(name) or [None])[0]
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# --- HTTP ---
+
+class StubServer:
+    def __init__(self, backend, latency_rules=(), error_rules=(), upload_ms_per_mb=0.0, drop_rate=0.0):
+        self.backend = backend
+        self.latency_rules = list(latency_rules)
+        self.error_rules = list(error_rules)
+        self.upload_ms_per_mb = upload_ms_per_mb
+        self.drop_rate = drop_rate
+        self.injected_errors = 0
+        self.dropped = 0
+
+    def respond(self, method, target, headers, body):
+        """
+        Status and payload for one request, with error injection applied.
+        """
+        path, _, query_string = target.partition("?")
+        error = match_rule(self.error_rules, path)
+        if error and random.random() < error[0]:
+            self.injected_errors += 1
+            return error[1], {"message": "Injected error"}
+        username = None
+        if path not in PUBLIC_PATHS:
+            auth = headers.get("authorization", "")
+            if not auth.startswith("Bearer "):
+                return 401, {"message": "Missing token"}
+            username = token_subject(auth[7:]) or "anonymous"
+        return self.backend.handle(method, path, parse_qs(query_string), body, username)
+
+    def delay(self, target, body_length):
+        distribution = match_rule(self.latency_rules, target.split("?", 1)[0])
+        seconds = distribution() if distribution else 0.0
+        return seconds + self.upload_ms_per_mb * body_length / (1024 * 1024) / 1000
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                if self.drop_rate and random.random() < self.drop_rate:
+                    self.dropped += 1
+                    break
+                status, payload = self.respond(method, target, headers, body)
+                delay = self.delay(target, length)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main(host, port, server):
+    listener = await asyncio.start_server(server.serve_connection, host, port, backlog=1024, limit=2 ** 20)
+    print(f"🧪 Stub backend listening on http://{host}:{listener.sockets[0].getsockname()[1]}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local stub of the heatH backend API')
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--latency', action='append', default=[],
+                        help="Per-path latency '<glob>=<fixed:ms|uniform:lo,hi|lognormal:median,sigma|exp:mean>' (repeatable)")
+    parser.add_argument('--errors', action='append', default=[],
+                        help="Per-path error injection '<glob>=<rate>[:status]' (repeatable)")
+    parser.add_argument('--upload-ms-per-mb', type=float, default=0.0, help='Extra latency per MB of request body')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of requests answered by closing the connection')
+    parser.add_argument('--seed-recipes', type=int, default=SEED_RECIPES, help='Recipes / feeds present at start')
+    args = parser.parse_args()
+
+    stub = StubServer(
+        Backend(args.seed_recipes),
+        parse_rules(args.latency, parse_distribution),
+        parse_rules(args.errors, parse_error),
+        args.upload_ms_per_mb,
+        args.drop_rate,
+    )
+    try:
+        asyncio.run(main(args.host, args.port, stub))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"🧪 {stub.backend.requests} requests served, {stub.injected_errors} errors injected, "
+              f"{stub.dropped} connections dropped", flush=True)
@@ -0,0 +1,49 @@
+import unittest
+
+import capacity_search
+
+# Pure search logic, no Locust or cluster needed.
+#
+#   cd locust && python -m unittest test_capacity_search
+
+
+def run_search(search, capacity, max_steps=50):
+    """
+    Feeds `search` the outcomes of a configuration sustaining `capacity` req/s.
+    Returns the rates it tried.
+    """
+    tried = []
+    rate = search.next_rate()
+    while rate is not None and len(tried) < max_steps:
+        tried.append(rate)
+        search.record(rate, rate <= capacity)
+        rate = search.next_rate()
+    return tried
+
+
+class BisectSearchTest(unittest.TestCase):
+
+    def test_converges_to_resolution(self):
+        search = capacity_search.BisectSearch(10, 200, 5)
+        tried = run_search(search, 73)
+        self.assertEqual(tried[:2], [10, 200])
+        self.assertLessEqual(73 - search.best, 5)
+        self.assertEqual(len(tried), len(set(tried)))
+
+    def test_stops_when_rounded_midpoint_stops_moving(self):
+        search = capacity_search.BisectSearch(10, 20, 0.05)
+        tried = run_search(search, 13.33)
+        self.assertLess(len(tried), 20)
+        self.assertEqual(len(tried), len(set(tried)))
+        self.assertEqual(search.best, 13.3)
+        self.assertIsNone(search.next_rate())
+
+    def test_low_failing_or_high_passing_ends_the_search(self):
+        self.assertEqual(run_search(capacity_search.BisectSearch(10, 20, 1), 5), [10])
+        search = capacity_search.BisectSearch(10, 20, 1)
+        self.assertEqual(run_search(search, 50), [10, 20])
+        self.assertEqual(search.best, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import k8s_api
+
+# Runs K8sApiCollector against serve_fixtures: no cluster, kubectl or proxy needed.
+#
+#   cd locust && python -m unittest test_k8s_api
+
+NAMESPACE = "default"
+
+
+def pod(name, app, rv):
+    return {"metadata": {"name": name, "labels": {"app": app}, "resourceVersion": str(rv)},
+            "spec": {"containers": [{"name": app, "resources": {"limits": {"cpu": "500m"}}}]},
+            "status": {"phase": "Running"}}
+
+
+def pod_metrics(name, app, cpu, memory):
+    return {"metadata": {"name": name, "labels": {"app": app}},
+            "containers": [{"name": app, "usage": {"cpu": cpu, "memory": memory}}]}
+
+
+FIXTURES = {
+    k8s_api.RESOURCE_PATHS["deployments"]: {"metadata": {"resourceVersion": "100"}, "items": [
+        {"metadata": {"name": "heath-backend"}, "status": {"replicas": 2, "readyReplicas": 1}},
+        {"metadata": {"name": "heath-frontend"}, "status": {"replicas": 1, "readyReplicas": 1}},
+    ]},
+    k8s_api.RESOURCE_PATHS["hpas"]: {"metadata": {"resourceVersion": "100"}, "items": [
+        {"metadata": {"name": "heath-backend-hpa"}, "status": {"currentReplicas": 2, "currentMetrics": [
+            {"type": "Resource", "resource": {"name": "cpu", "current": {"averageUtilization": 73}}}]}},
+    ]},
+    k8s_api.RESOURCE_PATHS["pods"]: {"metadata": {"resourceVersion": "100"}, "items": [
+        pod("backend-a", "backend", 90), pod("frontend-a", "frontend", 91),
+    ]},
+    k8s_api.RESOURCE_PATHS["nodes"]: {"metadata": {"resourceVersion": "100"}, "items": [
+        {"metadata": {"name": "node-1"}, "status": {
+            "allocatable": {"cpu": "2", "memory": "4Gi"},
+            "conditions": [{"type": "Ready", "status": "True"}]}},
+    ]},
+    k8s_api.POD_METRICS_PATH: {"items": [
+        pod_metrics("backend-a", "backend", "250m", "256Mi"),
+        pod_metrics("backend-b", "backend", "100000000n", "128Mi"),
+        pod_metrics("frontend-a", "frontend", "50m", "64Mi"),
+    ]},
+    k8s_api.NODE_METRICS_PATH: {"items": [
+        {"metadata": {"name": "node-1"}, "usage": {"cpu": "1", "memory": "1Gi"}},
+    ]},
+}
+
+# Recorded pod events: one from before the list (already in it), one after
+POD_EVENTS = [
+    {"type": "MODIFIED", "object": pod("backend-a", "backend", 95)},
+    {"type": "ADDED", "object": pod("backend-b", "backend", 101)},
+]
+
+
+class CollectorAgainstFixturesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        for path, body in FIXTURES.items():
+            target = k8s_api.fixture_path(cls.tmp.name, path.format(namespace=NAMESPACE))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "w") as f:
+                json.dump(body, f)
+        events = k8s_api.fixture_path(cls.tmp.name, k8s_api.RESOURCE_PATHS["pods"].format(namespace=NAMESPACE),
+                                      ".watch.jsonl")
+        with open(events, "w") as f:
+            f.writelines(json.dumps(event) + "\n" for event in POD_EVENTS)
+
+        cls.server = k8s_api.serve_fixtures(cls.tmp.name)
+        cls.collector = k8s_api.K8sApiCollector(f"http://127.0.0.1:{cls.server.server_port}", NAMESPACE)
+        cls.pod_events = []
+        cls.collector.add_listener("pods", lambda event_type, obj: cls.pod_events.append(
+            (event_type, obj["metadata"]["name"])))
+        cls.collector.start(sync_timeout=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.collector.stop()
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_deployment_hpa_and_node_probes(self):
+        self.assertEqual(self.collector.get_deployment_metrics("heath-backend"), (2, 1))
+        self.assertEqual(self.collector.get_deployment_metrics("missing"), (0, 0))
+        self.assertEqual(self.collector.get_hpa_metrics("heath-backend-hpa"), (2, 73))
+        self.assertEqual(self.collector.get_node_metrics(), (1, 1))
+        self.assertEqual(self.collector.get_node_usage(), ({"node-1": 50}, {"node-1": 25}))
+
+    def test_pod_usage_is_filtered_by_label(self):
+        cpu, memory = self.collector.get_pod_usage("backend")
+        self.assertEqual(cpu, {"backend-a": 250, "backend-b": 100})
+        self.assertEqual(memory, {"backend-a": 256 * 1024 ** 2, "backend-b": 128 * 1024 ** 2})
+        self.assertEqual(self.collector.get_pod_usage("frontend")[0], {"frontend-a": 50})
+
+    def test_watch_applies_new_events_once(self):
+        self.assertTrue(self.wait_for(lambda: "backend-b" in self.collector.pod_names("backend")))
+        # The fixture watch ends after 1s and is re-watched from the last resourceVersion
+        time.sleep(2.5)
+        self.assertEqual(self.pod_events.count(("ADDED", "backend-b")), 1)
+        self.assertNotIn(("MODIFIED", "backend-a"), self.pod_events)
+        self.assertEqual(self.collector.pod_names("backend"), {"backend-a", "backend-b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import os
+import threading
+
+import report_data
+import sample_store
+
+# Unified, time-aligned timeline of a run.
+#
+# Locust's own numbers (users, RPS, failures, windowed percentiles) are taken
+# from its --csv-full-history file while the run is in progress and appended to
+# the "locust" stream of the sample store, next to the K8s, DB pool and latency
+# streams. All streams are then placed on the run's elapsed-seconds timebase
+# (elapsed 0 = start of the K8s monitor) and joined "as of" a fixed grid: every
+# grid row carries the latest value each source had at that moment, which is
+# what you need to read e.g. the lag between RPS rising and ready replicas
+# following.
+
+STEP = 1.0  # seconds between timeline rows (Locust writes its history every second)
+
+LOCUST_FIELDS = {
+    "users": "User Count",
+    "rps": "Requests/s",
+    "fps": "Failures/s",
+    "p50": "50%",
+    "p95": "95%",
+    "p99": "99%",
+    "p999": "99.9%",
+    "max": "100%",
+    "requests": "Total Request Count",
+    "failures": "Total Failure Count",
+    "avg": "Total Average Response Time",
+}
+
+
+def parse_history_row(row):
+    """
+    One row of Locust's stats_history.csv (as a dict) to a sample store record.
+    "N/A" cells become None.
+    """
+    record = {"timestamp": float(row["Timestamp"]), "name": row["Name"], "type": row["Type"]}
+    for key, column in LOCUST_FIELDS.items():
+        value = row.get(column)
+        try:
+            record[key] = float(value)
+        except (TypeError, ValueError):
+            record[key] = None
+    return record
+
+
+class LocustStatsTailer:
+    """
+    Follows a growing stats_history.csv and appends its rows to the store:
+    the "Aggregated" rows to the "locust" stream, per-endpoint rows to
+    "locust_endpoints". Partial lines are left for the next read.
+    """
+
+    def __init__(self, csv_path, store, poll_interval=1.0):
+        self.csv_path = csv_path
+        self.store = store
+        self.poll_interval = poll_interval
+        self.rows = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._header = None
+        self._pending = ""
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="locust-stats-tailer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops following and reads whatever Locust wrote last.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.read_available()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.read_available()
+            except Exception as e:
+                print(f"   ⚠️  Reading Locust stats history failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def read_available(self):
+        if self._file is None:
+            if not os.path.exists(self.csv_path):
+                return
+            self._file = open(self.csv_path, newline="", encoding="utf-8")
+        chunk = self._file.read()
+        if not chunk:
+            return
+        data = self._pending + chunk
+        lines = data.split("\n")
+        self._pending = lines.pop()  # incomplete last line (or "")
+        for line in lines:
+            if not line.strip():
+                continue
+            cells = next(csv.reader([line]))
+            if self._header is None:
+                self._header = cells
+                continue
+            record = parse_history_row(dict(zip(self._header, cells)))
+            self.store.append("locust" if record["name"] == "Aggregated" else "locust_endpoints", record)
+            self.rows += 1
+
+
+# --- As-of join ---
+
+def _get(record, *path):
+    for key in path:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def _sum_map(record, *path):
+    values = _get(record, *path) or {}
+    return round(sum(values.values()), 1) if values else None
+
+
+def _avg_map(record, *path):
+    values = _get(record, *path) or {}
+    return round(sum(values.values()) / len(values), 1) if values else None
+
+
+# stream -> {timeline column: function(record) -> value}
+TIMELINE_SOURCES = {
+    "locust": {
+        "users": lambda r: r.get("users"),
+        "rps": lambda r: r.get("rps"),
+        "fps": lambda r: r.get("fps"),
+        "locust_p95": lambda r: r.get("p95"),
+        "locust_p99": lambda r: r.get("p99"),
+    },
+    "latency": {
+        "hdr_p50": lambda r: r["total"].get("p50"),
+        "hdr_p99": lambda r: r["total"].get("p99"),
+        "hdr_p999": lambda r: r["total"].get("p999"),
+    },
+    "k8s": {
+        "be_desired": lambda r: _get(r, "backend", "desired_replicas"),
+        "be_ready": lambda r: _get(r, "backend", "ready_replicas"),
+        "be_hpa_cpu": lambda r: _get(r, "backend", "hpa_cpu"),
+        "be_pod_cpu": lambda r: _sum_map(r, "backend", "pods"),
+        "fe_desired": lambda r: _get(r, "frontend", "desired_replicas"),
+        "fe_ready": lambda r: _get(r, "frontend", "ready_replicas"),
+        "fe_hpa_cpu": lambda r: _get(r, "frontend", "hpa_cpu"),
+        "ready_nodes": lambda r: _get(r, "nodes", "ready"),
+        "node_cpu_avg": lambda r: _avg_map(r, "nodes", "cpu_utilization"),
+    },
+    "db_pool": {
+        "db_active": lambda r: r.get("active"),
+        "db_idle": lambda r: r.get("idle"),
+        "db_waiting": lambda r: r.get("waiting"),
+    },
+}
+TIMELINE_COLUMNS = ["elapsed"] + [column for fields in TIMELINE_SOURCES.values() for column in fields]
+
+
+class _AsOf:
+    """
+    Cursor over one stream that yields the latest values at or before a time.
+    """
+
+    def __init__(self, records, fields, start):
+        self.records = iter(records)
+        self.fields = fields
+        self.start = start
+        self.current = {column: None for column in fields}
+        self.ahead = self._next()
+
+    def _next(self):
+        for record in self.records:
+            if "timestamp" in record:
+                return record["timestamp"] - self.start, record
+        return None
+
+    def at(self, elapsed):
+        while self.ahead is not None and self.ahead[0] <= elapsed:
+            record = self.ahead[1]
+            self.current = {column: fn(record) for column, fn in self.fields.items()}
+            self.ahead = self._next()
+        return self.current
+
+    def last_elapsed(self):
+        """
+        Elapsed time of the stream's last record (consumes the stream).
+        """
+        last = None
+        while self.ahead is not None:
+            last = self.ahead[0]
+            self.ahead = self._next()
+        return last
+
+
+def iter_timeline(store_dir, step=STEP):
+    """
+    Lazily yields one dict per `step` seconds from elapsed 0 to the last sample
+    of any stream, each column holding its source's latest value at that time.
+    """
+    start = report_data.run_start(store_dir)
+    if start is None:
+        return
+    ends = [
+        _AsOf(sample_store.iter_records(store_dir, stream), fields, start).last_elapsed()
+        for stream, fields in TIMELINE_SOURCES.items()
+    ]
+    end = max((e for e in ends if e is not None), default=0)
+    cursors = [
+        _AsOf(sample_store.iter_records(store_dir, stream), fields, start)
+        for stream, fields in TIMELINE_SOURCES.items()
+    ]
+    tick = 0
+    while tick * step <= end:
+        elapsed = round(tick * step, 3)
+        row = {"elapsed": elapsed}
+        for cursor in cursors:
+            row.update(cursor.at(elapsed))
+        yield row
+        tick += 1
+
+
+def write_timeline_csv(store_dir, out_path, step=STEP):
+    """
+    Writes the joined timeline as CSV. Returns the number of rows.
+    """
+    count = 0
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=TIMELINE_COLUMNS)
+        writer.writeheader()
+        for row in iter_timeline(store_dir, step):
+            writer.writerow({k: ("" if v is None else v) for k, v in row.items()})
+            count += 1
+    return count
+
+
+def load_timeline_table(store_dir, step=STEP):
+    """
+    The timeline as a report_data.SeriesTable (missing values as 0).
+    """
+    return report_data.build_table(
+        iter_timeline(store_dir, step), {column: (column,) for column in TIMELINE_COLUMNS}
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Join the streams of a sample store into one timeline CSV')
+    parser.add_argument('store', help='Sample store directory of a run (results_hpa/samples_*)')
+    parser.add_argument('--out', default=None, help='Output CSV (default: <store>/timeline.csv)')
+    parser.add_argument('--step', type=float, default=STEP)
+    args = parser.parse_args()
+    out = args.out or os.path.join(args.store, "timeline.csv")
+    rows = write_timeline_csv(args.store, out, args.step)
+    print(f"🧵 Timeline: {rows} rows -> {out}")
@@ -0,0 +1,250 @@
+import argparse
+import base64
+import collections
+import datetime
+import fcntl
+import json
+import os
+import random
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+import payloads
+
+# Pre-provisioned account pool.
+#
+# Registration (bcrypt on the backend) + interest form submission used to happen
+# in every simulated user's on_start, so each ramp began with an auth storm that
+# dominated the HPA curves. Seeding creates the accounts ahead of time, in
+# parallel, and stores their credentials and tokens in a JSON file:
+#
+#   python user_pool.py --host http://<ingress>/ --count 500 --out results_hpa/user_pool.json
+#
+# During the test each Locust process loads its shard of the file, users check
+# accounts out of the shared pool, and access tokens are refreshed through
+# /api/auth/refresh-token only when they are about to expire (also at checkout,
+# since the file may be older than the token lifetime). Refreshed tokens are
+# written back to the file, so the next run starts from them.
+
+REFRESH_MARGIN = 300  # seconds before expiry at which an access token is refreshed
+REFRESH_CHECK_INTERVAL = 60  # seconds between expiry checks
+
+
+def random_string(length=8):
+    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
+
+
+def token_expiry(token):
+    """
+    Returns the `exp` claim (epoch seconds) of a JWT, or None if it cannot be read.
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+    except Exception:
+        return None
+
+
+# --- Seeding ---
+
+_thread_local = threading.local()
+
+
+def _session():
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def create_account(host, password="password123"):
+    """
+    Registers one account (register already returns tokens), falls back to login,
+    then submits the interest form. Returns the account dict or raises.
+    """
+    session = _session()
+    base = host.rstrip('/')
+    username = f"user_{random_string()}@test.com"
+    credentials = {"username": username, "password": password}
+
+    resp = session.post(f"{base}/api/auth/register", json=credentials, timeout=60)
+    if resp.status_code != 200 or not resp.json().get("accessToken"):
+        resp = session.post(f"{base}/api/auth/login", json=credentials, timeout=60)
+        resp.raise_for_status()
+    tokens = resp.json()
+
+    form = session.post(
+        f"{base}/api/interest-form/submit", timeout=60,
+        json=payloads.interest_form_fields(f"User_{random_string(4)}", f"Surname_{random_string(4)}"),
+        headers={"Authorization": f"Bearer {tokens['accessToken']}"}
+    )
+    form.raise_for_status()
+    return {
+        "username": username,
+        "password": password,
+        "accessToken": tokens["accessToken"],
+        "refreshToken": tokens.get("refreshToken"),
+    }
+
+
+def seed_accounts(host, count, out_path, concurrency=32):
+    """
+    Creates `count` accounts in parallel and writes them to `out_path`
+    (appending to the accounts already in the file). Returns the number created.
+    """
+    existing = load_accounts(out_path) if os.path.exists(out_path) else []
+    created, failed = [], 0
+    started = time.time()
+    print(f"   🌱 Seeding {count} accounts against {host} ({concurrency} in parallel)...")
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(create_account, host) for _ in range(count)]
+        for future in as_completed(futures):
+            try:
+                created.append(future.result())
+            except Exception:
+                failed += 1
+            done = len(created) + failed
+            if done % 50 == 0 or done == count:
+                print(f"      {done}/{count} ({failed} failed)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "host": host,
+            "updated": datetime.datetime.now().isoformat(timespec="seconds"),
+            "accounts": existing + created,
+        }, f)
+    os.replace(tmp_path, out_path)
+    print(f"   ✅ {len(created)} accounts seeded in {time.time() - started:.0f}s -> {out_path}")
+    return len(created)
+
+
+def load_accounts(path):
+    with open(path) as f:
+        return json.load(f).get("accounts", [])
+
+
+# --- Pool used by the Locust user classes ---
+
+class AccountPool:
+    """
+    Per-process pool of pre-seeded accounts. With several Locust workers each one
+    takes a disjoint shard (every `shards`-th account starting at its worker index).
+    """
+
+    def __init__(self, accounts, path=None):
+        self.available = collections.deque(accounts)
+        self.checked_out = {}  # username -> (account, user)
+        self.exhausted_warned = False
+        self.path = path
+        self.refreshed = {}  # username -> account whose tokens changed since the last save
+        self._refresher = None
+
+    @classmethod
+    def from_file(cls, path, shard=0, shards=1):
+        accounts = load_accounts(path)
+        return cls(accounts[shard::max(1, shards)], path)
+
+    def checkout(self, user):
+        """
+        Takes an account for `user`, refreshing its access token first if it
+        expires soon (user.client is used for the refresh request).
+        """
+        if not self.available:
+            if not self.exhausted_warned:
+                print("   ⚠️  Account pool exhausted, falling back to registering new users")
+                self.exhausted_warned = True
+            return None
+        account = self.available.popleft()
+        self.checked_out[account["username"]] = (account, user)
+        try:
+            self.refresh_if_expiring(account, user.client)
+        except Exception as e:
+            print(f"   ⚠️  Token refresh for {account['username']} failed: {e}")
+        return account
+
+    def checkin(self, account):
+        if self.checked_out.pop(account["username"], None):
+            self.available.append(account)
+
+    def refresh_if_expiring(self, account, client, margin=REFRESH_MARGIN):
+        """
+        Refreshes the access token through /api/auth/refresh-token when it expires
+        within `margin` seconds. Returns True if the token changed.
+        """
+        expiry = token_expiry(account["accessToken"])
+        if expiry is None or expiry - time.time() > margin or not account.get("refreshToken"):
+            return False
+        with client.post("/api/auth/refresh-token", json={"refreshToken": account["refreshToken"]},
+                         catch_response=True, name="/api/auth/refresh-token [Pool]") as response:
+            tokens = response.json() if response.status_code == 200 else {}
+            if not tokens.get("accessToken"):
+                response.failure(f"Token refresh failed: {response.status_code}")
+                return False
+            account["accessToken"] = tokens["accessToken"]
+            account["refreshToken"] = tokens.get("refreshToken") or account["refreshToken"]
+            self.refreshed[account["username"]] = account
+            return True
+
+    def save(self):
+        """
+        Writes the refreshed tokens back to the pool file. Workers share the file
+        (each owns a shard), so the update is a read-modify-replace under a lock.
+        """
+        if not self.path or not self.refreshed:
+            return
+        refreshed, self.refreshed = self.refreshed, {}
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self.path) as f:
+                data = json.load(f)
+            for account in data.get("accounts", []):
+                update = refreshed.get(account.get("username"))
+                if update:
+                    account["accessToken"] = update["accessToken"]
+                    account["refreshToken"] = update.get("refreshToken")
+            data["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+
+    def start_refresher(self, set_token):
+        """
+        Starts one greenlet per process that keeps checked-out tokens fresh.
+        `set_token(user, token)` applies a refreshed token to the user's client.
+        """
+        if self._refresher is not None:
+            return
+        import gevent
+
+        def refresh_loop():
+            while True:
+                for account, user in list(self.checked_out.values()):
+                    try:
+                        if self.refresh_if_expiring(account, user.client):
+                            set_token(user, account["accessToken"])
+                    except Exception as e:
+                        print(f"   ⚠️  Token refresh for {account['username']} failed: {e}")
+                try:
+                    self.save()
+                except OSError as e:
+                    print(f"   ⚠️  Could not write refreshed tokens to {self.path}: {e}")
+                gevent.sleep(REFRESH_CHECK_INTERVAL)
+
+        self._refresher = gevent.spawn(refresh_loop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Seed a pool of ready-to-use test accounts')
+    parser.add_argument('--host', required=True)
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "results_hpa", "user_pool.json"))
+    parser.add_argument('--concurrency', type=int, default=32)
+    args = parser.parse_args()
+    seed_accounts(args.host, args.count, args.out, args.concurrency)